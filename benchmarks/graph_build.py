@@ -0,0 +1,74 @@
+"""
+Benchmark building the bus stop graph without a cache.
+
+Compares the per stop build, which calls BusStop.find_bus_connection() on
+every stop, against the single scan build used by Graph.create_graph().
+
+Run from the project root:
+    python benchmarks/graph_build.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd() + '/src')
+
+from bus import BusStop, retrieve_all_bus_stops  # noqa: E402
+from Graph import Graph  # noqa: E402
+
+
+def build_per_stop() -> dict[BusStop, list[BusStop]]:
+    """Build the graph the way it was built before the single scan build.
+
+    Returns:
+        dict[BusStop, list[BusStop]]: the graph
+    """
+    graph = Graph()
+    for bus_stop in retrieve_all_bus_stops().values():
+        stops = bus_stop.find_bus_connection()
+        if len(stops) != 0:
+            for stop in stops:
+                graph.insert(bus_stop, stop)
+        else:
+            graph.stops_graph[bus_stop] = []
+    return graph.stops_graph
+
+
+def build_single_scan() -> dict[BusStop, list[BusStop]]:
+    """Build the graph with Graph.create_graph() ignoring any cache.
+
+    Returns:
+        dict[BusStop, list[BusStop]]: the graph
+    """
+    return Graph().create_graph(cache=False)
+
+
+def timed(func) -> tuple[float, dict]:
+    """Time a single call of func.
+
+    Returns:
+        tuple: (seconds taken, value returned)
+    """
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def edges(graph: dict[BusStop, list[BusStop]]) -> dict[str, list[str]]:
+    """Edges of graph by code, ignoring the order of each adjacency list."""
+    return {stop.bus_stop_code: sorted(end.bus_stop_code for end in ends)
+            for stop, ends in graph.items()}
+
+
+if __name__ == "__main__":
+    # load the bus stops once so both builds start from the same state
+    retrieve_all_bus_stops()
+
+    before, old_graph = timed(build_per_stop)
+    after, new_graph = timed(build_single_scan)
+
+    print(f"per stop build:    {before:8.3f}s")
+    print(f"single scan build: {after:8.3f}s")
+    print(f"speed up:          {before / after:8.1f}x")
+    print("same graph:", edges(old_graph) == edges(new_graph))
@@ -0,0 +1,113 @@
+"""
+Benchmark Graph.search_path against the forward search it replaced.
+
+The forward search kept a queue of whole paths, copying a path for every
+edge. Both are run on random journeys and on journeys between interchanges,
+and must give the same solutions in the same order.
+
+Run from the project root:
+    python benchmarks/graph_search.py [--pairs N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd() + '/src')
+
+from bus import BusStop  # noqa: E402
+from Graph import Graph  # noqa: E402
+
+# (start, end) bus stop codes between interchanges
+INTERCHANGES = [
+    ("22009", "75009"),  # Boon Lay Int -> Tampines Int
+    ("46009", "01012"),  # Woodlands Int -> Hotel Grand Pacific
+    ("28009", "96049"),  # Jurong East Int -> Upp Changi Stn/SUTD
+    ("75009", "28009"),  # Tampines Int -> Jurong East Int
+    ("84009", "65009"),  # Bedok Int -> Hougang Ctrl Int
+]
+
+
+def search_path_copying(graph: Graph, start: BusStop,
+                        end: BusStop) -> list[list[BusStop]]:
+    """Graph.search_path as it was, a forward search of copied paths."""
+    solutions = []
+    visited = set()
+    to_visit = [[start]]
+
+    while to_visit:
+        current_path = to_visit.pop(0)
+        cur_path_last_stop = current_path[-1]
+
+        if solutions and len(current_path) > 3:
+            return solutions
+
+        if cur_path_last_stop not in graph.stops_graph:
+            graph.reconnecting_stop(cur_path_last_stop)
+
+        for node in graph.stops_graph.get(cur_path_last_stop, []):
+            if node not in visited:
+                to_visit.append(current_path + [node])
+                visited.add(node)
+            if node == end:
+                solutions.append(current_path + [node])
+
+    return solutions
+
+
+def timed(func) -> tuple[float, int, list]:
+    """Time a call of func, then run it again for its peak memory.
+
+    Returns:
+        tuple: (seconds taken, peak bytes, value returned)
+    """
+    begin = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - begin
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark Graph.search_path.")
+    parser.add_argument("--pairs", type=int, default=200,
+                        help="random journeys to search")
+    pairs = parser.parse_args().pairs
+    graph = Graph()
+    graph.create_graph()
+    graph.reverse_graph()  # built once per graph, not per search
+
+    stops = sorted(graph.stops_graph, key=lambda stop: stop.bus_stop_code)
+    rng = random.Random(0)
+    journeys = [(BusStop.from_bus_code(start), BusStop.from_bus_code(end))
+                for start, end in INTERCHANGES]
+    journeys += [tuple(rng.sample(stops, 2)) for _ in range(pairs)]
+    journeys += [(stop, stop) for stop in rng.sample(stops, 10)]
+
+    totals = {"copying": [0.0, 0], "bidirectional": [0.0, 0]}
+    for i, (start, end) in enumerate(journeys):
+        old_time, old_peak, old = timed(
+            lambda: search_path_copying(graph, start, end))
+        new_time, new_peak, new = timed(
+            lambda: graph.search_path(start, end))
+        assert old == new, (start.bus_stop_code, end.bus_stop_code)
+        for name, seconds, peak in (("copying", old_time, old_peak),
+                                    ("bidirectional", new_time, new_peak)):
+            totals[name][0] += seconds
+            totals[name][1] = max(totals[name][1], peak)
+        if i < len(INTERCHANGES):
+            print(f"{start.description} -> {end.description}: "
+                  f"{len(new)} paths, {old_time:.3f}s -> {new_time:.3f}s, "
+                  f"{old_peak // 1024}KB -> {new_peak // 1024}KB")
+
+    print(f"{len(journeys)} journeys, same solutions")
+    for name, (seconds, peak) in totals.items():
+        print(f"{name:14} {seconds:8.3f}s total, "
+              f"{peak // 1024:8}KB peak")
@@ -0,0 +1,86 @@
+"""
+Benchmark OrderedList against the single list it replaced.
+
+Inserts random path summaries one at a time, and in bulk with extend(),
+at 10^3 to 10^6 items. The single list is quadratic, so it is skipped
+past 10^5 items unless --all is given.
+
+Run from the project root:
+    python benchmarks/ordered_list.py [--all]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.getcwd() + '/src')
+
+from OrderedList import OrderedList  # noqa: E402
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+
+class ListOrderedList:
+    """OrderedList as it was, a single list with binary search inserts."""
+
+    def __init__(self, index) -> None:
+        self.data = []
+        self.index = index
+
+    def insert(self, value) -> None:
+        lo, hi = 0, len(self.data)
+        while lo < hi:
+            mid = (hi + lo) // 2
+            if value[self.index] < self.data[mid][self.index]:
+                hi = mid
+            else:
+                lo = mid + 1
+        self.data.insert(hi, value)
+
+
+def summaries(n: int, seed: int = 0) -> list[dict]:
+    """Random results as made by sort_paths."""
+    rng = random.Random(seed)
+    return [{"sn": [], "path": [],
+             "dist": round(rng.uniform(1, 60), 1),
+             "transfer": rng.randint(1, 4)}
+            for _ in range(n)]
+
+
+def timed(func) -> float:
+    begin = time.perf_counter()
+    func()
+    return time.perf_counter() - begin
+
+
+if __name__ == "__main__":
+    run_all = "--all" in sys.argv
+    print(f"{'n':>9} {'list':>9} {'insert':>9} {'extend':>9} "
+          f"{'insert 2-key':>13}")
+    for n in SIZES:
+        values = summaries(n)
+
+        old = ListOrderedList("dist")
+        if n <= 10 ** 5 or run_all:
+            seconds = timed(lambda: [old.insert(v) for v in values])
+            old_time = f"{seconds:8.3f}s"
+        else:
+            old_time = f"{'skipped':>9}"
+
+        new = OrderedList("dist")
+        insert_time = timed(lambda: [new.insert(v) for v in values])
+        bulk = OrderedList("dist")
+        extend_time = timed(lambda: bulk.extend(values))
+        composite = OrderedList(("transfer", "dist"))
+        composite_time = timed(lambda: [composite.insert(v) for v in values])
+
+        # every way of building the list gives the same order
+        assert list(new) == list(bulk)
+        if old.data:
+            assert old.data == list(new)
+        keys = [(v["transfer"], v["dist"]) for v in composite]
+        assert keys == sorted(keys)
+
+        print(f"{n:>9} {old_time:>9} {insert_time:8.3f}s "
+              f"{extend_time:8.3f}s {composite_time:12.3f}s")
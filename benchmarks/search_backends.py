@@ -0,0 +1,62 @@
+"""
+Benchmark the search backends on cross-island journeys.
+
+Times pathfinding.search_path followed by pathfinding.sort_paths for the
+"bfs", "raptor" and "astar" backends.
+
+Run from the project root:
+    python benchmarks/search_backends.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd() + '/src')
+
+from bus import BusStop, retrieve_all_bus_stops  # noqa: E402
+from Graph import Graph  # noqa: E402
+from pathfinding import search_path, sort_paths  # noqa: E402
+
+# (start, end) bus stop codes across the island
+CROSS_ISLAND = [
+    ("22009", "75009"),  # Boon Lay Int -> Tampines Int
+    ("46009", "01012"),  # Woodlands Int -> Hotel Grand Pacific
+    ("28009", "96049"),  # Jurong East Int -> Upp Changi Stn/SUTD
+    ("75009", "28009"),  # Tampines Int -> Jurong East Int
+    ("75009", "22009"),  # Tampines Int -> Boon Lay Int
+]
+
+
+def run(backend: str, graph: Graph, start: BusStop, end: BusStop,
+        criteria: str = "dist") -> tuple[float, list]:
+    """Time one search with a backend.
+
+    Returns:
+        tuple: (seconds taken, sorted results)
+    """
+    begin = time.perf_counter()
+    paths = search_path(start, end, graph, backend=backend)
+    results = sort_paths(paths, criteria, backend=backend)
+    return time.perf_counter() - begin, results
+
+
+if __name__ == "__main__":
+    retrieve_all_bus_stops()
+    graph = Graph()
+    graph.create_graph()
+
+    for start_code, end_code in CROSS_ISLAND:
+        start = BusStop.from_bus_code(start_code)
+        end = BusStop.from_bus_code(end_code)
+        print(f"{start.description} -> {end.description}")
+        timings = {}
+        for backend in ("bfs", "raptor", "astar"):
+            timings[backend], results = run(backend, graph, start, end)
+            best = results[0] if len(results) else {}
+            print(f"  {backend:7} {timings[backend]:8.3f}s "
+                  f"{len(results):6} journeys, shortest "
+                  f"{best.get('dist')}km via {best.get('sn')}")
+        for backend in ("raptor", "astar"):
+            print(f"  {backend} speed up "
+                  f"{timings['bfs'] / timings[backend]:8.1f}x")
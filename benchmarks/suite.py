@@ -0,0 +1,226 @@
+"""
+Benchmark each stage of a search against a fixture database.
+
+The stages are run in order, each on the results of the one before, for a
+fixed set of journeys. On a database without their stops, such as one from
+synthetic_network.py, as many journeys are picked with a fixed seed:
+
+    graph_build     Graph.create_graph() without the cache
+    search_path     Graph.search_path() for each journey
+    find_bus_path   bus.find_bus_path() for each path found
+    sort_paths      pathfinding.sort_paths() of the paths of each journey
+    ordered_list    OrderedList.insert() of random path summaries
+
+Each stage is first run once under tracemalloc, for its peak memory and the
+SQL statements it runs, then timed without it. The time is the best of
+--repeat runs, so it is of the stage with the lookups it caches warm.
+
+With --save the results are written as the baseline. Otherwise they are
+compared to the baseline, if there is one, and the exit status is 1 if any
+stage is slower, uses more memory or runs more statements by more than
+--margin.
+
+Run from the project root:
+    python benchmarks/suite.py [--db PATH] [--baseline PATH] [--save]
+        [--margin FRACTION] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+sys.path.append(os.getcwd() + '/src')
+
+import config  # noqa: E402
+from datastore import Datastore  # noqa: E402
+
+# (start, end) bus stop codes, across the island and nearby
+JOURNEYS = [
+    ("22009", "75009"),  # Boon Lay Int -> Tampines Int
+    ("46009", "01012"),  # Woodlands Int -> Hotel Grand Pacific
+    ("28009", "96049"),  # Jurong East Int -> Upp Changi Stn/SUTD
+    ("75009", "28009"),  # Tampines Int -> Jurong East Int
+    ("01012", "01112"),  # Hotel Grand Pacific -> Opp Bugis Junction
+    ("84009", "65009"),  # Bedok Int -> Hougang Ctrl Int
+]
+ORDERED_LIST_SIZE = 10 ** 5
+BASELINE = os.path.join("benchmarks", "baseline.json")
+# differences too small to count as a regression, however large a fraction
+NOISE = {"seconds": 0.005, "peak_kb": 64, "statements": 0}
+
+
+def stage_graph_build(state: dict) -> None:
+    from Graph import Graph
+
+    graph = Graph()
+    graph.create_graph(cache=False)
+    state["graph"] = graph
+
+
+def stage_search_path(state: dict) -> None:
+    from bus import BusStop
+
+    state["paths"] = [
+        state["graph"].search_path(BusStop.from_bus_code(start),
+                                   BusStop.from_bus_code(end))
+        for start, end in state["journeys"]]
+
+
+def stage_find_bus_path(state: dict) -> None:
+    from bus import find_bus_path
+
+    state["bus_paths"] = [[find_bus_path(path) for path in paths]
+                          for paths in state["paths"]]
+
+
+def stage_sort_paths(state: dict) -> None:
+    from pathfinding import sort_paths
+
+    state["results"] = [sort_paths(paths, "dist")
+                        for paths in state["paths"]]
+
+
+def stage_ordered_list(state: dict) -> None:
+    from OrderedList import OrderedList
+
+    ordered = OrderedList(("dist", "transfer"))
+    for summary in state["summaries"]:
+        ordered.insert(summary)
+
+
+STAGES: dict[str, Callable[[dict], None]] = {
+    "graph_build": stage_graph_build,
+    "search_path": stage_search_path,
+    "find_bus_path": stage_find_bus_path,
+    "sort_paths": stage_sort_paths,
+    "ordered_list": stage_ordered_list,
+}
+
+
+def summaries(n: int, seed: int = 0) -> list[dict]:
+    """Random results as made by sort_paths."""
+    rng = random.Random(seed)
+    return [{"sn": [], "path": [],
+             "dist": round(rng.uniform(1, 60), 1),
+             "transfer": rng.randint(1, 4)}
+            for _ in range(n)]
+
+
+def journeys(seed: int = 0) -> list[tuple[str, str]]:
+    """JOURNEYS, or as many picked from the stops of the database if it
+    does not have their stops.
+
+    Args:
+        seed (int, optional): seed of the journeys picked. Defaults to 0.
+
+    Returns:
+        list: (start, end) bus stop codes
+    """
+    codes = [row[0] for row in Datastore().execute(
+        'SELECT DISTINCT "bus_stop_code" FROM "bus_routes" '
+        'WHERE "bus_stop_code" IN (SELECT "bus_stop_code" FROM "bus_stops") '
+        'ORDER BY "bus_stop_code";')]
+    served = set(codes)
+    if all(start in served and end in served for start, end in JOURNEYS):
+        return JOURNEYS
+    rng = random.Random(seed)
+    return [tuple(rng.sample(codes, 2)) for _ in JOURNEYS]
+
+
+def measure(stage: Callable[[dict], None], state: dict,
+            repeat: int) -> dict[str, Any]:
+    """Run a stage, measuring it.
+
+    Args:
+        stage (Callable): the stage, reading and adding to state
+        state (dict): results of the stages before
+        repeat (int): times to run it for the timing
+
+    Returns:
+        dict: with keys (seconds, peak_kb, statements)
+    """
+    datastore = Datastore()
+    statements = datastore.stats()["statements_run"]
+    tracemalloc.start()
+    stage(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    statements = datastore.stats()["statements_run"] - statements
+
+    seconds = float("inf")
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        stage(state)
+        seconds = min(seconds, time.perf_counter() - begin)
+    return {"seconds": round(seconds, 4), "peak_kb": peak // 1024,
+            "statements": statements}
+
+
+def regressions(results: dict, baseline: dict, margin: float) -> list[str]:
+    """Metrics of the stages that got worse by more than margin.
+
+    Args:
+        results (dict): stage: metrics, see measure()
+        baseline (dict): the same, to compare against
+        margin (float): fraction a metric may grow by
+
+    Returns:
+        list: a message for each regression
+    """
+    found = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            before = baseline.get(name, {}).get(metric)
+            if before is None:
+                continue
+            if value > before * (1 + margin) \
+                    and value - before > NOISE[metric]:
+                found.append(f"{name} {metric}: {before} -> {value}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stages of a search.")
+    parser.add_argument("--db", default=config.db_path,
+                        help="fixture database")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="baseline json to compare to or save")
+    parser.add_argument("--save", action="store_true",
+                        help="save the results as the baseline")
+    parser.add_argument("--margin", type=float, default=0.25,
+                        help="fraction a stage may regress by")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs of each stage timed")
+    args = parser.parse_args()
+
+    Datastore(args.db, read_only=True)
+    state = {"journeys": journeys(),
+             "summaries": summaries(ORDERED_LIST_SIZE)}
+    results = {}
+    print(f"{'stage':14} {'seconds':>9} {'peak KB':>9} {'statements':>11}")
+    for name, stage in STAGES.items():
+        results[name] = measure(stage, state, args.repeat)
+        metrics = results[name]
+        print(f"{name:14} {metrics['seconds']:9.4f} {metrics['peak_kb']:9} "
+              f"{metrics['statements']:11}")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({"db": args.db, "journeys": state["journeys"],
+                       "stages": results}, f, indent=2)
+        print(f"Saved the baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline["stages"], args.margin)
+        for message in found:
+            print(f"REGRESSED {message}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"No stage regressed by more than {args.margin:.0%}")
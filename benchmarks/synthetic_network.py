@@ -0,0 +1,224 @@
+"""
+Generate a synthetic bus network database for scale testing.
+
+The bus_stops and bus_routes tables have the schema of SQLcmds, with the
+migrations run, so the database can be used anywhere the LTA one is, e.g.
+    python benchmarks/suite.py --db synthetic.db
+
+Stops are spread uniformly over a square around Singapore. A service
+follows a wandering heading from a random stop, taking the nearest stop
+not on it yet at each step, and runs the same stops back as direction 2.
+A loop service turns around halfway and ends where it started, with only
+direction 1, like the LTA loop services. The same seed gives the same
+database.
+
+--scale multiplies the stops and services of the defaults, which are about
+the size of the LTA network, and widens the spread to keep the density.
+
+Run from the project root:
+    python benchmarks/synthetic_network.py OUTPUT [--scale N] [--stops N]
+        [--services N] [--route-length N] [--loops FRACTION]
+        [--spread KM] [--seed N]
+"""
+
+import argparse
+import math
+import os
+import random
+import sqlite3
+import sys
+from typing import Iterator
+
+sys.path.append(os.getcwd() + '/src')
+
+from datastore import SQLcmds, migrate  # noqa: E402
+
+CENTRE = (1.3521, 103.8198)  # latitude, longitude of Singapore
+KM_PER_DEGREE = 111.195
+
+
+class StopPlacer:
+    """
+    Stops at random locations, bucketed in a grid for nearest stop queries.
+
+    Attributes:
+
+        + locations (list): (x, y) in km of each stop id
+        + spacing (float): width of a grid cell in km
+
+    Methods:
+
+        + nearest(x, y, exclude): nearest stop id to a point
+    """
+
+    def __init__(self, rng: random.Random, stops: int,
+                 spread: float) -> None:
+        self.locations = [(rng.uniform(0, spread), rng.uniform(0, spread))
+                          for _ in range(stops)]
+        # about one stop per cell
+        self.spacing = spread / math.sqrt(stops)
+        self.__cells: dict[tuple[int, int], list[int]] = {}
+        for stop_id, (x, y) in enumerate(self.locations):
+            self.__cells.setdefault(self.__cell(x, y), []).append(stop_id)
+        self.__span = math.ceil(spread / self.spacing)
+
+    def __cell(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.spacing), int(y // self.spacing)
+
+    def nearest(self, x: float, y: float, exclude: set[int]) -> int:
+        """Nearest stop id to a point, not in exclude.
+
+        Args:
+            x (float): x of the point in km
+            y (float): y of the point in km
+            exclude (set): stop ids to skip
+
+        Returns:
+            int: the stop id, -1 if every stop is excluded
+        """
+        column, row = self.__cell(x, y)
+        best, best_dist = -1, float("inf")
+        for r in range(self.__span + 1):
+            for i in range(column - r, column + r + 1):
+                for j in range(row - r, row + r + 1):
+                    if max(abs(i - column), abs(j - row)) != r:
+                        continue
+                    for stop_id in self.__cells.get((i, j), ()):
+                        if stop_id in exclude:
+                            continue
+                        sx, sy = self.locations[stop_id]
+                        dist = (sx - x) ** 2 + (sy - y) ** 2
+                        if dist < best_dist:
+                            best, best_dist = stop_id, dist
+            # every stop further out is more than r cells away
+            if best >= 0 and math.sqrt(best_dist) <= r * self.spacing:
+                break
+        return best
+
+
+def walk(rng: random.Random, placer: StopPlacer, length: int,
+         loop: bool) -> list[int]:
+    """Stop ids of a service along a wandering heading.
+
+    Args:
+        rng (random.Random): source of randomness
+        placer (StopPlacer): the stops
+        length (int): stops on the route
+        loop (bool): turn around halfway and end at the first stop
+
+    Returns:
+        list: stop ids in order
+    """
+    stop_id = rng.randrange(len(placer.locations))
+    route, heading = [stop_id], rng.uniform(0, 2 * math.pi)
+    for step in range(1, length - loop):
+        if loop and step == length // 2:
+            heading += math.pi
+        heading += rng.gauss(0, 0.3)
+        x, y = placer.locations[route[-1]]
+        stop_id = placer.nearest(x + placer.spacing * math.cos(heading),
+                                 y + placer.spacing * math.sin(heading),
+                                 set(route))
+        if stop_id < 0:
+            break
+        route.append(stop_id)
+    if loop:
+        route.append(route[0])
+    return route
+
+
+def route_rows(service_no: str, direction: int, route: list[int],
+               placer: StopPlacer, codes: list[str]) -> Iterator[dict]:
+    """Rows of bus_routes for a route, with the distance in km from the
+    first stop."""
+    distance = 0.0
+    for sequence, stop_id in enumerate(route, start=1):
+        if sequence > 1:
+            (x1, y1), (x2, y2) = placer.locations[route[sequence - 2]], \
+                placer.locations[stop_id]
+            distance += math.hypot(x2 - x1, y2 - y1)
+        yield {"service_no": service_no, "direction": direction,
+               "stop_sequence": sequence, "bus_stop_code": codes[stop_id],
+               "distance": round(distance, 1)}
+
+
+def generate(db_path: str, stops: int = 5000, services: int = 400,
+             route_length: int = 35, loops: float = 0.15,
+             spread: float = 40.0, seed: int = 0) -> None:
+    """Write a synthetic bus network database.
+
+    Args:
+        db_path (str): path of the database, replaced if it exists
+        stops (int, optional): number of bus stops. Defaults to 5000.
+        services (int, optional): number of services. Defaults to 400.
+        route_length (int, optional): mean stops on a route.
+            Defaults to 35.
+        loops (float, optional): fraction of loop services.
+            Defaults to 0.15.
+        spread (float, optional): width of the square the stops are in, in
+            km. Defaults to 40.
+        seed (int, optional): seed of the network. Defaults to 0.
+    """
+    rng = random.Random(seed)
+    placer = StopPlacer(rng, stops, spread)
+    width = max(5, len(str(stops - 1)))
+    codes = [f"{stop_id:0{width}d}" for stop_id in range(stops)]
+    # the square is centred on Singapore
+    latitude_scale = KM_PER_DEGREE
+    longitude_scale = KM_PER_DEGREE * math.cos(math.radians(CENTRE[0]))
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(SQLcmds["create_bus_stops_table"])
+        conn.execute(SQLcmds["create_bus_routes_table"])
+        conn.executemany(SQLcmds["insert_bus_stops"], (
+            {"bus_stop_code": codes[stop_id],
+             "road_name": f"Synthetic Rd {stop_id // 10}",
+             "description": f"Stop {codes[stop_id]}",
+             "latitude": CENTRE[0] + (y - spread / 2) / latitude_scale,
+             "longitude": CENTRE[1] + (x - spread / 2) / longitude_scale}
+            for stop_id, (x, y) in enumerate(placer.locations)))
+
+        for service in range(services):
+            service_no = str(service + 1)
+            loop = rng.random() < loops
+            length = max(2, round(rng.gauss(route_length,
+                                            route_length / 4)))
+            route = walk(rng, placer, length, loop)
+            conn.executemany(SQLcmds["insert_bus_routes"], route_rows(
+                service_no, 1, route, placer, codes))
+            if not loop:
+                conn.executemany(SQLcmds["insert_bus_routes"], route_rows(
+                    service_no, 2, route[::-1], placer, codes))
+    migrate(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic bus network database.")
+    parser.add_argument("output", help="path of the database to write")
+    parser.add_argument("--scale", type=float, default=1,
+                        help="multiply the stops and services of the "
+                        "defaults")
+    parser.add_argument("--stops", type=int, help="number of bus stops")
+    parser.add_argument("--services", type=int, help="number of services")
+    parser.add_argument("--route-length", type=int, default=35,
+                        help="mean stops on a route")
+    parser.add_argument("--loops", type=float, default=0.15,
+                        help="fraction of loop services")
+    parser.add_argument("--spread", type=float,
+                        help="width of the area in km")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the network")
+    args = parser.parse_args()
+
+    stops = args.stops or round(5000 * args.scale)
+    services = args.services or round(400 * args.scale)
+    spread = args.spread or 40.0 * math.sqrt(stops / 5000)
+    generate(args.output, stops=stops, services=services,
+             route_length=args.route_length, loops=args.loops,
+             spread=spread, seed=args.seed)
+    print(f"Wrote {stops} stops and {services} services to {args.output}")
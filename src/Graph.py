@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import json
-import os
+from collections import Counter
+from typing import Mapping, Optional
 
 import config
-from bus import BusStop, retrieve_all_bus_stops
+from bus import BusStop, find_all_bus_connections, retrieve_all_bus_stops
+from datastore import Datastore
+from GraphCache import CompactAdjacency, load_graph_cache, save_graph_cache
+from GraphUpdate import Routes, patch_adjacency, read_stop_codes
 
 
 class Graph:
@@ -14,16 +18,21 @@ class Graph:
 
     Attributes:
 
-        - stops_graph (dict): Stored similar to an adjacency list.
+        - stops_graph (Mapping): Stored similar to an adjacency list.
             Each stop is connected to all stop that can be reached directly.
+            A dict when built, a read-only CompactAdjacency when loaded from
+            the cache; keyed by BusStop either way.
 
     Methods:
 
         - insert(origin_stop, end_stop): Insert an edge into graph.
         - create_graph([cache]): Create graph, and store it as an attribute
+        - update_graph(old_routes, new_routes[, cache]): Patch the graph
+            for changed bus routes
         - json_graph(): return json of the graph
         - serialise(fp): Serialise it as json in a file
         - deserialise(fp): deserialise data from a file
+        - reverse_graph(): stops that reach each stop directly
         - search_path(start, end): find a possible path
     """
 
@@ -36,6 +45,13 @@ class Graph:
             value: List of destination reachable from bus stop
         """
         self.stops_graph = graph if graph is not None else {}
+        # origin stops whose list insert() copied, None until it copies the
+        # mapping, as other graphs may share it and its lists
+        self.__copied: Optional[set[BusStop]] = None
+        # (reverse adjacency, whether every destination is a key), built on
+        # first use
+        self.__reverse: Optional[tuple[dict[BusStop, list[BusStop]],
+                                       bool]] = None
 
     def __repr__(self) -> str:
         return str(self.stops_graph)
@@ -47,46 +63,109 @@ class Graph:
         """
         Insert an edge into the graph.
 
+        The mapping, and the list of origin_stop, are copied before they are
+        first changed, as the graph may share them with the resident graph
+        read by other searches. A graph loaded from the cache is read-only.
+
         Args:
             origin_stop (BusStop): starting bus stop
             end_stop (BusStop): ending bus stop
         """
-        if origin_stop not in self.stops_graph:
-            self.stops_graph[origin_stop] = [end_stop]
-        else:
-            self.stops_graph[origin_stop].append(end_stop)
-
-    def create_graph(self, cache: bool = True) -> dict[BusStop, list[BusStop]]:
+        if self.__copied is None:
+            self.stops_graph = dict(self.stops_graph.items())
+            self.__copied = set()
+        self.__reverse = None
+        if origin_stop not in self.__copied:
+            self.stops_graph[origin_stop] = list(
+                self.stops_graph.get(origin_stop, ()))
+            self.__copied.add(origin_stop)
+        self.stops_graph[origin_stop].append(end_stop)
+
+    def create_graph(self,
+                     cache: bool = True) -> Mapping[BusStop, list[BusStop]]:
         """
         Create and store graph.
 
         Args:
             cache (bool, optional):
                 Whether to use cached result. Recreate graph if unavailable
-                and save it.
+                or built from another database, and save it.
                 Defaults to True.
 
         Returns:
-            dictionary:
+            Mapping:
                 key: origin BusStop,
                 value: List of destination BusS reachable from BusStop
         """
+        dataset_hash = Datastore().get_dataset_hash()
+
         # Try to read file from cache
-        if cache and os.path.isfile(config.graph_path):
-            with open(config.graph_path, "r") as f:
-                self.stops_graph = json.load(f)
-            return self.stops_graph
-        print('cache unavailable')
-
-        # Generating new graph
-        bus_stops = retrieve_all_bus_stops()
-        for bus_stop in bus_stops.values():
-            stops = bus_stop.find_bus_connection()
-            if len(stops) != 0:
-                for stop in stops:
-                    self.insert(bus_stop, stop)
-            else:
-                self.stops_graph[bus_stop] = []
+        if cache:
+            adjacency = load_graph_cache(config.graph_path, dataset_hash)
+            if adjacency is not None:
+                self.stops_graph = adjacency
+                self.__copied = None
+                self.__reverse = None
+                return self.stops_graph
+            print('cache unavailable')
+
+        # Generating new graph from a single scan of the bus routes
+        self.__copied = None
+        self.__reverse = None
+        connections = find_all_bus_connections()
+        self.stops_graph = {}
+        for bus_stop in retrieve_all_bus_stops().values():
+            self.stops_graph[bus_stop] = connections.get(bus_stop, [])
+
+        if cache:
+            save_graph_cache(config.graph_path,
+                             CompactAdjacency.from_graph(self.stops_graph),
+                             dataset_hash)
+        return self.stops_graph
+
+    def update_graph(self, old_routes: Routes, new_routes: Routes,
+                     cache: bool = True) -> Mapping[BusStop, list[BusStop]]:
+        """
+        Patch the graph, built from old_routes, for the current database.
+
+        Only the connections of the stops on the changed routes are
+        recomputed, see GraphUpdate.
+
+        Args:
+            old_routes (Routes): routes the graph was built from
+            new_routes (Routes): routes of the current database
+            cache (bool, optional):
+                Whether to use the cached result if it is already built
+                from the current database, and save the patched graph.
+                Defaults to True.
+
+        Returns:
+            Mapping:
+                key: origin BusStop,
+                value: List of destination BusS reachable from BusStop
+        """
+        dataset_hash = Datastore().get_dataset_hash()
+
+        if cache:
+            adjacency = load_graph_cache(config.graph_path, dataset_hash)
+            if adjacency is not None:
+                self.stops_graph = adjacency
+                self.__copied = None
+                self.__reverse = None
+                return self.stops_graph
+
+        self.__copied = None
+        self.__reverse = None
+        adjacency = self.stops_graph
+        if not isinstance(adjacency, CompactAdjacency):
+            adjacency = CompactAdjacency.from_graph(adjacency)
+        self.stops_graph, _ = patch_adjacency(
+            adjacency, old_routes, new_routes,
+            read_stop_codes(Datastore().get_connection()))
+
+        if cache:
+            save_graph_cache(config.graph_path, self.stops_graph,
+                             dataset_hash)
         return self.stops_graph
 
     def json_graph(self) -> dict[str, list[str]]:
@@ -121,11 +200,42 @@ class Graph:
                         [BusStop.from_bus_code(val) for val in vals]
                         for k, vals in json_graph.items()})
 
+    def reverse_graph(self) -> dict[BusStop, list[BusStop]]:
+        """Stops that reach each stop directly, built on first use.
+
+        Returns:
+            dict: BusStop: list of BusStop with an edge to it, once for
+                each edge
+        """
+        return self.__reverse_graph()[0]
+
+    def __reverse_graph(self) -> tuple[dict[BusStop, list[BusStop]], bool]:
+        reverse = self.__reverse
+        if reverse is None:
+            graph = {}
+            for origin_stop, end_stops in self.stops_graph.items():
+                for end_stop in end_stops:
+                    graph.setdefault(end_stop, []).append(origin_stop)
+            complete = all(stop in self.stops_graph for stop in graph)
+            reverse = self.__reverse = (graph, complete)
+        return reverse
+
     def search_path(self, start: BusStop, end: BusStop) -> list[list[BusStop]]:
-        """Find a possible path. (Breadth-First)
+        """Find a possible path. (Bidirectional Breadth-First)
 
         Interested in only the connection and not the exact service to take.
 
+        Gives the paths of a breadth-first search from start that keeps the
+        first path to each stop, in its order. Every stop searched with an
+        edge to end gives a solution for each such edge. The search takes
+        every path of up to 3 stops once there is a solution, and past
+        that stops at the first stop with a solution.
+
+        The stops with an edge to end, and to those, are found from the
+        reverse graph, so a stop is only expanded when the stops after it
+        are needed. Paths are kept as parent pointers and only copied for
+        the solutions.
+
         Args:
             start (BusStop): Starting bus stop.
             end (BusStop): Ending bus stop.
@@ -133,34 +243,74 @@ class Graph:
         Returns:
             list[list[BusStop]]: Lists of path list
         """
-        solutions = []
+        if start not in self.stops_graph:
+            # Attempt to find connection in case of corrupt data.
+            self.reconnecting_stop(start)
+        reverse, complete = self.__reverse_graph()
+        # stop: number of edges to end
+        into_end = Counter(reverse.get(end, ()))
+        # stops with an edge to one of those
+        into_into_end = {origin_stop for stop in into_end
+                         for origin_stop in reverse.get(stop, ())}
+
+        # the search tree: entry i is stops[i], reached from entry parents[i]
+        stops, parents = [start], [-1]
+        # start is not marked, as before, so a path can come back to it
         visited = set()
-        to_visit = [[start]]
-
-        while to_visit:  # still got paths to check.
-            current_path = to_visit.pop(0)
-            cur_path_last_stop = current_path[-1]
-
-            # terminate search early when there's a solution and
-            # current path has more than 3 transfers.
-            if solutions and len(current_path) > 3:
+        solutions = []
+        level, depth = [0], 0
+        while level:
+            for i in level:
+                stop = stops[i]
+                if i and stop not in self.stops_graph:
+                    self.reconnecting_stop(stop)
+                    into_end[stop] = self.stops_graph.get(stop, []).count(end)
+                if into_end.get(stop):
+                    path = self.__tree_path(stops, parents, i)
+                    solutions.extend(path + [end]
+                                     for _ in range(into_end[stop]))
+                    if depth >= 3:
+                        return solutions
+            if solutions and depth >= 2:
+                # every path of up to 3 stops has been taken
                 return solutions
 
-            # Check for valid stops in the current path.
-            if cur_path_last_stop not in self.stops_graph:
-                # Attempt to find connection in case of corrupt data.
-                self.reconnecting_stop(cur_path_last_stop)
-
-            # iterating through each connections
-            for node in self.stops_graph.get(cur_path_last_stop, []):
-                if node not in visited:
-                    to_visit.append(current_path + [node])
-                    visited.add(node)
-                if node == end:
-                    solutions.append(current_path + [node])
+            if depth >= 2 and complete:
+                # only the first stop of the next level with an edge to end
+                # is needed. It is new, as every stop seen so far has been
+                # searched without a solution.
+                for i in level:
+                    if stops[i] not in into_into_end:
+                        continue
+                    for stop in self.stops_graph.get(stops[i], []):
+                        if stop in into_end:
+                            path = self.__tree_path(stops, parents, i)
+                            return [path + [stop, end]
+                                    for _ in range(into_end[stop])]
+
+            next_level = []
+            for i in level:
+                for stop in self.stops_graph.get(stops[i], []):
+                    if stop not in visited:
+                        visited.add(stop)
+                        stops.append(stop)
+                        parents.append(i)
+                        next_level.append(len(stops) - 1)
+            level, depth = next_level, depth + 1
 
         return solutions
 
+    @staticmethod
+    def __tree_path(stops: list[BusStop], parents: list[int],
+                    i: int) -> list[BusStop]:
+        """Path of the search tree from the start to entry i."""
+        path = []
+        while i >= 0:
+            path.append(stops[i])
+            i = parents[i]
+        path.reverse()
+        return path
+
     def reconnecting_stop(self, origin_stop: BusStop):
         """Find the connections for a stop.
 
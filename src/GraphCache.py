@@ -0,0 +1,203 @@
+"""
+Binary cache of the bus stop graph.
+
+The graph is stored in compressed sparse row (CSR) layout with integer
+stop ids, so it can be memory mapped instead of parsed.
+
+File layout (little endian):
+
+    header      magic, format version, dataset hash, stop count, edge count,
+                size of the stop code table
+    stop codes  bus stop codes joined by newlines, padded to 4 bytes
+    offsets     uint32[stop count + 1], edges of stop i are
+                neighbours[offsets[i]:offsets[i + 1]]
+    neighbours  uint32[edge count], stop ids
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator, Mapping, Optional
+
+from bus import BusStop
+
+MAGIC = b"BUSGRAPH"
+VERSION = 1
+HEADER = struct.Struct("<8sI32sIII")
+
+
+class CompactAdjacency(Mapping[BusStop, list[BusStop]]):
+    """
+    Read-only adjacency list backed by CSR arrays.
+
+    Attributes:
+
+        + codes (tuple): bus stop code of each stop id
+        + ids (dict): bus_stop_code: stop id
+        + offsets (Sequence[int]): start of the edges of each stop id
+        + neighbours (Sequence[int]): stop id of each edge
+
+    Methods:
+
+        + neighbour_ids(stop_id): stop ids directly reachable from a stop id
+        + stop(stop_id): BusStop of a stop id
+    """
+
+    def __init__(self, codes: tuple[str, ...], offsets, neighbours,
+                 buffer: Optional[mmap.mmap] = None) -> None:
+        self.codes = codes
+        self.ids = {code: i for i, code in enumerate(codes)}
+        self.offsets = offsets
+        self.neighbours = neighbours
+        # keep the mapped file alive as long as the arrays are in use
+        self._buffer = buffer
+        self._stops: list[Optional[BusStop]] = [None] * len(codes)
+
+    def __getitem__(self, bus_stop: BusStop) -> list[BusStop]:
+        stop_id = self.ids[bus_stop.bus_stop_code]
+        return [self.stop(i) for i in self.neighbour_ids(stop_id)]
+
+    def __contains__(self, bus_stop: object) -> bool:
+        return getattr(bus_stop, "bus_stop_code", None) in self.ids
+
+    def __iter__(self) -> Iterator[BusStop]:
+        return (self.stop(i) for i in range(len(self.codes)))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __repr__(self) -> str:
+        return f"CompactAdjacency({len(self.codes)} stops, " \
+            f"{len(self.neighbours)} edges)"
+
+    def neighbour_ids(self, stop_id: int):
+        """Stop ids directly reachable from a stop id.
+
+        Args:
+            stop_id (int): the stop id
+
+        Returns:
+            Sequence[int]: stop ids of the connected stops
+        """
+        return self.neighbours[self.offsets[stop_id]:
+                               self.offsets[stop_id + 1]]
+
+    def stop(self, stop_id: int) -> BusStop:
+        """BusStop of a stop id.
+
+        Args:
+            stop_id (int): the stop id
+
+        Returns:
+            BusStop: the bus stop
+        """
+        bus_stop = self._stops[stop_id]
+        if bus_stop is None:
+            bus_stop = BusStop.from_bus_code(self.codes[stop_id])
+            self._stops[stop_id] = bus_stop
+        return bus_stop
+
+    @classmethod
+    def from_graph(cls, graph: Mapping[BusStop, list[BusStop]]
+                   ) -> "CompactAdjacency":
+        """Convert an adjacency list to CSR arrays.
+
+        Args:
+            graph (Mapping): BusStop: list of BusStop
+
+        Returns:
+            CompactAdjacency: the same graph in CSR layout
+        """
+        stops = list(graph)
+        ids = {stop.bus_stop_code: i for i, stop in enumerate(stops)}
+        # destinations missing as keys still need an id
+        for ends in graph.values():
+            for end in ends:
+                if end.bus_stop_code not in ids:
+                    ids[end.bus_stop_code] = len(stops)
+                    stops.append(end)
+
+        offsets = array("I", [0])
+        neighbours = array("I")
+        for stop in stops:
+            neighbours.extend(ids[end.bus_stop_code]
+                              for end in graph.get(stop, []))
+            offsets.append(len(neighbours))
+
+        adjacency = cls(tuple(stop.bus_stop_code for stop in stops),
+                        offsets, neighbours)
+        adjacency._stops = stops
+        return adjacency
+
+
+def save_graph_cache(fp: str, adjacency: CompactAdjacency,
+                     dataset_hash: str) -> None:
+    """Write the graph cache, replacing any existing file atomically.
+
+    Args:
+        fp (str): filepath of the cache
+        adjacency (CompactAdjacency): the graph to save
+        dataset_hash (str): hex digest of the database it was built from
+    """
+    code_table = "\n".join(adjacency.codes).encode()
+    code_table += b"\0" * (-len(code_table) % 4)
+    offsets = array("I", adjacency.offsets)
+    neighbours = array("I", adjacency.neighbours)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        neighbours.byteswap()
+
+    tmp_fp = f"{fp}.{os.getpid()}.tmp"
+    with open(tmp_fp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, bytes.fromhex(dataset_hash),
+                            len(adjacency.codes), len(neighbours),
+                            len(code_table)))
+        f.write(code_table)
+        offsets.tofile(f)
+        neighbours.tofile(f)
+    os.replace(tmp_fp, fp)
+
+
+def load_graph_cache(fp: str, dataset_hash: str
+                     ) -> Optional[CompactAdjacency]:
+    """Memory map the graph cache.
+
+    Args:
+        fp (str): filepath of the cache
+        dataset_hash (str): hex digest of the current database
+
+    Returns:
+        CompactAdjacency: the cached graph, or None if the file is missing,
+            of another format version or built from another database.
+    """
+    if not os.path.isfile(fp) or os.path.getsize(fp) < HEADER.size:
+        return None
+    with open(fp, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, file_hash, n_stops, n_edges, table_size = \
+        HEADER.unpack_from(buffer)
+    if (magic != MAGIC or version != VERSION
+            or file_hash != bytes.fromhex(dataset_hash)
+            or len(buffer) != HEADER.size + table_size
+            + 4 * (n_stops + 1 + n_edges)):
+        buffer.close()
+        return None
+
+    start = HEADER.size
+    codes = tuple(buffer[start:start + table_size].rstrip(b"\0")
+                  .decode().split("\n")) if n_stops else ()
+    start += table_size
+    view = memoryview(buffer)[start:]
+    if sys.byteorder == "little":
+        words = view.cast("I")
+    else:
+        words = array("I")
+        words.frombytes(view)
+        words.byteswap()
+        buffer = None
+    return CompactAdjacency(codes, words[:n_stops + 1], words[n_stops + 1:],
+                            buffer=buffer)
@@ -0,0 +1,214 @@
+"""
+Patch the bus stop graph when the bus routes change.
+
+A stop connects to every stop after it on each route through it, so only
+the stops on a changed route have different connections. The graph of the
+new database is the old graph with the connections of those stops
+recomputed, in the same order as Graph.create_graph() would build them.
+
+Usage (from the project root), to patch the graph cache of OLD_DB for the
+current database:
+    python src/GraphUpdate.py OLD_DB [--db PATH] [--graph PATH]
+"""
+from __future__ import annotations
+
+import sqlite3
+import sys
+from array import array
+from typing import Iterable, Optional
+
+from datastore import Datastore, SQLcmds
+from GraphCache import CompactAdjacency, load_graph_cache, save_graph_cache
+
+# (service_no, direction): bus stop codes ordered by stop sequence
+Routes = dict[tuple[str, int], tuple[str, ...]]
+
+
+def read_routes(conn: sqlite3.Connection) -> Routes:
+    """The bus routes of a database.
+
+    Args:
+        conn (sqlite3.Connection): connection to the database
+
+    Returns:
+        dict: (service_no, direction): bus stop codes ordered by stop
+            sequence, in the order of Graph.create_graph()
+    """
+    routes: dict[tuple[str, int], list[str]] = {}
+    for service_no, direction, _, bus_stop_code, _ in conn.execute(
+            SQLcmds["get_all_bus_routes"]):
+        routes.setdefault((service_no, direction), []).append(bus_stop_code)
+    return {key: tuple(codes) for key, codes in routes.items()}
+
+
+def read_stop_codes(conn: sqlite3.Connection) -> list[str]:
+    """Bus stop codes of a database, in the order of Graph.create_graph().
+
+    Args:
+        conn (sqlite3.Connection): connection to the database
+
+    Returns:
+        list: the bus stop codes
+    """
+    return [row[0] for row in conn.execute(
+        'SELECT "bus_stop_code" FROM "bus_stops" ORDER BY rowid;')]
+
+
+def changed_routes(old_routes: Routes, new_routes: Routes,
+                   changed_stops: Iterable[str] = ()
+                   ) -> set[tuple[str, int]]:
+    """The routes that differ between two route tables.
+
+    Args:
+        old_routes (dict): routes before, see read_routes()
+        new_routes (dict): routes after
+        changed_stops (Iterable, optional): bus stop codes added or removed,
+            the routes through them connect different stops.
+
+    Returns:
+        set: (service_no, direction) added, removed or changed
+    """
+    changed = {key for key in old_routes.keys() | new_routes.keys()
+               if old_routes.get(key) != new_routes.get(key)}
+    changed_stops = set(changed_stops)
+    if changed_stops:
+        changed.update(key for key, codes in new_routes.items()
+                       if not changed_stops.isdisjoint(codes))
+    return changed
+
+
+def route_ids(codes: tuple[str, ...], stop_ids: dict[str, int]
+              ) -> tuple[list[int], dict[str, int]]:
+    """Stop ids of a route, and where each stop is first visited.
+
+    A stop connects to the stops after its first visit, as in
+    find_all_bus_connections(), so its connections on the route are
+    ids[first[bus_stop_code] + 1:].
+
+    Args:
+        codes (tuple): bus stop codes of the route
+        stop_ids (dict): bus_stop_code: stop id, of the stops with a record
+
+    Returns:
+        tuple: (stop ids of the stops with a record, bus_stop_code: position
+            of its first visit in the stop ids)
+    """
+    ids: list[int] = []
+    first: dict[str, int] = {}
+    for code in codes:
+        stop_id = stop_ids.get(code)
+        if stop_id is None:
+            continue  # stops without a record (e.g. 'CTE') cannot be reached
+        first.setdefault(code, len(ids))
+        ids.append(stop_id)
+    return ids, first
+
+
+def patch_adjacency(adjacency: CompactAdjacency, old_routes: Routes,
+                    new_routes: Routes, stop_codes: list[str]
+                    ) -> tuple[CompactAdjacency, int]:
+    """The graph of the new routes, patched from the graph of the old.
+
+    Args:
+        adjacency (CompactAdjacency): graph of the old routes
+        old_routes (dict): routes the graph was built from
+        new_routes (dict): routes to patch the graph to
+        stop_codes (list): bus stop codes of the new database
+
+    Returns:
+        tuple: (the patched graph, number of stops whose connections were
+            recomputed)
+    """
+    old_ids = adjacency.ids
+    stop_ids = {code: i for i, code in enumerate(stop_codes)}
+    changed_stops = old_ids.keys() ^ stop_ids.keys()
+    affected = set(changed_stops)
+    for key in changed_routes(old_routes, new_routes, changed_stops):
+        affected.update(old_routes.get(key, ()))
+        affected.update(new_routes.get(key, ()))
+    affected.intersection_update(stop_ids)
+
+    # routes through each affected stop, in the order they are scanned
+    routes_at: dict[str, list[tuple[list[int], dict[str, int]]]] = \
+        {code: [] for code in affected}
+    for codes in new_routes.values():
+        if affected.isdisjoint(codes):
+            continue
+        route = route_ids(codes, stop_ids)
+        for code in route[1]:
+            if code in routes_at:
+                routes_at[code].append(route)
+
+    # old stop id: new stop id, when the stops changed
+    remap = None
+    if list(adjacency.codes) != stop_codes:
+        remap = [stop_ids.get(code, 0) for code in adjacency.codes]
+    old_offsets, old_neighbours = adjacency.offsets, adjacency.neighbours
+    offsets = array("I", [0])
+    neighbours = array("I")
+    for code in stop_codes:
+        if code in affected:
+            for ids, first in routes_at[code]:
+                neighbours.extend(ids[first[code] + 1:])
+        else:
+            old_id = old_ids[code]
+            edges = old_neighbours[old_offsets[old_id]:
+                                   old_offsets[old_id + 1]]
+            neighbours.extend(edges if remap is None
+                              else map(remap.__getitem__, edges))
+        offsets.append(len(neighbours))
+
+    return CompactAdjacency(tuple(stop_codes), offsets, neighbours), \
+        len(affected)
+
+
+def update_graph_cache(cache_path: str, old_db_path: str,
+                       new_db_path: str) -> Optional[int]:
+    """Patch the graph cache of one database for another.
+
+    Args:
+        cache_path (str): filepath of the graph cache
+        old_db_path (str): database the cache was built from
+        new_db_path (str): database to patch the cache for
+
+    Returns:
+        int: number of stops whose connections were recomputed, None if
+            the cache was not built from the old database.
+    """
+    adjacency = load_graph_cache(cache_path,
+                                 Datastore.file_hash(old_db_path))
+    if adjacency is None:
+        return None
+    old_conn, new_conn = sqlite3.connect(old_db_path), \
+        sqlite3.connect(new_db_path)
+    try:
+        patched, affected = patch_adjacency(
+            adjacency, read_routes(old_conn), read_routes(new_conn),
+            read_stop_codes(new_conn))
+    finally:
+        old_conn.close()
+        new_conn.close()
+    save_graph_cache(cache_path, patched, Datastore.file_hash(new_db_path))
+    return affected
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import config
+
+    parser = argparse.ArgumentParser(
+        description="Patch the graph cache of a database for another.")
+    parser.add_argument("old_db", help="database the cache was built from")
+    parser.add_argument("--db", default=config.db_path,
+                        help="database to patch the cache for")
+    parser.add_argument("--graph", default=config.graph_path,
+                        help="path of the graph cache")
+    args = parser.parse_args()
+
+    affected = update_graph_cache(args.graph, args.old_db, args.db)
+    if affected is None:
+        print(f"{args.graph} was not built from {args.old_db}",
+              file=sys.stderr)
+        sys.exit(1)
+    print(f"Recomputed the connections of {affected} stops")
@@ -0,0 +1,174 @@
+"""Path searches run on a bounded pool of worker threads."""
+from __future__ import annotations
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from webui import ProcessStatus
+
+
+class Job:
+    """
+    A search submitted to the JobManager.
+
+    Attributes:
+
+        + job_id (str): id to look the job up with
+        + process_status (ProcessStatus): progress of the job
+        + request (Any): request the job is for, e.g. PathSummaryRequest
+        + created (float): time the job was submitted
+        + finished (float): time the job finished, None if it has not
+        + error (Exception): exception the job failed with, None if it
+            did not
+    """
+
+    def __init__(self, request: Any) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.process_status = ProcessStatus()
+        self.request = request
+        self.created = time.monotonic()
+        self.finished: Optional[float] = None
+        self.error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+
+class JobManager:
+    """
+    Run searches on a fixed number of worker threads.
+
+    Each job gets its own ProcessStatus, so concurrent searches do not
+    overwrite each other, marked done once the job is finished. Finished
+    jobs are forgotten after ttl seconds.
+
+    Attributes:
+
+        + max_workers (int): jobs run at the same time
+        + max_queue (int): jobs waiting to run before submit() refuses more
+        + ttl (float): seconds a finished job is kept
+
+    Methods:
+
+        + submit(request, target, *args): Run target(job, *args) on a worker.
+        + get(job_id): The job with the id.
+        + expire(): Forget finished jobs older than ttl.
+        + queue_depth: Number of jobs waiting for a worker.
+        + metrics(): Counts of the jobs.
+        + shutdown(): Stop the workers.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32,
+                 ttl: float = 600) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers,
+                                             thread_name_prefix="search")
+        self.__jobs: dict[str, Job] = {}
+        self.__lock = Lock()
+        self.__pending = 0
+        self.__running = 0
+        self.__completed = 0
+        self.__failed = 0
+        self.__rejected = 0
+
+    def submit(self, request: Any, target: Callable[..., None],
+               *args) -> Job:
+        """Run target(job, *args) on a worker thread.
+
+        Args:
+            request (Any): request the job is for
+            target (Callable): function doing the search
+
+        Raises:
+            RuntimeError: max_queue jobs are already waiting.
+
+        Returns:
+            Job: the submitted job
+        """
+        self.expire()
+        job = Job(request)
+        with self.__lock:
+            if self.__pending >= self.max_queue:
+                self.__rejected += 1
+                raise RuntimeError("Too many searches waiting")
+            self.__pending += 1
+            self.__jobs[job.job_id] = job
+        self.__executor.submit(self.__run, job, target, args)
+        return job
+
+    def __run(self, job: Job, target: Callable[..., None],
+              args: tuple) -> None:
+        with self.__lock:
+            self.__pending -= 1
+            self.__running += 1
+        try:
+            target(job, *args)
+        except Exception as e:
+            job.error = e
+            job.process_status.set_status("Search failed", main_status=True)
+        finally:
+            job.finished = time.monotonic()
+            with self.__lock:
+                self.__running -= 1
+                if job.error is None:
+                    self.__completed += 1
+                else:
+                    self.__failed += 1
+            # last, so a client told the job is done finds its result
+            job.process_status.status_done = True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """The job with the id.
+
+        Args:
+            job_id (str): id of the job
+
+        Returns:
+            Job: the job, None if there is none or it has expired.
+        """
+        self.expire()
+        return self.__jobs.get(job_id)
+
+    def expire(self) -> int:
+        """Forget finished jobs older than ttl.
+
+        Returns:
+            int: number of jobs forgotten.
+        """
+        cutoff = time.monotonic() - self.ttl
+        with self.__lock:
+            expired = [job_id for job_id, job in self.__jobs.items()
+                       if job.done and job.finished < cutoff]
+            for job_id in expired:
+                del self.__jobs[job_id]
+        return len(expired)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self.__pending
+
+    def metrics(self) -> dict[str, int]:
+        """Counts of the jobs.
+
+        Returns:
+            dict: queue_depth, running, completed, failed, rejected and
+                the number of jobs kept.
+        """
+        with self.__lock:
+            return {"queue_depth": self.__pending,
+                    "running": self.__running,
+                    "completed": self.__completed,
+                    "failed": self.__failed,
+                    "rejected": self.__rejected,
+                    "jobs": len(self.__jobs), }
+
+    def shutdown(self) -> None:
+        """Stop the workers once the jobs submitted finish."""
+        self.__executor.shutdown(wait=False)
@@ -0,0 +1,207 @@
+"""Per-stage spans of a search, aggregated into Prometheus histograms."""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Iterable, Optional
+
+from datastore import Datastore
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+ds = Datastore()
+
+
+class Span:
+    """
+    The work of one stage of a request.
+
+    Used as a context manager, which can be entered many times, so a stage
+    run once per candidate adds up to one span.
+
+    Attributes:
+
+        + stage (str): name of the stage
+        + duration (float): seconds spent in the stage
+        + sql (int): SQL statements run in the stage, by this thread
+        + candidates (int): items the stage produced, set by the caller
+        + calls (int): times the stage was entered
+
+    Methods:
+
+        + to_dict(): The span as a dict.
+    """
+    __slots__ = ("stage", "duration", "sql", "candidates", "calls",
+                 "__start", "__statements")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.duration = 0.0
+        self.sql = 0
+        self.candidates = 0
+        self.calls = 0
+
+    def __enter__(self) -> "Span":
+        self.__statements = ds.request_stats()["statements_run"]
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.duration += time.perf_counter() - self.__start
+        self.sql += ds.request_stats()["statements_run"] - self.__statements
+        self.calls += 1
+
+    def __repr__(self) -> str:
+        return f"Span({self.stage}, {self.duration:.4f}s)"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"stage": self.stage,
+                "duration": round(self.duration, 6),
+                "sql": self.sql,
+                "candidates": self.candidates,
+                "calls": self.calls, }
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus layout.
+
+    Attributes:
+
+        + buckets (tuple): upper bounds of the buckets, ascending
+        + counts (list): observations in each bucket, and past the last
+        + sum (float): total of the observations
+        + count (int): number of observations
+
+    Methods:
+
+        + observe(value): Add an observation.
+    """
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    Histograms of the spans of every search, for the whole process.
+
+    Attributes:
+
+        + HISTOGRAMS (dict): metric name: (help, buckets, span attribute)
+
+    Methods:
+
+        + record(span): Add a span to the histograms.
+        + render(counters, gauges): The metrics in the Prometheus text
+            format.
+        + clear(): Forget every observation.
+    """
+    __instance = None
+    HISTOGRAMS = {
+        "search_stage_seconds": (
+            "Seconds spent in each stage of a search.",
+            SECONDS_BUCKETS, "duration"),
+        "search_stage_sql_statements": (
+            "SQL statements run in each stage of a search.",
+            COUNT_BUCKETS, "sql"),
+        "search_stage_candidates": (
+            "Paths or journeys found in each stage of a search.",
+            COUNT_BUCKETS, "candidates"),
+    }
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = object.__new__(cls)
+            cls.__instance.__lock = Lock()
+            # (metric name, stage): Histogram
+            cls.__instance.__histograms = {}
+        return cls.__instance
+
+    def record(self, span: Span) -> None:
+        """Add a span to the histograms.
+
+        Args:
+            span (Span): the finished span
+        """
+        with self.__lock:
+            for name, (_, buckets, attribute) in self.HISTOGRAMS.items():
+                histogram = self.__histograms.get((name, span.stage))
+                if histogram is None:
+                    histogram = self.__histograms[(name, span.stage)] = \
+                        Histogram(buckets)
+                histogram.observe(getattr(span, attribute))
+
+    def clear(self) -> None:
+        """Forget every observation."""
+        with self.__lock:
+            self.__histograms.clear()
+
+    def render(self, counters: Optional[dict[str, dict[str, int]]] = None,
+               gauges: Optional[dict[str, dict[str, int]]] = None) -> str:
+        """The metrics in the Prometheus text format.
+
+        Args:
+            counters (dict, optional): name prefix: dict of name: value,
+                totals that only go up, e.g. {"db": Datastore().stats()}.
+                Exposed with a _total suffix, for rate().
+            gauges (dict, optional): name prefix: dict of name: value,
+                counts that go up and down, e.g. {"search_jobs":
+                {"running": 1}}
+
+        Returns:
+            str: the exposition text
+        """
+        lines = []
+        with self.__lock:
+            for name, (help_text, buckets, _) in self.HISTOGRAMS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, stage), histogram in \
+                        sorted(self.__histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float("inf"),),
+                                            histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else bound
+                        lines.append(f'{name}_bucket{{stage="{stage}",'
+                                     f'le="{le}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} '
+                                 f'{histogram.sum}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} '
+                                 f'{histogram.count}')
+        for prefix, values in (counters or {}).items():
+            for name, value in values.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+        for prefix, values in (gauges or {}).items():
+            for name, value in values.items():
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def record_span(span: Span, process_status=None) -> None:
+    """Add a span to the histograms, and to the spans of a request.
+
+    Args:
+        span (Span): the finished span
+        process_status (ProcessStatus, optional): status of the request
+    """
+    Metrics().record(span)
+    if process_status is not None:
+        process_status.add_span(span)
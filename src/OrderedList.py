@@ -1,7 +1,10 @@
 """Data structure and Algorithm to help with sorting."""
 
 
-from typing import Dict, Iterable, Sequence, TypeVar
+from bisect import bisect_right
+from heapq import merge
+from itertools import accumulate, chain
+from typing import Any, Dict, Iterable, Sequence, TypeVar, Union
 
 _KT = TypeVar('_KT')
 _VT = TypeVar('_VT', str, int)
@@ -12,17 +15,31 @@ class OrderedList(Sequence[Dict[_KT, _VT]]):
     Ensure that data is always ordered to help insert data quickly
     via binary search.
 
-    Contains a list of iterables
+    Contains a list of iterables, kept in blocks of at most 2 * load
+    items. An insert binary searches the block, then the position in it,
+    so only one small block is shifted instead of the whole list.
+
+    Items with equal keys stay in the order they were inserted.
     """
 
-    def __init__(self, index: _KT) -> None:
+    load = 1000  # items per block, a block is split at twice this
+
+    def __init__(self, index: Union[_KT, tuple[_KT, ...]]) -> None:
         """Initialise the list with a criteria to sort by.
 
         Args:
-            index (str/int): The index/criteria to sort the list by.
+            index (str/int/tuple): The index/criteria to sort the list by.
+                A tuple sorts by each index in turn, e.g.
+                ("transfer", "dist") sorts by transfer, then by dist.
         """
-        self.__data: list[Dict[_KT, _VT]] = []
-        self.index: _KT = index
+        self.index = index
+        # blocks of items, their keys, and the last key of each block
+        self.__blocks: list[list[Dict[_KT, _VT]]] = []
+        self.__keys: list[list[Any]] = []
+        self.__maxes: list[Any] = []
+        # number of items before each block, None when out of date
+        self.__offsets: Union[list[int], None] = None
+        self.__len = 0
 
     def __repr__(self) -> str:
         """
@@ -32,7 +49,7 @@ class OrderedList(Sequence[Dict[_KT, _VT]]):
             str: Shows data it is initialised with
 
         """
-        return str(self.__data)
+        return str(self.data)
 
     def __str__(self) -> str:
         """
@@ -42,34 +59,65 @@ class OrderedList(Sequence[Dict[_KT, _VT]]):
             str: Shows data it is initialised with
 
         """
-        return str(self.__data)
+        return str(self.data)
 
-    def __getitem__(self, index: int) -> Dict[_KT, _VT]:
+    def __getitem__(self, index: Union[int, slice]) -> Dict[_KT, _VT]:
         """
         Get item of the OrderedList at a specified index.
 
         Args:
-            index (int): Index position in data.
+            index (int/slice): Index position in data.
 
         Returns:
             dictionary/iterable: A single element in the data.
 
         """
-        return self.__data[index]
+        if isinstance(index, slice):
+            return self.data[index]
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError("OrderedList index out of range")
+        if self.__offsets is None:
+            self.__offsets = list(accumulate(
+                (len(block) for block in self.__blocks[:-1]), initial=0))
+        block = bisect_right(self.__offsets, index) - 1
+        return self.__blocks[block][index - self.__offsets[block]]
+
+    def __iter__(self):
+        return chain.from_iterable(self.__blocks)
 
     def __len__(self) -> int:
         """Return the length of the data."""
-        return len(self.__data)
+        return self.__len
 
     @ property
     def data(self) -> list[Dict[_KT, _VT]]:
-        return self.__data
+        return list(self)
 
     @ data.setter
     def data(self, datas: Iterable) -> None:
-        self.__data.clear()
-        for data in datas:
-            self.insert(data)
+        self.clear()
+        self.extend(datas)
+
+    def key(self, value: Dict[_KT, _VT]) -> Any:
+        """The sort key of a value.
+
+        Args:
+            value (dict): a value of the list.
+
+        Returns:
+            Any: value[index], or a tuple of them for a tuple index.
+        """
+        if isinstance(self.index, tuple):
+            return tuple(value[index] for index in self.index)
+        return value[self.index]
+
+    def clear(self) -> None:
+        """Remove all the values."""
+        self.__blocks, self.__keys, self.__maxes = [], [], []
+        self.__offsets = None
+        self.__len = 0
 
     def insert(self, value: Dict[_KT, _VT]) -> None:
         """Insert value into the list.
@@ -77,20 +125,63 @@ class OrderedList(Sequence[Dict[_KT, _VT]]):
         Args:
             value (dict): the value to insert into ordered list.
         """
+        key = self.key(value)
+        self.__len += 1
+        self.__offsets = None
 
         # edge case where data is empty
-        if len(self.__data) == 0:
-            self.__data.append(value)
-
+        if not self.__blocks:
+            self.__blocks.append([value])
+            self.__keys.append([key])
+            self.__maxes.append(key)
+            return
+
+        # binary search the block, then the place in it
+        block = bisect_right(self.__maxes, key)
+        if block == len(self.__blocks):
+            block -= 1
+            self.__blocks[block].append(value)
+            self.__keys[block].append(key)
+            self.__maxes[block] = key
         else:
-            # binary search the place to insert
-            lo = 0
-            hi = len(self.__data)
-
-            while lo < hi:
-                mid = (hi + lo) // 2
-                if value[self.index] < self.__data[mid][self.index]:
-                    hi = mid
-                else:
-                    lo = mid + 1
-            self.__data.insert(hi, value)
+            keys = self.__keys[block]
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            self.__blocks[block].insert(position, value)
+
+        if len(self.__keys[block]) > 2 * self.load:
+            self.__split(block)
+
+    def __split(self, block: int) -> None:
+        """Split a block in half."""
+        values, keys = self.__blocks[block], self.__keys[block]
+        half = len(keys) // 2
+        self.__blocks[block:block + 1] = [values[:half], values[half:]]
+        self.__keys[block:block + 1] = [keys[:half], keys[half:]]
+        self.__maxes[block:block + 1] = [keys[half - 1], keys[-1]]
+
+    def extend(self, values: Iterable[Dict[_KT, _VT]]) -> None:
+        """Insert many values with a single merge.
+
+        The values are sorted, then merged with the list in one pass,
+        keeping the same order as inserting them one by one.
+
+        Args:
+            values (Iterable): the values to insert into ordered list.
+        """
+        new = sorted(((self.key(value), value) for value in values),
+                     key=lambda item: item[0])
+        if not new:
+            return
+        old = zip(chain.from_iterable(self.__keys),
+                  chain.from_iterable(self.__blocks))
+        # merge keeps the items of old first when keys are equal
+        items = list(merge(old, new, key=lambda item: item[0]))
+
+        self.clear()
+        for start in range(0, len(items), self.load):
+            chunk = items[start:start + self.load]
+            self.__keys.append([key for key, _ in chunk])
+            self.__blocks.append([value for _, value in chunk])
+            self.__maxes.append(chunk[-1][0])
+        self.__len = len(items)
@@ -0,0 +1,147 @@
+"""Graph shared by every request, reloaded when its files change."""
+from __future__ import annotations
+
+import os
+from threading import Event, Lock, Thread
+from typing import Optional
+
+import config
+from bus import BusRoute
+from datastore import Datastore, RouteIndex
+from Graph import Graph
+from GraphUpdate import Routes, read_routes
+
+
+class ResidentGraph:
+    """
+    Hold one read-only Graph for the whole process.
+
+    The graph and its version are swapped together as a single tuple, so a
+    request always sees a matching pair, and a request that started on the
+    old graph can finish on it. When the database changes, the graph is
+    patched for the routes that changed instead of rebuilt.
+
+    Attributes:
+
+        + db_path (str): database the graph is built from
+        + cache_path (str): binary graph cache
+
+    Methods:
+
+        + load(): Load the graph and make it current.
+        + current(): The current (graph, version).
+        + refresh(): Reload the graph if the database or cache changed.
+        + watch(interval): Refresh the graph in a background thread.
+        + stop(): Stop the background thread.
+    """
+
+    def __init__(self, db_path: str = config.db_path,
+                 cache_path: str = config.graph_path) -> None:
+        self.db_path = db_path
+        self.cache_path = cache_path
+        self.__current: Optional[tuple[Graph, str]] = None
+        # routes the current graph was built from
+        self.__routes: Optional[Routes] = None
+        self.__signature = None
+        self.__generation = 0
+        self.__lock = Lock()
+        self.__stopped = Event()
+
+    def signature(self) -> tuple:
+        """Size and modification time of the database and the cache.
+
+        Returns:
+            tuple: changes whenever either file changes on disk.
+        """
+        signature = []
+        for fp in (self.db_path, self.cache_path):
+            try:
+                stat = os.stat(fp)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def load(self) -> tuple[Graph, str]:
+        """Load the graph and make it current.
+
+        Returns:
+            tuple: (graph, version) that was loaded.
+        """
+        with self.__lock:
+            previous = self.__signature
+            db_changed = previous is not None \
+                and previous[0] != self.signature()[0]
+            if db_changed and config.use_route_index:
+                # the bus lookups come from the same database
+                RouteIndex().build()
+                BusRoute.reset_bus_stops()
+            routes = read_routes(Datastore().get_connection())
+            if db_changed and self.__current is not None \
+                    and self.__routes is not None:
+                graph = Graph(self.__current[0].stops_graph)
+                graph.update_graph(self.__routes, routes)
+            else:
+                graph = Graph()
+                graph.create_graph()
+            # built here rather than by the first search
+            graph.reverse_graph()
+            self.__routes = routes
+            # a rebuild rewrites the cache, so read the signature after
+            self.__signature = self.signature()
+            self.__generation += 1
+            version = (f"{self.__generation}-"
+                       f"{Datastore().get_dataset_hash()[:12]}")
+            self.__current = (graph, version)
+            return self.__current
+
+    def current(self) -> tuple[Graph, str]:
+        """The current graph and its version.
+
+        Loads the graph if it has not been loaded.
+
+        Returns:
+            tuple: (graph, version)
+        """
+        current = self.__current
+        if current is None:
+            current = self.load()
+        return current
+
+    def refresh(self) -> bool:
+        """Reload the graph if the database or the cache changed on disk.
+
+        Returns:
+            bool: Whether the graph was reloaded.
+        """
+        if self.__current is not None \
+                and self.signature() == self.__signature:
+            return False
+        self.load()
+        return True
+
+    def watch(self, interval: float) -> Thread:
+        """Refresh the graph every interval seconds in a daemon thread.
+
+        Args:
+            interval (float): seconds between checks
+
+        Returns:
+            Thread: the watching thread
+        """
+        def run() -> None:
+            while not self.__stopped.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    # keep serving the old graph
+                    print(f"graph reload failed: {e!r}")
+
+        self.__stopped.clear()
+        thread = Thread(target=run, name="graph-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """Stop the background thread started by watch()."""
+        self.__stopped.set()
@@ -0,0 +1,120 @@
+"""Bounded cache of search results."""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class ResultCache:
+    """
+    Least recently used cache, with an optional time to live.
+
+    Keys end with the dataset version they were computed on, so results of
+    an older dataset are never returned, and invalidate() drops them.
+
+    Attributes:
+
+        + maxsize (int): most results kept
+        + ttl (float): seconds a result is kept, None to keep it until it
+            is evicted
+        + hits (int): lookups answered from the cache
+        + misses (int): lookups not in the cache
+        + evictions (int): results evicted to make space
+
+    Methods:
+
+        + get(key): The result cached for key.
+        + put(key, value): Cache a result.
+        + invalidate(version): Drop results of other dataset versions.
+        + clear(): Drop every result.
+        + stats(): Hit and miss counts.
+    """
+
+    def __init__(self, maxsize: int = 256,
+                 ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__version: Optional[Hashable] = None
+        self.__data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The result cached for key.
+
+        Args:
+            key (Hashable): the query, ending with the dataset version
+
+        Returns:
+            Any: the result, None if it is not cached or has expired.
+        """
+        with self.__lock:
+            entry = self.__data.get(key)
+            if entry is not None and self.ttl is not None \
+                    and time.monotonic() - entry[0] > self.ttl:
+                del self.__data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a result, evicting the least recently used if full.
+
+        Args:
+            key (Hashable): the query, ending with the dataset version
+            value (Any): the result
+        """
+        if self.maxsize <= 0:
+            return
+        with self.__lock:
+            self.__data[key] = (time.monotonic(), value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version: Hashable) -> int:
+        """Drop the results of dataset versions other than version.
+
+        Args:
+            version (Hashable): the current dataset version
+
+        Returns:
+            int: number of results dropped.
+        """
+        with self.__lock:
+            if version == self.__version:
+                return 0
+            self.__version = version
+            stale = [key for key in self.__data if key[-1] != version]
+            for key in stale:
+                del self.__data[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every result."""
+        with self.__lock:
+            self.__data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts.
+
+        Returns:
+            dict: hits, misses, evictions and the number of results kept.
+        """
+        with self.__lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "size": len(self.__data), }
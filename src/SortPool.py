@@ -0,0 +1,255 @@
+"""Process pool finding the journeys of paths in parallel, for sort_paths."""
+from __future__ import annotations
+
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, count
+from multiprocessing.queues import SimpleQueue
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+import config
+from bus import BusRoute, BusStop
+from datastore import Datastore, RouteIndex
+
+# of the worker: queue progress is reported on, dataset its index is of
+progress_queue: Optional[SimpleQueue] = None
+worker_version: Optional[str] = None
+
+
+def chunk_results(search_id: int, paths: list[list[str]], criteria: str,
+                  top_k: Optional[int], version: str
+                  ) -> tuple[list[tuple], list[dict]]:
+    """Results of a chunk of paths, in a worker.
+
+    Args:
+        search_id (int): search the chunk is of, for the progress
+        paths (list): paths as lists of bus stop codes
+        criteria (str): Criteria to sort by in {"dist", "transfer"}
+        top_k (int, optional): Keep only the best top_k of the chunk.
+        version (str): dataset hash the paths were found on
+
+    Returns:
+        tuple: (results as (sn, path codes, dist, transfer) in the order of
+            sort_paths, or of top_paths with top_k, the spans of the chunk)
+    """
+    # imported here so the pool can be made while pathfinding is imported
+    from Metrics import Span
+    from pathfinding import path_results, top_paths
+
+    global worker_version
+    if version != worker_version and config.use_route_index:
+        # the database was replaced since the fork
+        RouteIndex().build()
+        BusRoute.reset_bus_stops()
+    worker_version = version
+
+    # a few updates a chunk, each a write to a pipe
+    step = max(1, len(paths) // 10)
+    reported = 0
+
+    def progress(done: int) -> None:
+        nonlocal reported
+        if done > reported \
+                and (done - reported >= step or done == len(paths)):
+            progress_queue.put((search_id, done - reported))
+            reported = done
+
+    stop_paths = [[BusStop.from_bus_code(code) for code in path]
+                  for path in paths]
+    spans = (Span("find_bus_path"), Span("calculate_distance"))
+    if top_k is None:
+        results = []
+        for i, path in enumerate(stop_paths):
+            results.extend(path_results(path, "bfs", spans))
+            progress(i + 1)
+    else:
+        results = list(top_paths(stop_paths, criteria, top_k, spans=spans,
+                                 progress=progress))
+    progress(len(paths))
+    return ([(result["sn"],
+              [stop.bus_stop_code for stop in result["path"]],
+              result["dist"], result["transfer"]) for result in results],
+            [span.to_dict() for span in spans])
+
+
+def init_worker(queue: SimpleQueue, version: str) -> None:
+    """Start a worker forked from the server.
+
+    Args:
+        queue (SimpleQueue): queue to report progress on
+        version (str): dataset hash of the route index it was forked with
+    """
+    global progress_queue, worker_version
+    # the connections of the server are not safe to use after a fork
+    Datastore().discard_connections()
+    progress_queue, worker_version = queue, version
+
+
+class SortPool:
+    """
+    Process pool that runs the find_bus_path and calculate_distance of
+    sort_paths in parallel.
+
+    The workers are forked once by start(), which must be called before the
+    server starts any thread, as a fork copies the locks other threads hold
+    at the time. They share the route index of the server read only, and
+    rebuild their own when the dataset changes. Paths are sent as bus stop
+    codes and results come back the same way, in chunks. The workers report
+    progress as they go, on a queue read by a thread of the server.
+
+    Attributes:
+
+        + workers (int): number of processes
+
+    Methods:
+
+        + start(): Fork the workers.
+        + running(): Whether the workers are started and not shut down.
+        + results(paths, criteria, top_k, progress): results of the paths
+        + shutdown(): Stop the workers.
+    """
+    __instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = object.__new__(cls)
+            cls.__instance.__lock = Lock()
+            cls.__instance.__executor = None
+            cls.__instance.__queue = None
+            # search id: [paths done, progress callback]
+            cls.__instance.__progress = {}
+            cls.__instance.__search_ids = count()
+            cls.__instance.workers = 0
+        return cls.__instance
+
+    def __init__(self, workers: int = None) -> None:
+        if workers is not None:
+            self.workers = workers
+
+    def start(self) -> bool:
+        """Fork the workers, unless the platform cannot fork.
+
+        Call at startup, before any other thread is started.
+
+        Returns:
+            bool: Whether the workers were started.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return False
+        with self.__lock:
+            if self.__executor is not None:
+                return True
+            if config.use_route_index:
+                # built before the fork, to be shared by the workers
+                RouteIndex().ensure_built()
+            context = multiprocessing.get_context("fork")
+            self.__queue = context.SimpleQueue()
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=init_worker,
+                initargs=(self.__queue, Datastore().get_dataset_hash()))
+            # a forking pool forks every worker on the first submit, in
+            # this thread, before it starts its own threads
+            executor.submit(int).result()
+            self.__executor = executor
+        Thread(target=self.__read_progress, args=(self.__queue,),
+               name="sort-pool-progress", daemon=True).start()
+        return True
+
+    def running(self) -> bool:
+        """Whether the workers are started and not shut down.
+
+        A worker that died is only found by the next results(), which shuts
+        the pool down.
+        """
+        return self.__executor is not None
+
+    def __read_progress(self, queue: SimpleQueue) -> None:
+        """Pass the progress of the workers on, until shutdown()."""
+        while True:
+            message = queue.get()
+            if message is None:
+                return
+            search_id, paths_done = message
+            with self.__lock:
+                # finished searches have nothing to update
+                entry = self.__progress.get(search_id)
+                if entry is not None:
+                    entry[0] += paths_done
+                    if entry[1] is not None:
+                        entry[1](entry[0])
+
+    def results(self, paths: list[list[BusStop]], criteria: str,
+                top_k: Optional[int] = None,
+                progress: Optional[Callable[[int], None]] = None
+                ) -> tuple[list[dict[str, Any]], list[dict]]:
+        """Results of the paths, found by the workers.
+
+        Args:
+            paths (list): paths of BusStop, as returned by search_path
+            criteria (str): Criteria to sort by in {"dist", "transfer"}
+            top_k (int, optional): Keep only the best top_k. Defaults to
+                keeping all.
+            progress (Callable, optional): called with the number of paths
+                done as the workers find them, not after this returns.
+
+        Raises:
+            RuntimeError: The workers are not started.
+            BrokenProcessPool: A worker died, the pool is shut down.
+
+        Returns:
+            tuple: (results in the order sort_paths would insert them, or
+                the best top_k in order, the spans of every chunk)
+        """
+        from pathfinding import SORT_KEYS
+
+        executor = self.__executor
+        if executor is None:
+            raise RuntimeError("The sort pool is not started")
+        version = Datastore().get_dataset_hash()
+        # a few chunks a worker, so the work evens out
+        size = max(1, -(-len(paths) // (self.workers * 4)))
+        chunks = [[[stop.bus_stop_code for stop in path]
+                   for path in paths[start:start + size]]
+                  for start in range(0, len(paths), size)]
+        search_id = next(self.__search_ids)
+        with self.__lock:
+            self.__progress[search_id] = [0, progress]
+        try:
+            futures = [executor.submit(chunk_results, search_id, chunk,
+                                       criteria, top_k, version)
+                       for chunk in chunks]
+            wait(futures)
+            chunk_outputs = [future.result() for future in futures]
+        except BrokenProcessPool:
+            self.shutdown()
+            raise
+        finally:
+            with self.__lock:
+                del self.__progress[search_id]
+
+        results = [{"sn": sn,
+                    "path": [BusStop.from_bus_code(code) for code in path],
+                    "dist": dist, "transfer": transfer}
+                   for sn, path, dist, transfer in chain.from_iterable(
+                       output[0] for output in chunk_outputs)]
+        if top_k is not None:
+            # the chunks are in path order, so ties keep the order of a
+            # single top_paths
+            keys = SORT_KEYS[criteria]
+            results = heapq.nsmallest(top_k, results, key=lambda result:
+                                      tuple(result[key] for key in keys))
+        spans = [span for output in chunk_outputs for span in output[1]]
+        return results, spans
+
+    def shutdown(self) -> None:
+        """Stop the workers."""
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+            queue, self.__queue = self.__queue, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            queue.put(None)
@@ -1,10 +1,13 @@
 from typing import Any, Type
 
-from datastore import Datastore
+import config
+from datastore import Datastore, RouteIndex
 from datastore import SQLcmds
 
 from . import Bus
 ds = Datastore()
+# lookups are answered from memory when the route index is enabled
+lookup = RouteIndex(ds) if config.use_route_index else ds
 
 
 class BusStop():
@@ -75,7 +78,7 @@ class BusStop():
         """
         if bus_stop_code in cls.__created_stops.keys():
             return cls.__created_stops[bus_stop_code]
-        bus_stop_info = ds.get_bus_stop_info(bus_stop_code)
+        bus_stop_info = lookup.get_bus_stop_info(bus_stop_code)
 
         return cls(
             bus_stop_code,
@@ -106,7 +109,7 @@ class BusStop():
             list: list of buses at the bus stop.
         """
         return {Bus(*bus_row)
-                for bus_row in ds.get_buses_at(self.bus_stop_code)
+                for bus_row in lookup.get_buses_at(self.bus_stop_code)
                 }
 
     def find_bus_connection(self) -> list["BusStop"]:
@@ -117,21 +120,17 @@ class BusStop():
             list: Contains the list of directly connected bus stops.
             Returns empty list if none.
         """
-        # avoid continuously opening and closing connection
-        conn = ds.get_connection()
-
         bus_routes = []
         for bus in self.get_buses():
-            for stop in conn.execute(
+            for stop in ds.execute(
                 SQLcmds["find_connected_bus_stop"],
                 (bus.service_no, bus.direction, bus.stop_sequence)
             ):
                 if stop[0] != 'CTE':
                     bus_routes.extend([BusStop.from_bus_code(stop[0])])
-        conn.close()
         return bus_routes
 
-    def buses_to(self, end_stop: "BusStop") -> list["BusRoute"]:
+    def buses_to(self, end_stop: "BusStop") -> list["RouteSegment"]:
         """
         Find buses from stop to end bus stop.
 
@@ -139,39 +138,74 @@ class BusStop():
             end_stop (str): ending bus stop
 
         Returns:
-            list: containing BusRoute
+            list: containing RouteSegment
         """
         return [
-            BusRoute(bus.service_no, bus.direction, self, end_stop)
+            RouteSegment(BusRoute(bus.service_no, bus.direction),
+                         self, end_stop)
             for bus in set.intersection(self.get_buses(), end_stop.get_buses())
         ]
 
 
 class BusRoute:
     """BusRoute class to deal with the route associated to each service.
-    """
 
-    def __init__(self,
-                 service_no: str,
-                 direction: int,
-                 start_stop: BusStop = None,
-                 end_stop: BusStop = None) -> None:
-        self.service_no: str = service_no
-        self.direction: int = direction
-        self.bus_stops: list[BusStop] = [
-            BusStop.from_bus_code(bus_code)
-            for bus_code in ds.get_bus_routes(service_no, direction)
-        ]
-        self.start_stop = start_stop
-        self.end_stop = end_stop
+    There is one BusRoute per (service_no, direction), shared by every
+    journey. Its bus stops are only loaded when first used.
+    """
+    __created_routes: dict[tuple[str, int], "BusRoute"] = {}
+    # bus stops loaded before a reset_bus_stops() are loaded again
+    __generation = 0
+
+    def __new__(cls: Type["BusRoute"], service_no: str,
+                direction: int) -> "BusRoute":
+        key = (service_no, direction)
+        if key not in cls.__created_routes:
+            route = object.__new__(cls)
+            route.service_no = service_no
+            route.direction = direction
+            route.__bus_stops = (-1, ())  # (generation, bus stops)
+            cls.__created_routes.setdefault(key, route)
+        return cls.__created_routes[key]
+
+    def __init__(self, service_no: str, direction: int) -> None:
+        # set once in __new__, as the same route is returned every time
+        self.service_no: str
+        self.direction: int
 
     def __repr__(self) -> str:
-        return ("\nBusRoute("
-                f"{self.service_no}, "
-                f"{self.direction}, "
-                f"{self.start_stop}, "
-                f"{self.end_stop}"
-                ")")
+        return f"BusRoute({self.service_no}, {self.direction})"
+
+    @classmethod
+    def reset_bus_stops(cls: Type["BusRoute"]) -> None:
+        """Reload the bus stops of every route on next use.
+
+        Call after the bus routes in the datastore changed. Bus stops loaded
+        at the same time from the old routes are loaded again too.
+        """
+        cls.__generation += 1
+
+    @property
+    def bus_stops(self) -> tuple[BusStop, ...]:
+        """Bus stops along the route, in order. Loaded on first use.
+
+        Stops without a record (e.g. 'CTE') are left out.
+        """
+        generation, bus_stops = self.__bus_stops
+        if generation == BusRoute.__generation:
+            return bus_stops
+        # read before the routes, so stops loaded from routes replaced
+        # meanwhile are loaded again on next use
+        generation = BusRoute.__generation
+        bus_stops = []
+        for bus_code in lookup.get_bus_routes(self.service_no,
+                                              self.direction):
+            try:
+                bus_stops.append(BusStop.from_bus_code(bus_code))
+            except LookupError:
+                continue
+        self.__bus_stops = (generation, tuple(bus_stops))
+        return self.__bus_stops[1]
 
     def has_bus_stop(self, bus_stop: BusStop) -> bool:
         """Check if bus stop is along the route.
@@ -198,22 +232,90 @@ class BusRoute:
         Returns:
             list: containing distances ordered by ascending stop sequence
         """
-        return ds.get_distances(
+        return lookup.get_distances(
             bus_stop.bus_stop_code,
             self.service_no,
             self.direction)
 
+    def distance_between(self, start_stop: BusStop,
+                         end_stop: BusStop) -> float:
+        """
+        Calculate the distance travelled from start_stop to end_stop.
+
+        For loop services, the shortest ride from start_stop to end_stop.
+
+        Args:
+            start_stop (BusStop): stop boarded at
+            end_stop (BusStop): stop alighted at
+
+        Raises:
+            ValueError: the service does not ride from start_stop to
+                end_stop, or the distance of either stop is missing.
+
+        Returns:
+            float: the distance.
+        """
+        distance = lookup.get_segment_distance(
+            start_stop.bus_stop_code,
+            end_stop.bus_stop_code,
+            self.service_no,
+            self.direction)
+        if distance is None:
+            raise ValueError("No ride between the stops on this service")
+        return distance
+
+
+class RouteSegment:
+    """Ride on a BusRoute from a start stop to an end stop.
+
+    Attributes:
+
+        + route (BusRoute): the shared route
+        + start_stop (BusStop): stop boarded at
+        + end_stop (BusStop): stop alighted at
+
+    Methods:
+
+        + calculate_distance(): distance travelled
+    """
+    __slots__ = ("route", "start_stop", "end_stop")
+
+    def __init__(self,
+                 route: BusRoute,
+                 start_stop: BusStop = None,
+                 end_stop: BusStop = None) -> None:
+        self.route = route
+        self.start_stop = start_stop
+        self.end_stop = end_stop
+
+    def __repr__(self) -> str:
+        return ("\nRouteSegment("
+                f"{self.service_no}, "
+                f"{self.direction}, "
+                f"{self.start_stop}, "
+                f"{self.end_stop}"
+                ")")
+
+    @property
+    def service_no(self) -> str:
+        return self.route.service_no
+
+    @property
+    def direction(self) -> int:
+        return self.route.direction
+
     def calculate_distance(self) -> float:
         """
         Calculate the total distance of a path, using specific bus services.
         Must have end_stop and start_stop set.
 
+        Raises:
+            ValueError: start_stop or end_stop is not set, or there is no
+                ride between them, see BusRoute.distance_between().
+
         Returns:
             float: the total distance.
         """
         if self.start_stop is None or self.end_stop is None:
             raise ValueError("Start and End stop should not be None")
-        return abs(
-            self.find_dist(self.end_stop)[-1]
-            - self.find_dist(self.start_stop)[0]
-        )
+        return self.route.distance_between(self.start_stop, self.end_stop)
@@ -0,0 +1,200 @@
+"""Grid of bus stops by location, for nearest stop and radius queries."""
+from __future__ import annotations
+
+from math import cos, floor, isfinite, radians
+from threading import Lock
+from typing import Iterable, Optional
+
+from datastore import Datastore
+
+from .RouteStops import BusStop
+
+EARTH_RADIUS = 6371.0088  # km, mean radius
+
+
+class StopGrid:
+    """
+    Bus stops bucketed into square cells of cell_size km.
+
+    Locations are projected to km on a plane through the centre of the
+    stops, which is accurate to well under a metre over Singapore. A query
+    only looks at the cells around a point.
+
+    Attributes:
+
+        + stops (list): BusStop of each stop id
+        + cell_size (float): width of a cell in km
+        + cells (dict): (column, row): stop ids in the cell
+
+    Methods:
+
+        + current(): Grid of the current dataset.
+        + project(latitude, longitude): location in km on the grid
+        + cell(x, y): cell containing a point
+        + nearest(latitude, longitude, k): k nearest stops
+        + within(latitude, longitude, radius): stops within radius km
+    """
+    __lock = Lock()
+    __current: Optional[tuple[str, "StopGrid"]] = None
+
+    def __init__(self, stops: Iterable[BusStop],
+                 cell_size: float = 0.5) -> None:
+        self.stops = [stop for stop in stops
+                      if stop.latitude is not None
+                      and stop.longitude is not None]
+        self.cell_size = cell_size
+        latitudes = [stop.latitude for stop in self.stops] or [0.0]
+        self.__origin = sum(latitudes) / len(latitudes)
+        self.__scale = radians(1) * EARTH_RADIUS
+        self.__lon_scale = self.__scale * cos(radians(self.__origin))
+
+        self.__xs: list[float] = []
+        self.__ys: list[float] = []
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        for stop_id, stop in enumerate(self.stops):
+            x, y = self.project(stop.latitude, stop.longitude)
+            self.__xs.append(x)
+            self.__ys.append(y)
+            self.cells.setdefault(self.cell(x, y), []).append(stop_id)
+        columns = [column for column, _ in self.cells] or [0]
+        rows = [row for _, row in self.cells] or [0]
+        self.__bounds = (min(columns), max(columns), min(rows), max(rows))
+
+    @classmethod
+    def current(cls) -> "StopGrid":
+        """Grid of the stops of the current dataset, built when it changes.
+
+        Returns:
+            StopGrid: the grid
+        """
+        # imported here as utils imports this module
+        from .utils import retrieve_all_bus_stops
+
+        version = Datastore().get_dataset_hash()
+        current = cls.__current
+        if current is None or current[0] != version:
+            with cls.__lock:
+                current = cls.__current
+                if current is None or current[0] != version:
+                    current = (version,
+                               cls(retrieve_all_bus_stops().values()))
+                    cls.__current = current
+        return current[1]
+
+    def project(self, latitude: float, longitude: float
+                ) -> tuple[float, float]:
+        """Location in km on the plane of the grid.
+
+        Raises:
+            ValueError: The latitude or longitude is not a finite number in
+                [-90, 90] or [-180, 180].
+        """
+        if not (isfinite(latitude) and isfinite(longitude)
+                and -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("Invalid latitude or longitude")
+        return longitude * self.__lon_scale, \
+            (latitude - self.__origin) * self.__scale
+
+    def cell(self, x: float, y: float) -> tuple[int, int]:
+        """Cell containing a point on the plane."""
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def __ring(self, column: int, row: int, r: int) -> Iterable[int]:
+        """Stop ids in the cells r cells away from a cell.
+
+        Only the cells within the bounds of the grid are looked at, so a
+        ring costs no more than the grid is wide, however far out it is.
+        """
+        min_column, max_column, min_row, max_row = self.__bounds
+        first_row, last_row = max(row - r, min_row), min(row + r, max_row)
+        for i in range(max(column - r, min_column),
+                       min(column + r, max_column) + 1):
+            if i in (column - r, column + r):
+                # whole columns at the left and right
+                rows: Iterable[int] = range(first_row, last_row + 1)
+            else:
+                # the ends of the others
+                rows = [j for j in (row - r, row + r)
+                        if first_row <= j <= last_row]
+            for j in rows:
+                yield from self.cells.get((i, j), ())
+
+    def __distances(self, x: float, y: float,
+                    stop_ids: Iterable[int]) -> list[tuple[float, int]]:
+        xs, ys = self.__xs, self.__ys
+        return [(((xs[i] - x) ** 2 + (ys[i] - y) ** 2) ** 0.5, i)
+                for i in stop_ids]
+
+    def nearest(self, latitude: float, longitude: float,
+                k: int = 5) -> list[tuple[BusStop, float]]:
+        """The k nearest stops to a location.
+
+        Args:
+            latitude (float): latitude of the location
+            longitude (float): longitude of the location
+            k (int, optional): number of stops. Defaults to 5.
+
+        Raises:
+            ValueError: The location is invalid, see project().
+
+        Returns:
+            list: (BusStop, distance in km), nearest first
+        """
+        x, y = self.project(latitude, longitude)
+        if k <= 0:
+            return []
+        column, row = self.cell(x, y)
+        min_column, max_column, min_row, max_row = self.__bounds
+        # rings before the first and past the last are outside the grid
+        first = max(0, min_column - column, column - max_column,
+                    min_row - row, row - max_row)
+        last = max(abs(column - min_column), abs(column - max_column),
+                   abs(row - min_row), abs(row - max_row))
+        found: list[tuple[float, int]] = []
+        for r in range(first, last + 1):
+            found.extend(self.__distances(x, y,
+                                          self.__ring(column, row, r)))
+            if len(found) >= k:
+                found.sort()
+                # every stop further out is more than r cells away
+                if found[k - 1][0] <= r * self.cell_size:
+                    break
+        found.sort()
+        return [(self.stops[i], dist) for dist, i in found[:k]]
+
+    def within(self, latitude: float, longitude: float,
+               radius: float) -> list[tuple[BusStop, float]]:
+        """The stops within radius of a location.
+
+        Args:
+            latitude (float): latitude of the location
+            longitude (float): longitude of the location
+            radius (float): radius in km
+
+        Raises:
+            ValueError: The location is invalid, see project(), or the
+                radius is not a finite number.
+
+        Returns:
+            list: (BusStop, distance in km), nearest first
+        """
+        if not isfinite(radius):
+            raise ValueError("Invalid radius")
+        x, y = self.project(latitude, longitude)
+        min_column, max_column, min_row, max_row = self.__bounds
+        first_column, first_row = self.cell(x - radius, y - radius)
+        last_column, last_row = self.cell(x + radius, y + radius)
+        first_column, first_row = \
+            max(first_column, min_column), max(first_row, min_row)
+        last_column, last_row = \
+            min(last_column, max_column), min(last_row, max_row)
+        found = [
+            (dist, i)
+            for column in range(first_column, last_column + 1)
+            for row in range(first_row, last_row + 1)
+            for dist, i in self.__distances(x, y,
+                                            self.cells.get((column, row), ()))
+            if dist <= radius
+        ]
+        found.sort()
+        return [(self.stops[i], dist) for dist, i in found]
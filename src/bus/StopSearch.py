@@ -0,0 +1,174 @@
+"""Search index over the bus stop code, description and road name."""
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from threading import Lock
+from typing import Iterable, Optional
+
+from datastore import Datastore
+
+from .RouteStops import BusStop
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class StopSearch:
+    """
+    Find bus stops by words in their code, description or road name.
+
+    Every word of a query must match the start of a word of the stop, or
+    part of one. Stops rank by how each query word matches: whole words
+    above the start of words above the middle of words, and the code or
+    description above the road name.
+
+    The words, and every suffix of them, are kept sorted, so the words
+    starting with a query word are found with a binary search. Query words
+    of up to short_word letters match too many words to scan for each
+    query, so their matches are found when the index is built, and the
+    matches of recent longer words are cached.
+
+    Attributes:
+
+        + stops (list): BusStop of each stop id, by length of description
+        + short_word (int): longest query word matched from the build
+
+    Methods:
+
+        + current(): Index of the current dataset.
+        + tokens(text): Words of a text.
+        + search(query, limit): The best matching stops.
+    """
+    __lock = Lock()
+    __current: Optional[tuple[str, "StopSearch"]] = None
+    short_word = 2
+
+    def __init__(self, stops: Iterable[BusStop]) -> None:
+        # ties go to the shortest description, the closest match
+        self.stops = sorted(stops, key=lambda stop: (
+            len(str(stop.description)), str(stop.description),
+            stop.bus_stop_code))
+        self.__codes = {stop.bus_stop_code: stop_id
+                        for stop_id, stop in enumerate(self.stops)}
+        # (suffix, rank, stop id), sorted, where rank is 0 for the start of
+        # a word of the code or description, 1 for the middle of one, and
+        # 2 and 3 for the road name
+        entries = set()
+        for stop_id, stop in enumerate(self.stops):
+            fields = (f"{stop.bus_stop_code} {stop.description or ''}",
+                      stop.road_name or "")
+            for field, text in enumerate(fields):
+                for token in self.tokens(text):
+                    for start in range(len(token)):
+                        entries.add((token[start:],
+                                     2 * field + (start != 0), stop_id))
+        entries = sorted(entries)
+        self.__suffixes = [suffix for suffix, _, _ in entries]
+        self.__entries = [(rank, stop_id) for _, rank, stop_id in entries]
+
+        self.__cached_matches = lru_cache(maxsize=4096)(self.__find_matches)
+        self.__short: dict[str, dict[int, int]] = {}
+        for suffix, rank, stop_id in entries:
+            for end in range(1, min(len(suffix), self.short_word) + 1):
+                self.__add_match(self.__short.setdefault(suffix[:end], {}),
+                                 stop_id, self.score(rank,
+                                                     end == len(suffix)))
+
+    @classmethod
+    def current(cls) -> "StopSearch":
+        """Index of the stops of the current dataset, built when it changes.
+
+        Returns:
+            StopSearch: the index
+        """
+        # imported here as utils imports this module
+        from .utils import retrieve_all_bus_stops
+
+        version = Datastore().get_dataset_hash()
+        current = cls.__current
+        if current is None or current[0] != version:
+            with cls.__lock:
+                current = cls.__current
+                if current is None or current[0] != version:
+                    current = (version,
+                               cls(retrieve_all_bus_stops().values()))
+                    cls.__current = current
+        return current[1]
+
+    @staticmethod
+    def tokens(text: str) -> list[str]:
+        """Lower case words of a text."""
+        return TOKEN.findall(text.lower())
+
+    @staticmethod
+    def score(rank: int, whole: bool) -> int:
+        """Score of a query word matching a suffix, lower is better.
+
+        Args:
+            rank (int): rank of the suffix
+            whole (bool): whether the query word is the whole suffix
+
+        Returns:
+            int: the score
+        """
+        return 2 * rank + (not whole)
+
+    @staticmethod
+    def __add_match(matches: dict[int, int], stop_id: int,
+                    score: int) -> None:
+        if score < matches.get(stop_id, score + 1):
+            matches[stop_id] = score
+
+    def __matches(self, word: str) -> dict[int, int]:
+        """stop id: best score of word against the words of the stop."""
+        if len(word) <= self.short_word:
+            return self.__short.get(word, {})
+        return self.__cached_matches(word)
+
+    def __find_matches(self, word: str) -> dict[int, int]:
+        """Matches of a word longer than short_word, by binary search."""
+        matches = {}
+        position = bisect_left(self.__suffixes, word)
+        suffixes, entries = self.__suffixes, self.__entries
+        while position < len(suffixes) \
+                and suffixes[position].startswith(word):
+            rank, stop_id = entries[position]
+            self.__add_match(matches, stop_id,
+                             self.score(rank, suffixes[position] == word))
+            position += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> list[BusStop]:
+        """The stops best matching a query.
+
+        An exact bus stop code comes first, then stops by the total score
+        of the query words, then by shortest description.
+
+        Args:
+            query (str): words to search for
+            limit (int, optional): most stops to return. Defaults to 10.
+
+        Returns:
+            list: BusStop, best match first
+        """
+        words = self.tokens(query)
+        if not words or limit <= 0:
+            return []
+        # fewest matches first, so the candidates shrink fastest
+        scores: Optional[dict[int, int]] = None
+        for matches in sorted(map(self.__matches, set(words)), key=len):
+            if scores is None:
+                scores = matches
+            else:
+                scores = {stop_id: score + matches[stop_id]
+                          for stop_id, score in scores.items()
+                          if stop_id in matches}
+            if not scores:
+                return []
+
+        exact = self.__codes.get(query.strip())
+        ranked = heapq.nsmallest(limit, scores, key=lambda stop_id: (
+            stop_id != exact, scores[stop_id], stop_id))
+        return [self.stops[stop_id] for stop_id in ranked]
@@ -1,3 +1,7 @@
 from .Bus import Bus
-from .RouteStops import BusRoute, BusStop
-from .utils import find_bus_path, retrieve_all_bus_stops
+from .RouteStops import BusRoute, BusStop, RouteSegment
+from .StopGrid import StopGrid
+from .StopSearch import StopSearch
+from .utils import (find_all_bus_connections, find_bus_path, haversine,
+                    nearest_stops, nearest_stops_batch,
+                    retrieve_all_bus_stops, search_stops, stops_within)
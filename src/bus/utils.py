@@ -1,13 +1,17 @@
 """Utilities function to deal with bus."""
 
-from datastore import Datastore
+from math import asin, cos, radians, sin, sqrt
 
-from . import BusRoute, BusStop
+from datastore import Datastore, SQLcmds
+
+from . import BusStop, RouteSegment
+from .StopGrid import EARTH_RADIUS, StopGrid
+from .StopSearch import StopSearch
 
 ds = Datastore()
 
 
-def find_bus_path(path: list[BusStop]) -> list[list["BusRoute"]]:
+def find_bus_path(path: list[BusStop]) -> list[list["RouteSegment"]]:
     """
     Find buses connecting a path.
 
@@ -40,3 +44,129 @@ def retrieve_all_bus_stops() -> dict[str, "BusStop"]:
         data["bus_stop_code"]: BusStop.from_record(**data)
         for data in ds.retrieve_all("bus_stops")
     }
+
+
+def find_all_bus_connections() -> dict["BusStop", list["BusStop"]]:
+    """
+    Find the bus stops reachable from every bus stop in one pass.
+
+    Same connections as calling BusStop.find_bus_connection() on every
+    stop, derived from a single ordered scan of the bus routes.
+
+    Returns:
+        dictionary: {BusStop: list of directly connected BusStop}
+    """
+    bus_stops = retrieve_all_bus_stops()
+    connections = {}
+    route_key = None
+    route_stops = []
+    for service_no, direction, _, bus_stop_code, _ in ds.execute(
+            SQLcmds["get_all_bus_routes"]):
+        if (service_no, direction) != route_key:
+            route_key = (service_no, direction)
+            route_stops = []
+        # stops without a record (e.g. 'CTE') cannot be reached
+        bus_stop = bus_stops.get(bus_stop_code)
+        if bus_stop is None:
+            continue
+        # every stop earlier on the route can reach this stop
+        for origin_stop in route_stops:
+            connections[origin_stop].append(bus_stop)
+        # a loop service only connects from the first visit to a stop,
+        # same as BusStop.get_buses() keeping one Bus per service
+        if bus_stop not in route_stops:
+            route_stops.append(bus_stop)
+        connections.setdefault(bus_stop, [])
+    return connections
+
+
+def haversine(latitude1: float, longitude1: float,
+              latitude2: float, longitude2: float) -> float:
+    """
+    Great-circle distance between two points.
+
+    No road between two bus stops is shorter than this.
+
+    Args:
+        latitude1 (float): latitude of the first point in degrees
+        longitude1 (float): longitude of the first point in degrees
+        latitude2 (float): latitude of the second point in degrees
+        longitude2 (float): longitude of the second point in degrees
+
+    Returns:
+        float: distance in km
+    """
+    d_latitude = radians(latitude2 - latitude1)
+    d_longitude = radians(longitude2 - longitude1)
+    a = (sin(d_latitude / 2) ** 2
+         + cos(radians(latitude1)) * cos(radians(latitude2))
+         * sin(d_longitude / 2) ** 2)
+    return 2 * EARTH_RADIUS * asin(sqrt(a))
+
+
+def nearest_stops(latitude: float, longitude: float,
+                  k: int = 5) -> list[tuple["BusStop", float]]:
+    """
+    Find the k nearest bus stops to a location.
+
+    Args:
+        latitude (float): latitude of the location
+        longitude (float): longitude of the location
+        k (int, optional): number of bus stops. Defaults to 5.
+
+    Returns:
+        list: (BusStop, distance in metres), nearest first
+    """
+    return [(stop, dist * 1000)
+            for stop, dist in StopGrid.current().nearest(latitude, longitude,
+                                                         k)]
+
+
+def stops_within(latitude: float, longitude: float,
+                 radius_m: float) -> list[tuple["BusStop", float]]:
+    """
+    Find the bus stops within a radius of a location.
+
+    Args:
+        latitude (float): latitude of the location
+        longitude (float): longitude of the location
+        radius_m (float): radius in metres
+
+    Returns:
+        list: (BusStop, distance in metres), nearest first
+    """
+    return [(stop, dist * 1000)
+            for stop, dist in StopGrid.current().within(latitude, longitude,
+                                                        radius_m / 1000)]
+
+
+def nearest_stops_batch(points: list[tuple[float, float]],
+                        k: int = 5) -> list[list[tuple["BusStop", float]]]:
+    """
+    Find the k nearest bus stops to each of many locations.
+
+    Args:
+        points (list): (latitude, longitude) of each location
+        k (int, optional): number of bus stops. Defaults to 5.
+
+    Returns:
+        list: nearest_stops() of each location
+    """
+    grid = StopGrid.current()
+    return [[(stop, dist * 1000)
+             for stop, dist in grid.nearest(latitude, longitude, k)]
+            for latitude, longitude in points]
+
+
+def search_stops(query: str, limit: int = 10) -> list["BusStop"]:
+    """
+    Find the bus stops best matching a query, for autocomplete.
+
+    Args:
+        query (str): words of the code, description or road name
+        limit (int, optional): most bus stops. Defaults to 10.
+
+    Returns:
+        list: BusStop, best match first
+    """
+    return StopSearch.current().search(query, limit)
@@ -2,14 +2,65 @@
 Configuration files for variables.
 
 db_path: path of the database
+graph_path: path of the binary graph cache
+db_read_only: open the database read only while serving
+db_pragmas: pragmas set on each database connection, journal_mode is only
+    set when the database is writable
+db_cached_statements: prepared statements cached per database connection
 host: the ip address of host
 port: the port number of host for flask
+graph_reload_interval: seconds between checks for a changed database or
+    graph cache to reload
+search_backends: how to search for journeys for each criteria, "bfs" over
+    the stop graph, "raptor" for the fewest transfers or "astar" for the
+    shortest distance over the bus routes
+top_paths: number of best journeys kept for the summary page, None to keep
+    all
+shortest_journeys: number of journeys the "astar" search returns
+use_route_index: answer bus route lookups from an in-memory index instead of
+    querying the database each time
+search_workers: number of searches run at the same time
+sort_workers: processes the paths of a search are spread across to find
+    their journeys, forked at startup, 0 or 1 to find them in the search
+    thread. Only used where processes can be forked
+search_queue_size: number of searches waiting to run before new ones are
+    refused
+job_ttl: seconds the result of a search is kept after it finishes
+result_cache_size: number of search results kept, 0 to disable the cache
+result_cache_ttl: seconds a search result is kept, None to keep it until
+    evicted or the dataset changes
+stop_info_max_age: seconds browsers may cache the bus stop info used by the
+    search form before checking it again
+status_stream_rate: most status updates a second streamed to the processing
+    page
 """
 
 # Data Storage
 db_path = "src/datastore/database.db"
-graph_path = "src/graph.json"
+graph_path = "src/graph.bin"
+db_read_only = True
+db_pragmas = {
+    "journal_mode": "WAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16 * 1024,  # KiB
+}
+db_cached_statements = 128
+graph_reload_interval = 5
+search_backends = {"dist": "astar", "transfer": "bfs"}
+shortest_journeys = 5
+top_paths = 50
+use_route_index = True
+
+# Searches
+search_workers = 4
+sort_workers = 0
+search_queue_size = 32
+job_ttl = 600
+status_stream_rate = 4
+result_cache_size = 256
+result_cache_ttl = None
 
 # Website
 host = "0.0.0.0"
 port = "5000"
+stop_info_max_age = 86400
@@ -1,27 +1,209 @@
+import hashlib
+import os
 import sqlite3
+from threading import Lock, local
+from typing import Optional
 
 from .sqlcmds import SQLcmds
 
 
 class Datastore:
+    """
+    Access to the sqlite3 database.
+
+    Each thread reuses one connection, opened on first use, so the
+    statements sqlite3 caches per connection are prepared only once. The
+    connection is reopened when the settings change or the database file
+    is replaced, e.g. by ingest, as it would keep reading the old file.
+
+    Attributes:
+
+        + db_path (str): path of the database
+        + read_only (bool): open the database read only, for serving
+        + pragmas (dict): pragma: value set on each new connection,
+            journal_mode is only set when not read_only
+        + cached_statements (int): statements cached per connection
+
+    Methods:
+
+        + get_connection(): The connection of this thread.
+        + close(): Close the connection of this thread.
+        + discard_connections(): Forget every connection, after a fork.
+        + stats(): Connections opened and statements run by all threads.
+        + request_stats(): The same, by this thread since
+            reset_request_stats().
+    """
     __instance = None
 
     def __new__(cls, *args, **kwargs):
         if cls.__instance is None:
             cls.__instance = object.__new__(cls)
+            cls.__instance.__local = local()
+            cls.__instance.__lock = Lock()
+            cls.__instance.__settings = 0
+            cls.__instance.__connections_opened = 0
+            cls.__instance.__statements_run = 0
         return cls.__instance
 
-    def __init__(self, db_path: str = "src/datastore/database.db") -> None:
-        self.db_path = db_path
+    def __init__(self, db_path: str = None, read_only: bool = None,
+                 pragmas: dict = None, cached_statements: int = None) -> None:
+        # the same instance is returned every time, so only change the
+        # settings given
+        settings = {"db_path": db_path, "read_only": read_only,
+                    "pragmas": pragmas,
+                    "cached_statements": cached_statements}
+        defaults = {"db_path": "src/datastore/database.db",
+                    "read_only": False, "pragmas": {},
+                    "cached_statements": 128}
+        for name, value in settings.items():
+            if value is None:
+                if hasattr(self, name):
+                    continue
+                value = defaults[name]
+            if getattr(self, name, None) != value:
+                setattr(self, name, value)
+                # connections with the old settings are reopened
+                self.__settings += 1
+
+    def get_dataset_hash(self) -> str:
+        """
+        Return the sha256 hash of the database file.
+
+        The hash is only recomputed when the size or modification time of
+        the file changes.
+
+        Returns:
+            str: hex digest of the database file
+        """
+        stat = os.stat(self.db_path)
+        key = (self.db_path, stat.st_size, stat.st_mtime_ns)
+        if getattr(self, "_dataset_hash_key", None) != key:
+            self._dataset_hash = self.file_hash(self.db_path)
+            self._dataset_hash_key = key
+        return self._dataset_hash
+
+    @staticmethod
+    def file_hash(fp: str) -> str:
+        """
+        Return the sha256 hash of a database file.
+
+        Args:
+            fp (str): path of the database
+
+        Returns:
+            str: hex digest of the file
+        """
+        digest = hashlib.sha256()
+        with open(fp, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def get_connection(self) -> sqlite3.Connection:
         """
-        Return a connection to the database in `config.py`.
+        Return the connection of this thread to the database.
+
+        The connection is kept for the thread to reuse, so it should not be
+        closed by the caller, see close().
 
         Returns:
             sqlite3.Connection: the connection to the sqlite3 database
         """
-        return sqlite3.connect(self.db_path)
+        thread = self.__local
+        conn = getattr(thread, "conn", None)
+        identity = self.__file_identity()
+        if conn is not None and thread.settings == self.__settings \
+                and thread.identity == identity:
+            return conn
+        if conn is not None:
+            conn.close()
+
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True,
+                cached_statements=self.cached_statements)
+        else:
+            conn = sqlite3.connect(self.db_path,
+                                   cached_statements=self.cached_statements)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.pragmas.items():
+            if pragma == "journal_mode" and self.read_only:
+                continue
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        if self.read_only:
+            conn.execute("PRAGMA query_only = ON;")
+
+        thread.conn, thread.settings = conn, self.__settings
+        # of the file before the connection opened it, so a file replaced
+        # in between is reopened on the next call
+        thread.identity = identity
+        with self.__lock:
+            self.__connections_opened += 1
+        self.__count(connections=1)
+        return conn
+
+    def __file_identity(self) -> Optional[tuple[int, int]]:
+        """Device and inode of the database file, None if it is missing.
+
+        Writes in place are seen by an open connection, only a replaced
+        file needs a new one.
+        """
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def close(self) -> None:
+        """Close the connection of this thread, if it has one."""
+        conn = getattr(self.__local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.__local.conn = None
+
+    def discard_connections(self) -> None:
+        """
+        Forget the connection of every thread without closing it.
+
+        For a forked process, where the connections belong to the parent
+        and are not safe to use or close.
+        """
+        self.__local = local()
+
+    def __count(self, connections: int = 0, statements: int = 0) -> None:
+        thread = self.__local
+        thread.connections = getattr(thread, "connections", 0) + connections
+        thread.statements = getattr(thread, "statements", 0) + statements
+        if statements:
+            with self.__lock:
+                self.__statements_run += statements
+
+    def stats(self) -> dict[str, int]:
+        """
+        Connections opened and statements run by every thread.
+
+        Returns:
+            dict: with keys (connections_opened, statements_run)
+        """
+        with self.__lock:
+            return {"connections_opened": self.__connections_opened,
+                    "statements_run": self.__statements_run, }
+
+    def request_stats(self) -> dict[str, int]:
+        """
+        Connections opened and statements run by this thread since
+        reset_request_stats().
+
+        Returns:
+            dict: with keys (connections_opened, statements_run)
+        """
+        return {"connections_opened": getattr(self.__local, "connections", 0),
+                "statements_run": getattr(self.__local, "statements", 0), }
+
+    def reset_request_stats(self) -> None:
+        """Start counting request_stats() of this thread from zero."""
+        self.__local.connections = 0
+        self.__local.statements = 0
 
     def execute(self, cmd, parameters=None) -> list:
         """
@@ -36,17 +218,17 @@ class Datastore:
             list: list of the results of the SQL commands
         """
         conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
         cur = conn.cursor()
         if parameters is None:
             cur.execute(cmd)
         else:
             cur.execute(cmd, parameters)
+        self.__count(statements=1)
 
         results = cur.fetchall()
-        conn.commit()
+        if conn.in_transaction:
+            conn.commit()
         cur.close()
-        conn.close()
         return results
 
     def create_table(self, table_name: str) -> None:
@@ -71,9 +253,9 @@ class Datastore:
         conn = self.get_connection()
         cur = conn.cursor()
         cur.executemany(SQLcmds[f"insert_{table_name}"], records)
+        self.__count(statements=1)
         conn.commit()
         cur.close()
-        conn.close()
 
     def insert_bus_stops(self, bus_stops: list[dict]) -> None:
         """
@@ -108,16 +290,14 @@ class Datastore:
         Returns:
             list: list with elements of dictionary
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
+        cur = self.get_connection().cursor()
         cur.execute(
             f"""SELECT * FROM {table_name};""",
         )
+        self.__count(statements=1)
         result = [dict(row) for row in cur.fetchall()]
 
         cur.close()
-        conn.close()
         return result
 
     def get_bus_stop_info(self, bus_stop_code: str) -> dict:
@@ -171,3 +351,49 @@ class Datastore:
                 (bus_stop_code, service_no, direction),
             )
         ]
+
+    def get_segment_distance(self, start_code: str, end_code: str,
+                             service_no: str, direction: int
+                             ) -> Optional[float]:
+        """Distance travelled by a service between two bus stops.
+
+        Args:
+            start_code (str): bus stop code boarded at
+            end_code (str): bus stop code alighted at
+            service_no (str): the service number
+            direction (int): the direction it is travelling
+
+        Returns:
+            float: the distance, see shortest_segment()
+        """
+        starts, ends = (
+            [tuple(row) for row in self.execute(
+                SQLcmds["get_stop_distances"],
+                (bus_stop_code, service_no, direction))]
+            for bus_stop_code in (start_code, end_code))
+        return self.shortest_segment(starts, ends)
+
+    @staticmethod
+    def shortest_segment(starts: list[tuple[int, float]],
+                         ends: list[tuple[int, float]]) -> Optional[float]:
+        """Shortest ride between any visit to the start and a later visit to
+        the end, for loop services that visit a stop more than once.
+
+        Args:
+            starts (list): (position, distance) of each visit to the start
+            ends (list): (position, distance) of each visit to the end
+
+        Returns:
+            float: the distance. None if the end is never visited after the
+                start, as the service does not ride that way, or if the
+                distances needed are missing.
+        """
+        shortest = None
+        for start_position, start_dist in starts:
+            for end_position, end_dist in ends:
+                if (end_position > start_position
+                        and start_dist is not None and end_dist is not None
+                        and (shortest is None
+                             or end_dist - start_dist < shortest)):
+                    shortest = end_dist - start_dist
+        return shortest
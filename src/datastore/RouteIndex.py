@@ -0,0 +1,229 @@
+"""In-memory index of the bus routes and bus stops tables."""
+from array import array
+from threading import Lock
+from typing import Optional
+
+from .Datastore import Datastore
+from .sqlcmds import SQLcmds
+
+
+class RouteTables:
+    """
+    One build of the tables of a RouteIndex.
+
+    A build is never changed after it is made, so the tables read from one
+    always match.
+
+    Attributes:
+
+        + routes (dict): (service_no, direction): tuple of bus stop codes
+            ordered by stop sequence
+        + sequences (dict): (service_no, direction): array of stop sequences
+        + distances (dict): (service_no, direction): array of the distance
+            from the start of the route at each stop, NaN if missing
+        + buses_at (dict): bus_stop_code: tuple of
+            (service_no, direction, stop_sequence)
+        + positions (dict): (service_no, direction): dict of
+            bus_stop_code: positions of the stop in the route
+        + stops (dict): bus_stop_code: dict of the bus stop info
+    """
+    __slots__ = ("routes", "sequences", "distances", "buses_at", "positions",
+                 "stops")
+
+    def __init__(self, routes: dict, sequences: dict, distances: dict,
+                 buses_at: dict, positions: dict, stops: dict) -> None:
+        self.routes = routes
+        self.sequences = sequences
+        self.distances = distances
+        self.buses_at = buses_at
+        self.positions = positions
+        self.stops = stops
+
+
+class RouteIndex:
+    """
+    Answer the route lookups of Datastore from memory.
+
+    The index is built once, on first use, from a single read of the
+    bus_routes and bus_stops tables. A rebuild makes new RouteTables and
+    swaps them in with one assignment, so a lookup running at the same
+    time reads either the old tables or the new ones, never a mix.
+
+    Attributes:
+
+        + datastore (Datastore): datastore the index is built from
+        + tables (RouteTables): the current build, read it once and use
+            that for lookups that must match
+
+    Methods:
+
+        + build(): (Re)load the index from the database.
+        + get_bus_stop_info(bus_stop_code): info of a bus stop
+        + get_buses_at(bus_stop_code): buses at a bus stop
+        + get_bus_routes(service_no, direction): bus stop codes of a route
+        + get_distances(bus_stop_code, service_no, direction): distances of
+            the service at a bus stop
+        + get_segment_distance(start_code, end_code, service_no, direction):
+            distance travelled by a service between two bus stops
+    """
+    __instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__instance is None:
+            cls.__instance = object.__new__(cls)
+            cls.__instance.__tables = None
+            cls.__instance.__lock = Lock()
+        return cls.__instance
+
+    def __init__(self, datastore: Datastore = None) -> None:
+        if datastore is not None:
+            self.datastore = datastore
+        elif not hasattr(self, "datastore"):
+            self.datastore = Datastore()
+
+    @property
+    def tables(self) -> RouteTables:
+        """The current build of the tables, built on first use."""
+        tables = self.__tables
+        if tables is None:
+            self.ensure_built()
+            tables = self.__tables
+        return tables
+
+    def build(self) -> None:
+        """(Re)load the index from the database."""
+        routes: dict[tuple[str, int], list[str]] = {}
+        sequences: dict[tuple[str, int], array] = {}
+        distances: dict[tuple[str, int], array] = {}
+        buses_at: dict[str, list[tuple[str, int, int]]] = {}
+
+        for row in self.datastore.execute(SQLcmds["get_all_bus_routes"]):
+            service_no, direction, stop_sequence, bus_stop_code, dist = row
+            key = (service_no, direction)
+            if key not in routes:
+                routes[key] = []
+                sequences[key] = array("i")
+                distances[key] = array("d")
+            routes[key].append(bus_stop_code)
+            sequences[key].append(stop_sequence)
+            # missing distances are stored as NaN to keep the array compact
+            distances[key].append(dist if dist is not None else float("nan"))
+            buses_at.setdefault(bus_stop_code, []).append(
+                (service_no, direction, stop_sequence))
+
+        route_codes = {key: tuple(codes) for key, codes in routes.items()}
+        positions: dict[tuple[str, int], dict[str, tuple[int, ...]]] = {}
+        for key, codes in route_codes.items():
+            route_positions = positions[key] = {}
+            for position, code in enumerate(codes):
+                route_positions[code] = \
+                    route_positions.get(code, ()) + (position,)
+        # published whole, for the lookups running during a rebuild
+        self.__tables = RouteTables(
+            routes=route_codes,
+            sequences=sequences,
+            distances=distances,
+            buses_at={code: tuple(buses)
+                      for code, buses in buses_at.items()},
+            positions=positions,
+            stops={record["bus_stop_code"]: record
+                   for record in self.datastore.retrieve_all("bus_stops")})
+
+    def ensure_built(self) -> None:
+        """Build the index if it has not been built."""
+        if self.__tables is not None:
+            return
+        with self.__lock:
+            if self.__tables is None:
+                self.build()
+
+    def get_bus_stop_info(self, bus_stop_code: str) -> dict:
+        """Retrieve info of a bus stop.
+
+        Args:
+            bus_stop_code (str): valid bus stop code.
+
+        Raises:
+            LookupError: When invalid bus stop code is given
+
+        Returns:
+            dict: dictionary with the info of the bus stop.
+        """
+        stops = self.tables.stops
+        if bus_stop_code not in stops:
+            raise LookupError("Invalid bus stop")
+        return dict(stops[bus_stop_code])
+
+    def get_buses_at(self, bus_stop_code: str) -> tuple:
+        """Get the buses at a bus stop.
+
+        Args:
+            bus_stop_code (str): the bus stop code
+
+        Returns:
+            tuple: containing tuple(service_no, direction, stop_sequence)
+        """
+        return self.tables.buses_at.get(bus_stop_code, ())
+
+    def get_bus_routes(self, service_no: str, direction: int) -> list[str]:
+        """Returns list of bus stop code
+
+        Args:
+            service_no (str): the service number
+            direction (int): the direction it is travelling
+
+        Returns:
+            list[str]: list of bus stop code
+        """
+        return list(self.tables.routes.get((service_no, direction), ()))
+
+    def get_distances(self, bus_stop_code: str, service_no: str,
+                      direction: int) -> list:
+        """Get the distances of the service at a bus stop.
+
+        Args:
+            bus_stop_code (str): the bus stop code
+            service_no (str): the service number
+            direction (int): the direction it is travelling
+
+        Returns:
+            list: containing distances ordered by ascending stop sequence
+        """
+        tables = self.tables
+        key = (service_no, direction)
+        distances = tables.distances.get(key, ())
+        positions = tables.positions.get(key, {})
+        return [
+            self.distance_at(distances, position)
+            for position in positions.get(bus_stop_code, ())
+        ]
+
+    def get_segment_distance(self, start_code: str, end_code: str,
+                             service_no: str, direction: int
+                             ) -> Optional[float]:
+        """Distance travelled by a service between two bus stops.
+
+        Args:
+            start_code (str): bus stop code boarded at
+            end_code (str): bus stop code alighted at
+            service_no (str): the service number
+            direction (int): the direction it is travelling
+
+        Returns:
+            float: the distance, see Datastore.shortest_segment()
+        """
+        tables = self.tables
+        key = (service_no, direction)
+        positions = tables.positions.get(key, {})
+        distances = tables.distances.get(key, ())
+        starts, ends = (
+            [(position, self.distance_at(distances, position))
+             for position in positions.get(bus_stop_code, ())]
+            for bus_stop_code in (start_code, end_code))
+        return Datastore.shortest_segment(starts, ends)
+
+    @staticmethod
+    def distance_at(distances: array, position: int) -> Optional[float]:
+        """Distance at a position of a route, None if missing."""
+        dist = distances[position]
+        return None if dist != dist else dist  # NaN is the missing distance
@@ -1,3 +1,5 @@
 """All functionalities to deal with the database."""
 from .Datastore import Datastore
+from .RouteIndex import RouteIndex
 from .sqlcmds import SQLcmds
+from .migrations import migrate, migrate_file
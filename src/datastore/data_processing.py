@@ -2,10 +2,125 @@
 To help to process data and converting to a usable form.
 
 Running this will help to save all the data in a database.
+
+The JSON files are parsed as a stream, so only one chunk of records is in
+memory at a time. Each file may be a list of records, or a DataMall page
+with the records under "value". Many files, such as the pages of a
+DataMall dump, are parsed in parallel.
+
+The database is built in a new file that replaces the old one when
+finished, so the app keeps serving the old data until then.
+
+Usage (from the project root):
+    python src/datastore/data_processing.py
+        [--stops FILE ...] [--routes FILE ...] [--db PATH]
+        [--chunk-size N] [--workers N]
 """
 
+import argparse
 import json
 import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Callable, Iterator
+
+# DataMall pages have the records under "value"
+DATAMALL_VALUE = re.compile(r'"value"\s*:\s*\[')
+
+BUS_STOP_FIELDS = {
+    'bus_stop_code': "BusStopCode",
+    'road_name': "RoadName",
+    'description': "Description",
+    'latitude': "Latitude",
+    'longitude': "Longitude",
+}
+BUS_ROUTE_FIELDS = {
+    'service_no': "ServiceNo",
+    'direction': "Direction",
+    'stop_sequence': "StopSequence",
+    'bus_stop_code': "BusStopCode",
+    'distance': "Distance",
+}
+
+
+def iter_json_records(f: IO[str], chunk_size: int = 1 << 16
+                      ) -> Iterator[dict]:
+    """Parse the records of a JSON list one at a time.
+
+    Args:
+        f (IO[str]): file with a list of records, or a DataMall page with
+            the list under "value"
+        chunk_size (int, optional): characters read at a time.
+
+    Raises:
+        ValueError: The file is not a list of records.
+
+    Yields:
+        dict: each record
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def more() -> None:
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    # find the start of the list
+    while True:
+        stripped = buffer.lstrip()
+        if stripped.startswith("["):
+            position = len(buffer) - len(stripped) + 1
+            break
+        if stripped.startswith("{"):
+            match = DATAMALL_VALUE.search(buffer)
+            if match is not None:
+                position = match.end()
+                break
+        elif stripped:
+            raise ValueError("Expected a list of records")
+        if eof:
+            raise ValueError("Expected a list of records")
+        more()
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise ValueError("Unterminated list of records")
+            more()
+            continue
+        if buffer[position] == "]":
+            return
+        try:
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # the record continues in the next chunk
+            if eof:
+                raise
+            more()
+            continue
+        yield record
+
+
+def iter_records(filepath: str, fields: dict[str, str]) -> Iterator[dict]:
+    """Read the records of a JSON file, renaming the fields.
+
+    Args:
+        filepath (str): file path of the json
+        fields (dict): field name: name of the field in the json
+
+    Yields:
+        dict: with keys of fields
+    """
+    with open(filepath, "r", newline="") as f:
+        for record in iter_json_records(f):
+            yield {field: record[key] for field, key in fields.items()}
 
 
 def read_bus_stops(filepath):
@@ -18,20 +133,7 @@ def read_bus_stops(filepath):
         list of dict: keys : ("bus_stop_code", "road_name", "description",
         "latitude", "longitude")
     """
-    datas = []
-    with open(filepath, "r", newline="") as f:
-        bus_stops_data = json.load(f)
-        for bus_stop in bus_stops_data:
-            tmp = {
-                'bus_stop_code': bus_stop["BusStopCode"],
-                'road_name': bus_stop["RoadName"],
-                'description': bus_stop["Description"],
-                'latitude': bus_stop["Latitude"],
-                'longitude': bus_stop["Longitude"],
-            }
-
-            datas.append(tmp)
-    return datas
+    return list(iter_records(filepath, BUS_STOP_FIELDS))
 
 
 def read_bus_routes(filepath):
@@ -45,41 +147,162 @@ def read_bus_routes(filepath):
             list of dictionary with keys
             (service_no, direction, stop_sequence, bus_stop_code, distance)
     """
-    datas = []
-    with open(filepath, "r") as f:
-        bus_routes = json.load(f)
-        for bus_route in bus_routes:
-            tmp =s {
-                'service_no': bus_route["ServiceNo"],
-                'direction': bus_route["Direction"],
-                'stop_sequence': bus_route["StopSequence"],
-                'bus_stop_code': bus_route["BusStopCode"],
-                'distance': bus_route["Distance"],
-            }
-
-            datas.append(tmp)
-    return datas
+    return list(iter_records(filepath, BUS_ROUTE_FIELDS))
+
+
+def parse_file(filepath: str, fields: dict[str, str]) -> list[tuple]:
+    """Read a whole file as rows, for the parallel parsing workers.
+
+    Args:
+        filepath (str): file path of the json
+        fields (dict): field name: name of the field in the json
+
+    Returns:
+        list: tuples of the fields, in order
+    """
+    return [tuple(record.values())
+            for record in iter_records(filepath, fields)]
+
+
+def iter_chunks(filepaths: list[str], fields: dict[str, str],
+                chunk_size: int, workers: int) -> Iterator[list[tuple]]:
+    """Rows of many files, a chunk at a time.
+
+    A single file is streamed. Many files are parsed in parallel, each
+    file being one chunk.
+
+    Args:
+        filepaths (list): file paths of the json
+        fields (dict): field name: name of the field in the json
+        chunk_size (int): rows in a chunk of a streamed file
+        workers (int): processes parsing files
+
+    Yields:
+        list: tuples of the fields, in order
+    """
+    if workers > 1 and len(filepaths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(parse_file, filepaths,
+                                    [fields] * len(filepaths))
+        return
+    for filepath in filepaths:
+        chunk = []
+        for record in iter_records(filepath, fields):
+            chunk.append(tuple(record.values()))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def report(table: str, rows: int, begin: float, end: str = "") -> None:
+    """Print the progress of a table on one line."""
+    print(f"\r{table}: {rows} rows in {time.perf_counter() - begin:.1f}s",
+          end=end, file=sys.stderr, flush=True)
+
+
+def ingest(db_path: str, bus_stop_files: list[str],
+           bus_route_files: list[str], chunk_size: int = 10000,
+           workers: int = os.cpu_count() or 1,
+           progress: Callable[..., None] = report,
+           graph_path: str = None) -> None:
+    """Build the database from the json files.
+
+    The rows are loaded into staging tables without constraints in one
+    transaction, then copied into the tables in primary key order, and the
+    migrations, which create the indexes, run last. The database is built
+    in a new file that replaces db_path when finished.
+
+    Args:
+        db_path (str): path of the database
+        bus_stop_files (list): bus stop json files
+        bus_route_files (list): bus routes json files
+        chunk_size (int, optional): rows inserted at a time.
+        workers (int, optional): processes parsing files, when there are
+            many files. Defaults to the number of CPUs.
+        progress (Callable, optional): called with (table, rows, start
+            time) after each chunk, and with end="\\n" after each table.
+            Defaults to printing it.
+        graph_path (str, optional): graph cache built from the old
+            database, patched for the new one. Defaults to None.
+    """
+    from datastore import Datastore, SQLcmds
+    from datastore.migrations import migrate
+
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    ds = Datastore()
+    settings = (ds.db_path, ds.read_only)
+    Datastore(tmp_path, read_only=False)
+    try:
+        conn = ds.get_connection()
+        conn.execute("PRAGMA synchronous = OFF;")
+        tables = [("bus_stops", bus_stop_files, BUS_STOP_FIELDS),
+                  ("bus_routes", bus_route_files, BUS_ROUTE_FIELDS)]
+        with conn:  # a single transaction
+            for table, filepaths, fields in tables:
+                staging = f"{table}_staging"
+                conn.execute(f'CREATE TABLE "{staging}" '
+                             f'({", ".join(fields)});')
+                insert = (f'INSERT INTO "{staging}" VALUES '
+                          f'({", ".join("?" * len(fields))});')
+                rows, begin = 0, time.perf_counter()
+                for chunk in iter_chunks(filepaths, fields, chunk_size,
+                                         workers):
+                    conn.executemany(insert, chunk)
+                    rows += len(chunk)
+                    progress(table, rows, begin)
+                progress(table, rows, begin, end="\n")
+
+            for table, _, fields in tables:
+                conn.execute(SQLcmds[f"create_{table}_table"])
+                conn.execute(SQLcmds[f"copy_{table}_staging"])
+                conn.execute(f'DROP TABLE "{table}_staging";')
+        # the indexes are created after the data is loaded
+        migrate(conn)
+        ds.close()
+        if graph_path is not None and os.path.exists(db_path):
+            from GraphUpdate import update_graph_cache
+
+            affected = update_graph_cache(graph_path, db_path, tmp_path)
+            if affected is not None:
+                print(f"graph: {affected} stops updated", file=sys.stderr)
+        os.replace(tmp_path, db_path)
+    finally:
+        ds.close()
+        Datastore(*settings)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 if __name__ == "__main__":
     # so the config files can be found
-    import sys
     sys.path.append(os.getcwd()+'/src')
 
     import config
 
-    from datastore import Datastore
-
-    ds = Datastore(config.db_path)
-    ds.execute('DROP TABLE IF EXISTS "bus_stops";')
-    ds.execute('DROP TABLE IF EXISTS "bus_routes"')
-
-    ds.create_table('bus_stops')
-    ds.create_table('bus_routes')
+    parser = argparse.ArgumentParser(
+        description="Build the database from the LTA DataMall json files.")
+    parser.add_argument(
+        "--stops", nargs="+",
+        default=[os.path.sep.join(["src", "data", "bus_stops.json"])],
+        help="bus stop json files")
+    parser.add_argument(
+        "--routes", nargs="+",
+        default=[os.path.sep.join(["src", "data", "bus_routes.json"])],
+        help="bus routes json files")
+    parser.add_argument("--db", default=config.db_path,
+                        help="path of the database")
+    parser.add_argument("--graph", default=config.graph_path,
+                        help="graph cache to patch for the new database")
+    parser.add_argument("--chunk-size", type=int, default=10000,
+                        help="rows inserted at a time")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes parsing files")
+    args = parser.parse_args()
 
-    bus_stops = read_bus_stops(os.path.sep.join(
-        ["src", "data", "bus_stops.json"]))
-    bus_routes = read_bus_routes(
-        os.path.sep.join(["src", "data", "bus_routes.json"]))
-    ds.insert_bus_stops(bus_stops)
-    ds.insert_bus_routes(bus_routes)
+    ingest(args.db, args.stops, args.routes, chunk_size=args.chunk_size,
+           workers=args.workers, graph_path=args.graph)
@@ -0,0 +1,107 @@
+"""
+Versioned schema migrations of the database.
+
+The version of a database is kept in PRAGMA user_version. Each migration
+moves it up by one, so migrate() only runs the ones a database is missing.
+"""
+import sqlite3
+
+# (description, SQL commands), the migration to version i + 1 at index i
+MIGRATIONS: list[tuple[str, list[str]]] = [
+    (
+        "Covering indexes for the queries by route and by bus stop",
+        [
+            # superseded by bus_routes_by_stop
+            """
+    DROP INDEX IF EXISTS "bus_routes_bus_stop_code";
+""",
+            # get_bus_routes, find_connected_bus_stop, get_all_bus_routes
+            """
+    CREATE INDEX IF NOT EXISTS "bus_routes_by_route"
+    ON "bus_routes" ("service_no", "direction", "stop_sequence",
+        "bus_stop_code", "distance");
+""",
+            # get_buses_at, get_distance, get_stop_distances
+            """
+    CREATE INDEX IF NOT EXISTS "bus_routes_by_stop"
+    ON "bus_routes" ("bus_stop_code", "service_no", "direction",
+        "stop_sequence", "distance");
+""",
+        ],
+    ),
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Version of the schema of a database."""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> list[int]:
+    """Run the migrations a database is missing.
+
+    Each migration runs in its own transaction with the new version, so a
+    failed migration leaves the database at the version before it.
+
+    Args:
+        conn (sqlite3.Connection): writable connection to the database
+
+    Raises:
+        RuntimeError: The database is newer than this code.
+
+    Returns:
+        list: versions migrated to
+    """
+    version = schema_version(conn)
+    if version > len(MIGRATIONS):
+        raise RuntimeError(f"Database schema version {version} is newer "
+                           f"than the latest migration {len(MIGRATIONS)}")
+    migrated = []
+    for version, (_, commands) in enumerate(MIGRATIONS[version:],
+                                            start=version + 1):
+        with conn:
+            for cmd in commands:
+                conn.execute(cmd)
+            conn.execute(f"PRAGMA user_version = {version};")
+        migrated.append(version)
+    return migrated
+
+
+def migrate_file(db_path: str) -> list[int]:
+    """Run the migrations a database file is missing.
+
+    Args:
+        db_path (str): path of the database
+
+    Returns:
+        list: versions migrated to
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if schema_version(conn) == len(MIGRATIONS):
+            return []  # nothing is written, so the dataset hash is kept
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+def query_plans(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    """The query plan of every query in SQLcmds.
+
+    Args:
+        conn (sqlite3.Connection): connection to the database
+
+    Returns:
+        dict: name of the query: detail of each step of its plan
+    """
+    from datastore import SQLcmds
+
+    plans = {}
+    for name, cmd in SQLcmds.items():
+        if not isinstance(cmd, str) or \
+                not cmd.lstrip().upper().startswith("SELECT"):
+            continue
+        parameters = [None] * cmd.count("?")
+        plans[name] = [row[-1] for row in conn.execute(
+            f"EXPLAIN QUERY PLAN {cmd}", parameters)]
+    return plans
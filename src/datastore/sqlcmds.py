@@ -21,6 +21,16 @@ SQLcmds = {
         PRIMARY KEY ("service_no", "direction", "stop_sequence"),
         FOREIGN KEY ("bus_stop_code") REFERENCES "bus_stops"("bus_stop_code")
     );
+""",
+    "copy_bus_stops_staging": """
+    INSERT INTO "bus_stops"
+    SELECT * FROM "bus_stops_staging"
+    ORDER BY "bus_stop_code";
+""",
+    "copy_bus_routes_staging": """
+    INSERT INTO "bus_routes"
+    SELECT * FROM "bus_routes_staging"
+    ORDER BY "service_no", "direction", "stop_sequence";
 """,
     "insert_bus_stops": """
     INSERT INTO "bus_stops" 
@@ -34,6 +44,12 @@ SQLcmds = {
     SELECT bus_stop_code FROM "bus_routes"
     WHERE service_no=? AND direction=?
     ORDER BY stop_sequence ASC;
+""",
+    "get_all_bus_routes": """
+    SELECT "service_no", "direction", "stop_sequence", "bus_stop_code",
+        "distance"
+    FROM "bus_routes"
+    ORDER BY "service_no", "direction", "stop_sequence" ASC;
 """,
     "find_connected_bus_stop": """
     SELECT bus_stop_code FROM "bus_routes"
@@ -43,6 +59,11 @@ SQLcmds = {
     SELECT distance FROM "bus_routes"
     WHERE bus_stop_code=? AND service_no=? AND direction=?
     ORDER BY stop_sequence ASC;
+""",
+    "get_stop_distances": """
+    SELECT stop_sequence, distance FROM "bus_routes"
+    WHERE bus_stop_code=? AND service_no=? AND direction=?
+    ORDER BY stop_sequence ASC;
 """,
     "get_buses_at": """
     SELECT "service_no", "direction", "stop_sequence" FROM "bus_routes" 
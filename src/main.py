@@ -1,19 +1,55 @@
 """File to start the flask app."""
-from threading import Thread
+from typing import Optional
 
-from flask import Flask, render_template, request
+from flask import (Flask, Response, abort, jsonify, render_template, request,
+                   stream_with_context, url_for)
 from flask_cors import CORS
 
 import config
 import request as req
-from Graph import Graph
+from datastore import Datastore, migrate_file
+from JobManager import Job, JobManager
+from Metrics import Metrics, Span, record_span
 from pathfinding import search_path, sort_paths
-from webui import ProcessStatus
+from ResidentGraph import ResidentGraph
+from ResultCache import ResultCache
+from SortPool import SortPool
+from response import ProcessingSuccess, Result, ResultError
+
+# bring the schema up to date before opening it read only
+migrate_file(config.db_path)
+# serve from pooled, read only connections
+Datastore(config.db_path, read_only=config.db_read_only,
+          pragmas=config.db_pragmas,
+          cached_statements=config.db_cached_statements)
 
 app = Flask(__name__)
 app.secret_key = "098765456789"
 CORS(app)
 
+# loaded once and shared by every request
+resident_graph = ResidentGraph()
+job_manager = JobManager(max_workers=config.search_workers,
+                         max_queue=config.search_queue_size,
+                         ttl=config.job_ttl)
+result_cache = ResultCache(maxsize=config.result_cache_size,
+                           ttl=config.result_cache_ttl)
+
+
+@app.before_request
+def count_queries():
+    """Count the database work of each request from zero."""
+    Datastore().reset_request_stats()
+
+
+@app.after_request
+def report_queries(response):
+    """Report the database work of the request in its headers."""
+    stats = Datastore().request_stats()
+    response.headers["X-DB-Connections"] = stats["connections_opened"]
+    response.headers["X-DB-Statements"] = stats["statements_run"]
+    return response
+
 
 @app.route("/")
 def root():
@@ -24,41 +60,77 @@ def root():
 @app.route("/processing", methods=["POST"])
 def processing():
     """Return a processing page, to show progress updated from the api."""
-    global process_status
-    process_status = ProcessStatus()
-    global path_summary_request
     path_summary_request = req.PathSummaryRequest(request)
 
     result = path_summary_request.validate()
+    if not isinstance(result, ProcessingSuccess):
+        return result.html()
 
-    Thread(target=finding_path,
-           args=path_summary_request.to_find_path()).start()
+    try:
+        job = job_manager.submit(path_summary_request, finding_path,
+                                 *path_summary_request.to_find_path())
+    except RuntimeError as e:
+        return ResultError(message=str(e)).html()
 
+    result.job_id = job.job_id
     return result.html()
 
 
-def finding_path(start_stop_code,
+def finding_path(job: Job,
+                 start_stop_code,
                  end_stop_code,
                  criteria) -> None:
-    """Find path, redirects to results when finished."""
-
-    graph = Graph()
-    process_status.set_status("Creating bus routes graph", main_status=True)
-    graph.create_graph()
+    """Find path, redirects to results when finished.
 
-    path_lists = search_path(
-        start_stop_code, end_stop_code, graph, process_status=process_status)
-    paths_summary = sort_paths(
-        path_lists, criteria, process_status=process_status)
-
-    path_summary_request.set_paths_summary(paths_summary.data, summarise=True)
-    process_status.status_done = True
-
-
-@app.route("/paths_summary")
-def paths_summary():
-    """Return the results page."""
-    return path_summary_request.handle().html()
+    The JobManager marks the status done once the job is finished.
+    """
+    process_status = job.process_status
+
+    with Span("search") as search_span:
+        with Span("graph") as span:
+            graph, version = resident_graph.current()
+        record_span(span, process_status)
+        process_status.graph_version = version
+
+        result_cache.invalidate(version)
+        key = (start_stop_code.bus_stop_code, end_stop_code.bus_stop_code,
+               criteria, version)
+        paths_summary = result_cache.get(key)
+        if paths_summary is None:
+            backend = config.search_backends.get(criteria, "bfs")
+            path_lists = search_path(
+                start_stop_code, end_stop_code, graph,
+                process_status=process_status,
+                backend=backend, k=config.shortest_journeys)
+            paths_summary = sort_paths(
+                path_lists, criteria, process_status=process_status,
+                backend=backend, top_k=config.top_paths,
+                parallel=config.sort_workers > 1).data
+            result_cache.put(key, paths_summary)
+        else:
+            process_status.set_status("Found cached bus connections.",
+                                      main_status=True)
+
+        job.request.set_paths_summary(paths_summary, summarise=True)
+    search_span.candidates = len(paths_summary)
+    record_span(search_span, process_status)
+
+
+def job_result(job: Optional[Job]) -> Result:
+    """Result page of a job, or an error if it has no result."""
+    if job is None:
+        return ResultError(message="Search not found or expired")
+    if job.error is not None:
+        return ResultError(message="Search failed")
+    if not job.done:
+        return ResultError(message="Search is still running")
+    return job.request.handle()
+
+
+@app.route("/paths_summary/<job_id>")
+def job_paths_summary(job_id):
+    """Return the results page of a search."""
+    return job_result(job_manager.get(job_id)).html()
 
 
 @app.route("/path_info")
@@ -71,10 +143,60 @@ def path_info():
     return req.PathInfoRequest(request).handle().html()
 
 
-@app.route("/api/v1/status")
-def status():
-    """To return status of the run."""
-    return process_status.jsonify()
+@app.route("/api/v1/status/<job_id>")
+def job_status(job_id):
+    """To return status of a run."""
+    job = job_manager.get(job_id)
+    if job is None:
+        abort(404)
+    return job.process_status.jsonify()
+
+
+@app.route("/api/v1/status/<job_id>/stream")
+def job_status_stream(job_id):
+    """To stream status of a run as server-sent events."""
+    job = job_manager.get(job_id)
+    if job is None:
+        abort(404)
+    events = job.process_status.stream(
+        max_rate=config.status_stream_rate,
+        result_url=url_for("job_paths_summary", job_id=job_id))
+    return Response(stream_with_context(events),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache",
+                             "X-Accel-Buffering": "no"})
+
+
+@app.route("/api/v1/jobs")
+def jobs():
+    """To return counts of the searches, including the queue depth."""
+    return jsonify(job_manager.metrics())
+
+
+@app.route("/api/v1/db")
+def db():
+    """To return the connections opened and statements run."""
+    return jsonify(Datastore().stats())
+
+
+@app.route("/api/v1/cache")
+def cache():
+    """To return hit and miss counts of the result cache."""
+    return jsonify(result_cache.stats())
+
+
+@app.route("/api/v1/metrics")
+def metrics():
+    """To return the stage histograms and counts in Prometheus format."""
+    jobs, cache_stats = job_manager.metrics(), result_cache.stats()
+    text = Metrics().render(
+        counters={"search_jobs": {name: jobs.pop(name) for name in
+                                  ("completed", "failed", "rejected")},
+                  "result_cache": {name: cache_stats.pop(name) for name in
+                                   ("hits", "misses", "evictions")},
+                  "db": Datastore().stats()},
+        gauges={"search_jobs": jobs, "result_cache": cache_stats})
+    return Response(text, mimetype="text/plain; version=0.0.4")
 
 
 @app.route("/api/v1/allbusstopinfo")
@@ -82,4 +204,23 @@ def info():
     return req.AllStopInfoRequest(request).handle().jsonify()
 
 
-app.run(host=config.host, port=config.port, debug=True)
+@app.route("/api/v1/stops/search")
+def stop_search():
+    """Return the stops matching a query, for autocomplete."""
+    return req.StopSearchRequest(request).handle().jsonify()
+
+
+@app.route("/api/v1/stops/nearby", methods=["GET", "POST"])
+def nearby_stops():
+    """Return the stops nearest to, or within a radius of, a location."""
+    return req.NearbyStopsRequest(request).handle().jsonify()
+
+
+resident_graph.load()
+if config.sort_workers > 1:
+    # forked before the threads below start
+    SortPool(config.sort_workers).start()
+resident_graph.watch(config.graph_reload_interval)
+# the reloader imports this module again in a child process, which would
+# migrate, load the graph, fork the sort pool and watch a second time
+app.run(host=config.host, port=config.port, debug=True, use_reloader=False)
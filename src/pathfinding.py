@@ -1,18 +1,31 @@
 """Functions to help find the path."""
 
-from typing import Any, Optional
+import heapq
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from itertools import count
+from typing import Any, Callable, Iterator, Optional, Union
 
-from bus import BusStop, find_bus_path
+from bus import BusStop, RouteSegment, find_bus_path
 from OrderedList import OrderedList
 from Graph import Graph
+from Metrics import Span, record_span
+from routing import RaptorRouter, ShortestPathRouter
+from SortPool import SortPool
 from webui import ProcessStatus
 
+BACKENDS = {"bfs", "raptor", "astar"}
+# criteria: keys to sort by, the other criteria breaks ties
+SORT_KEYS = {"dist": ("dist", "transfer"), "transfer": ("transfer", "dist")}
+
 
 def search_path(start_stop: BusStop,
                 end_stop: BusStop,
                 graph: Graph,
-                process_status: Optional[ProcessStatus] = None
-                ) -> list[list[BusStop]]:
+                process_status: Optional[ProcessStatus] = None,
+                backend: str = "bfs",
+                k: int = 5
+                ) -> Union[list[list[BusStop]], list[list[RouteSegment]]]:
     """Search for all paths between 2 points combination.
 
     Args:
@@ -20,65 +33,354 @@ def search_path(start_stop: BusStop,
             Contains tuple(start_bus_stop_code, end_bus_stop_code)
         graph (Graph): Graph object with a graph
         process_status (ProcessStatus, optional): The process_status to update.
+        backend (str, optional): Search to use in {"bfs", "raptor", "astar"}.
+            "bfs" searches the stop graph for paths of stops,
+            "raptor" searches the bus routes for journeys of RouteSegment with
+            the fewest transfers, "astar" for the k shortest journeys of
+            RouteSegment. Defaults to "bfs".
+        k (int, optional): Number of journeys for "astar". Defaults to 5.
+
+    Raises:
+        KeyError: The backend is not valid
 
     Returns:
         list: All the possible paths
     """
+    if backend not in BACKENDS:
+        raise KeyError("Invalid Backend")
     if process_status is not None:
         process_status.set_status(
             f"Searching for path \
             {start_stop.description} {chr(0x1f86a)} {end_stop.description}",
             main_status=True,
         )
-    return graph.search_path(start_stop, end_stop)
+    with Span("search_path") as span:
+        if backend == "raptor":
+            paths = RaptorRouter().search(start_stop, end_stop)
+        elif backend == "astar":
+            paths = ShortestPathRouter().search(start_stop, end_stop, k=k)
+        else:
+            paths = graph.search_path(start_stop, end_stop)
+    span.candidates = len(paths)
+    record_span(span, process_status)
+    return paths
 
 
-def sort_paths(paths: list[list[BusStop]],
+def sort_paths(paths: Union[list[list[BusStop]], list[list[RouteSegment]]],
                criteria: str,
-               process_status: Optional[ProcessStatus] = None
+               process_status: Optional[ProcessStatus] = None,
+               backend: str = "bfs",
+               top_k: Optional[int] = None,
+               parallel: bool = False
                ) -> OrderedList[str, Any]:
     """List of paths to find a bus routes and sort.
 
     Args:
-        paths (list[list[BusStop]]): All possible paths to find
+        paths (list): All possible paths to find, as returned by search_path
         criteria (str): Criteria to sort by in {"dist", "transfer"}
         process_status (ProcessStatus, optional): process_status to update.
+        backend (str, optional): Backend search_path used for paths.
+            Defaults to "bfs".
+        top_k (int, optional): Keep only the best top_k, see top_paths().
+            Defaults to keeping all.
+        parallel (bool, optional): Find the journeys of "bfs" paths in the
+            SortPool, if it is running. The results are the same. Defaults
+            to finding them in this thread.
 
     Raises:
-        KeyError: The criteria is not valid
+        KeyError: The criteria or backend is not valid
 
     Returns:
         OrderedList[str, Any]:
             list containing dictionary with key(sn, path, dist, transfer),
-            sorted according to the criteria
+            sorted according to the criteria, then the other criteria
     """
-    if criteria not in {"dist", "transfer"}:
+    if criteria not in SORT_KEYS:
         raise KeyError("Invalid Criteria")
-    results = OrderedList(index=criteria)
+    if backend not in BACKENDS:
+        raise KeyError("Invalid Backend")
+    results = OrderedList(index=SORT_KEYS[criteria])
+
+    with Span("sort_paths") as span:
+        if parallel and backend == "bfs" and paths \
+                and SortPool().running():
+            pool_paths(paths, criteria, results, process_status, top_k)
+        elif top_k is not None:
+            results.extend(top_paths(paths, criteria, top_k,
+                                     process_status=process_status,
+                                     backend=backend))
+        else:
+            insert_paths(paths, results, process_status, backend)
+    span.candidates = len(results)
+    record_span(span, process_status)
+    return results
 
+
+def pool_paths(paths: list[list[BusStop]], criteria: str,
+               results: OrderedList[str, Any],
+               process_status: Optional[ProcessStatus] = None,
+               top_k: Optional[int] = None) -> None:
+    """Insert the results of "bfs" paths found by the SortPool, for
+    sort_paths.
+
+    If a worker dies, the paths are found in this thread instead.
+
+    Args:
+        paths (list): All possible paths to find, as returned by search_path
+        criteria (str): Criteria to sort by in {"dist", "transfer"}
+        results (OrderedList): where the results are inserted
+        process_status (ProcessStatus, optional): process_status to update.
+        top_k (int, optional): Keep only the best top_k. Defaults to
+            keeping all.
+    """
+    if process_status is not None:
+        process_status.clear_status()
+        process_status.set_status("Finding bus connections", main_status=True)
+
+    def progress(done: int) -> None:
+        if process_status is not None:
+            process_status.set_status(f"Found {done}/{len(paths)} bus paths")
+
+    try:
+        pool_results, chunk_spans = SortPool().results(
+            paths, criteria, top_k=top_k, progress=progress)
+    except BrokenProcessPool:
+        if top_k is not None:
+            results.extend(top_paths(paths, criteria, top_k,
+                                     process_status=process_status))
+        else:
+            insert_paths(paths, results, process_status)
+        return
+    results.extend(pool_results)
+
+    # the work of the workers, as if done here
+    for stage in ("find_bus_path", "calculate_distance"):
+        span = Span(stage)
+        for chunk_span in chunk_spans:
+            if chunk_span["stage"] == stage:
+                span.duration += chunk_span["duration"]
+                span.sql += chunk_span["sql"]
+                span.candidates += chunk_span["candidates"]
+                span.calls += chunk_span["calls"]
+        if span.calls:
+            record_span(span, process_status)
+    if process_status is not None:
+        process_status.clear_status()
+        process_status.set_status(
+            "Finished finding bus connections.", main_status=True)
+
+
+def insert_paths(paths: Union[list[list[BusStop]], list[list[RouteSegment]]],
+                 results: OrderedList[str, Any],
+                 process_status: Optional[ProcessStatus] = None,
+                 backend: str = "bfs") -> None:
+    """Insert the results of every path, for sort_paths.
+
+    Args:
+        paths (list): All possible paths to find, as returned by search_path
+        results (OrderedList): where the results are inserted
+        process_status (ProcessStatus, optional): process_status to update.
+        backend (str, optional): Backend search_path used for paths.
+            Defaults to "bfs".
+    """
     if process_status is not None:
         process_status.clear_status()
         process_status.set_status("Finding bus connections", main_status=True)
 
     # getting results
+    spans = (Span("find_bus_path"), Span("calculate_distance"))
     for i, path in enumerate(paths):
-        for bus_routes in find_bus_path(path):
-            total_dist = sum(route.calculate_distance()
-                             for route in bus_routes)
-            results.insert(
-                {
-                    "sn": [route.service_no for route in bus_routes],
-                    "path": path,
-                    "dist": round(total_dist, 2),
-                    "transfer": len(bus_routes),
-                }
-            )
+        for result in path_results(path, backend, spans):
+            results.insert(result)
 
         if process_status is not None:
             process_status.set_status(f"Found {i+1}/{len(paths)} bus paths")
 
+    for span in spans:
+        if span.calls:
+            record_span(span, process_status)
     if process_status is not None:
         process_status.clear_status()
         process_status.set_status(
             "Finished finding bus connections.", main_status=True)
-    return results
+
+
+def top_paths(paths: Union[list[list[BusStop]], list[list[RouteSegment]]],
+              criteria: str,
+              k: int,
+              process_status: Optional[ProcessStatus] = None,
+              backend: str = "bfs",
+              spans: Optional[tuple[Span, Span]] = None,
+              progress: Optional[Callable[[int], None]] = None
+              ) -> Iterator[dict[str, Any]]:
+    """Best k results of sort_paths, keeping only k at a time.
+
+    Results are kept in a heap of size k. A path is skipped without finding
+    its journeys when it cannot beat the k-th best result even on the
+    shortest bus between each two of its stops, and the search stops once
+    no remaining path can, as "bfs" and "raptor" paths come in order of
+    number of stops. Results are ordered as in sort_paths.
+
+    Args:
+        paths (list): All possible paths to find, as returned by search_path
+        criteria (str): Criteria to sort by in {"dist", "transfer"}
+        k (int): Number of results to keep.
+        process_status (ProcessStatus, optional): process_status to update.
+        backend (str, optional): Backend search_path used for paths.
+            Defaults to "bfs".
+        spans (tuple, optional): (find_bus_path, calculate_distance) spans
+            to add the work to, see path_results(). Defaults to new spans,
+            recorded when done.
+        progress (Callable, optional): called with the number of paths done
+            after each path.
+
+    Raises:
+        KeyError: The criteria or backend is not valid
+
+    Yields:
+        dict: with key(sn, path, dist, transfer), best first
+    """
+    if criteria not in SORT_KEYS:
+        raise KeyError("Invalid Criteria")
+    if backend not in BACKENDS:
+        raise KeyError("Invalid Backend")
+    keys = SORT_KEYS[criteria]
+
+    if process_status is not None:
+        process_status.clear_status()
+        process_status.set_status("Finding bus connections", main_status=True)
+
+    # heap of (-values, -order, result), so the worst kept result is first
+    heap: list[tuple[tuple, int, dict[str, Any]]] = []
+    order = count()
+    # (start, end): distance of the shortest bus, shared by the paths
+    hops: dict[tuple[BusStop, BusStop], float] = {}
+    record = spans is None
+    if spans is None:
+        spans = (Span("find_bus_path"), Span("calculate_distance"))
+    for i, path in enumerate(paths):
+        if k <= 0:
+            break
+        if len(heap) == k:
+            bound = lower_bound(path, backend, hops)
+            kth = tuple(-value for value in heap[0][0])
+            # a later result equal to the k-th does not replace it
+            if tuple(bound[key] for key in keys) >= kth:
+                if criteria == "transfer" and backend != "astar" \
+                        and bound["transfer"] > kth[0]:
+                    break
+                continue
+        for result in path_results(path, backend, spans):
+            entry = (tuple(-result[key] for key in keys), -next(order),
+                     result)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        if process_status is not None:
+            process_status.set_status(f"Found {i+1}/{len(paths)} bus paths")
+        if progress is not None:
+            progress(i + 1)
+
+    for span in spans:
+        if record and span.calls:
+            record_span(span, process_status)
+    if process_status is not None:
+        process_status.clear_status()
+        process_status.set_status(
+            "Finished finding bus connections.", main_status=True)
+    for _, _, result in sorted(heap, reverse=True):
+        yield result
+
+
+def path_results(path: Union[list[BusStop], list[RouteSegment]],
+                 backend: str = "bfs",
+                 spans: Optional[tuple[Span, Span]] = None
+                 ) -> Iterator[dict[str, Any]]:
+    """Results of the journeys along a path.
+
+    Journeys missing the distance of a stop are left out.
+
+    Args:
+        path (list): A path as returned by search_path
+        backend (str, optional): Backend search_path used for path.
+            Defaults to "bfs".
+        spans (tuple, optional): (find_bus_path, calculate_distance) spans
+            to add the work of the path to, with the journeys found and the
+            results given as their candidates.
+
+    Yields:
+        dict: with key(sn, path, dist, transfer)
+    """
+    find_span, distance_span = spans or (nullcontext(), nullcontext())
+    if backend != "bfs":
+        # journeys already have their buses
+        journeys = [path]
+        path = [route.start_stop for route in path] + [path[-1].end_stop]
+    else:
+        with find_span:
+            journeys = find_bus_path(path)
+    if spans is not None:
+        find_span.candidates += len(journeys)
+    for bus_routes in journeys:
+        try:
+            with distance_span:
+                total_dist = sum(route.calculate_distance()
+                                 for route in bus_routes)
+        except ValueError:
+            # no ride between the stops, or a distance missing from the data
+            continue
+        if spans is not None:
+            distance_span.candidates += 1
+        yield {
+            "sn": [route.service_no for route in bus_routes],
+            "path": path,
+            "dist": round(total_dist, 2),
+            "transfer": len(bus_routes),
+        }
+
+
+def lower_bound(path: Union[list[BusStop], list[RouteSegment]],
+                backend: str = "bfs",
+                hops: Optional[dict[tuple[BusStop, BusStop], float]] = None
+                ) -> dict[str, float]:
+    """Lowest dist and transfer any journey along a path can have.
+
+    The dist is that of the shortest bus between each two stops of the
+    path, so it holds whatever the coordinates of the stops are.
+
+    Args:
+        path (list): A path as returned by search_path
+        backend (str, optional): Backend search_path used for path.
+            Defaults to "bfs".
+        hops (dict, optional): (start, end): distance of the shortest bus
+            between them, filled in as they are found. Defaults to finding
+            them all.
+
+    Returns:
+        dict: with key(dist, transfer), inf dist if a stop of the path
+            cannot be reached from the one before
+    """
+    if backend != "bfs":
+        path = [route.start_stop for route in path] + [path[-1].end_stop]
+    if hops is None:
+        hops = {}
+    dist = 0.0
+    for start, end in zip(path, path[1:]):
+        if (start, end) not in hops:
+            distances = [hop_distance(bus_route)
+                         for bus_route in start.buses_to(end)]
+            hops[(start, end)] = min(
+                (distance for distance in distances if distance is not None),
+                default=float("inf"))
+        dist += hops[(start, end)]
+    return {"dist": dist, "transfer": len(path) - 1, }
+
+
+def hop_distance(bus_route: RouteSegment) -> Optional[float]:
+    """Distance of a ride, None if the service does not ride it."""
+    try:
+        return bus_route.calculate_distance()
+    except ValueError:
+        return None
@@ -5,4 +5,4 @@ from .BaseRequest import Request
 
 class AllStopInfoRequest(Request):
     def handle(self) -> AllStopInfoResult:
-        return AllStopInfoResult()
+        return AllStopInfoResult(self.flask_request)
@@ -0,0 +1,85 @@
+from math import isfinite
+
+from bus import nearest_stops, nearest_stops_batch, stops_within
+from response import NearbyStopsResult, Result, ResultError
+
+from .BaseRequest import Request
+
+MAX_STOPS = 100
+MAX_POINTS = 1000
+
+
+class NearbyStopsRequest(Request):
+    def handle(self) -> Result:
+        """Find the stops near a location, or near each of many.
+
+        GET takes lat, lon and either k (default 5) or radius in metres.
+        POST takes JSON {"points": [[lat, lon], ...], "k": 5}.
+
+        Returns:
+            Result: NearbyStopsResult, or ResultError for invalid input.
+        """
+        if self.flask_request.method == "POST":
+            return self.handle_batch()
+        try:
+            args = self.flask_request.args
+            latitude, longitude = self.location(args["lat"], args["lon"])
+            if "radius" in args:
+                radius = float(args["radius"])
+                if not isfinite(radius) or radius < 0:
+                    raise ValueError("Invalid radius")
+                return NearbyStopsResult(stops_within(
+                    latitude, longitude, radius))
+            k = self.count(args.get("k", 5))
+            return NearbyStopsResult(nearest_stops(latitude, longitude, k))
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return ResultError("lat and lon should be numbers in [-90, 90] "
+                               "and [-180, 180], with a positive k or "
+                               "radius")
+
+    def handle_batch(self) -> Result:
+        body = self.flask_request.get_json(silent=True)
+        if body is None:
+            body = {}
+        if not isinstance(body, dict) \
+                or not isinstance(body.get("points", []), list):
+            return ResultError('The body should be a JSON object with '
+                               '"points"')
+        if len(body.get("points", [])) > MAX_POINTS:
+            return ResultError(f"At most {MAX_POINTS} points are allowed")
+        try:
+            points = [self.location(*point)
+                      for point in body.get("points", [])]
+            k = self.count(body.get("k", 5))
+        except (TypeError, ValueError, OverflowError):
+            return ResultError("points should be [lat, lon] numbers in "
+                               "[-90, 90] and [-180, 180], with a positive k")
+        return NearbyStopsResult(nearest_stops_batch(points, k), batch=True)
+
+    @staticmethod
+    def location(latitude, longitude) -> tuple[float, float]:
+        """Latitude and longitude given as numbers or strings.
+
+        Raises:
+            ValueError: Either is not a finite number in range.
+
+        Returns:
+            tuple: (latitude, longitude)
+        """
+        latitude, longitude = float(latitude), float(longitude)
+        if not (isfinite(latitude) and isfinite(longitude)
+                and -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("Invalid latitude or longitude")
+        return latitude, longitude
+
+    @staticmethod
+    def count(k) -> int:
+        """Number of stops asked for, at most MAX_STOPS.
+
+        Raises:
+            ValueError: k is not a positive number.
+        """
+        k = int(k)
+        if k <= 0:
+            raise ValueError("Invalid k")
+        return min(k, MAX_STOPS)
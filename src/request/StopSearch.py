@@ -0,0 +1,22 @@
+from bus import search_stops
+from response import Result, ResultError, StopSearchResult
+
+from .BaseRequest import Request
+
+MAX_LIMIT = 50
+
+
+class StopSearchRequest(Request):
+    def handle(self) -> Result:
+        """Find the stops matching q, at most limit (default 10) of them.
+
+        Returns:
+            Result: StopSearchResult, or ResultError for invalid input.
+        """
+        query = self.flask_request.args.get("q", "")
+        try:
+            limit = min(int(self.flask_request.args.get("limit", 10)),
+                        MAX_LIMIT)
+        except ValueError:
+            return ResultError("limit should be a number")
+        return StopSearchResult(search_stops(query, limit))
@@ -1,4 +1,6 @@
 from .AllStopInfo import AllStopInfoRequest
 from .BaseRequest import Request
+from .NearbyStops import NearbyStopsRequest
 from .PathInfo import PathInfoRequest
 from .PathSummary import PathSummaryRequest
+from .StopSearch import StopSearchRequest
@@ -1,17 +1,39 @@
+import gzip
+import hashlib
+import json
+from threading import Lock
+
 from bus import retrieve_all_bus_stops
-from flask import jsonify
+from datastore import Datastore
+from flask import Response
+
+import config
 
 from .BaseResults import Result
 
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
 
-class AllStopInfoResult(Result):
-    def __init__(self):
-        return
 
-    def html(self):
-        return
+class StopInfoPayload:
+    """
+    The all bus stop info JSON, serialised once per dataset version.
 
-    def jsonify(self):
+    Attributes:
+
+        + version (str): dataset hash the payload was built from
+        + raw (bytes): the JSON
+        + encoded (dict): content encoding: compressed JSON
+        + etags (dict): content encoding, None for the JSON itself: strong
+            ETag of that body, different for each encoding
+    """
+    __lock = Lock()
+    __current = None
+
+    def __init__(self, version: str) -> None:
+        self.version = version
         # get the list of bus stop info to show after the user type a code
         all_bus_stop_info = [bus_stop.to_dict()
                              for bus_stop in retrieve_all_bus_stops().values()
@@ -20,4 +42,63 @@ class AllStopInfoResult(Result):
             # need to have a id field to be indexed.
             all_bus_stop_info[i]["id"] = i
 
-        return jsonify(all_bus_stop_info)
+        self.raw = json.dumps(all_bus_stop_info, sort_keys=True,
+                              separators=(",", ":")).encode()
+        self.encoded = {"gzip": gzip.compress(self.raw, compresslevel=9)}
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.raw)
+        etag = hashlib.sha256(self.raw).hexdigest()[:32]
+        self.etags = {None: etag}
+        for encoding in self.encoded:
+            self.etags[encoding] = f"{etag}-{encoding}"
+
+    @classmethod
+    def current(cls) -> "StopInfoPayload":
+        """Payload of the current dataset, built if it changed."""
+        version = Datastore().get_dataset_hash()
+        payload = cls.__current
+        if payload is None or payload.version != version:
+            with cls.__lock:
+                payload = cls.__current
+                if payload is None or payload.version != version:
+                    payload = cls(version)
+                    cls.__current = payload
+        return payload
+
+
+class AllStopInfoResult(Result):
+    def __init__(self, flask_request=None):
+        self.flask_request = flask_request
+
+    def html(self):
+        return
+
+    def jsonify(self):
+        payload = StopInfoPayload.current()
+        headers = {
+            "Cache-Control": f"public, max-age={config.stop_info_max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+        body, encoding = payload.raw, None
+        if self.flask_request is not None:
+            accepted = self.flask_request.accept_encodings
+            # prefer brotli as it is smaller
+            for name in ("br", "gzip"):
+                if name in payload.encoded and accepted[name]:
+                    body, encoding = payload.encoded[name], name
+                    break
+        etag = payload.etags[encoding]
+
+        if self.flask_request is not None \
+                and self.flask_request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
+            response.set_etag(etag)
+            return response
+
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        response = Response(body, mimetype="application/json",
+                            headers=headers)
+        response.set_etag(etag)
+        return response
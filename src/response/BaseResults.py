@@ -1,5 +1,7 @@
 from abc import ABC, abstractclassmethod
 
+from flask import jsonify
+
 
 class Result(ABC):
     def __init__(self):
@@ -16,3 +18,6 @@ class ResultError(Result):
 
     def html(self):
         return f"<h1>result error</h1><p>{self.message}</p>"
+
+    def jsonify(self):
+        return jsonify({"error": self.message}), 400
@@ -0,0 +1,29 @@
+from flask import jsonify
+
+from .BaseResults import Result
+
+
+class NearbyStopsResult(Result):
+    def __init__(self, stops, batch=False):
+        """
+        Args:
+            stops (list): (BusStop, distance in metres), or a list of them
+                for each point when batch is True
+            batch (bool, optional): Whether stops is for many points.
+                Defaults to False.
+        """
+        self.stops = stops
+        self.batch = batch
+
+    def html(self):
+        return
+
+    @staticmethod
+    def to_dicts(stops):
+        return [dict(stop.to_dict(), distance=round(distance, 1))
+                for stop, distance in stops]
+
+    def jsonify(self):
+        if self.batch:
+            return jsonify([self.to_dicts(stops) for stops in self.stops])
+        return jsonify(self.to_dicts(self.stops))
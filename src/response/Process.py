@@ -4,11 +4,11 @@ from .BaseResults import Result
 
 
 class ProcessingSuccess(Result):
-    def __init__(self):
-        return
+    def __init__(self, job_id=None):
+        self.job_id = job_id
 
     def html(self):
-        return render_template("processing.html")
+        return render_template("processing.html", job_id=self.job_id)
 
 
 class PathSummarySuccess(Result):
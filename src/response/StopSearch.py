@@ -0,0 +1,14 @@
+from flask import jsonify
+
+from .BaseResults import Result
+
+
+class StopSearchResult(Result):
+    def __init__(self, stops):
+        self.stops = stops
+
+    def html(self):
+        return
+
+    def jsonify(self):
+        return jsonify([stop.to_dict() for stop in self.stops])
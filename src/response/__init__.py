@@ -1,4 +1,6 @@
 from .AllStopInfo import AllStopInfoResult
 from .BaseResults import Result, ResultError
+from .NearbyStops import NearbyStopsResult
 from .PathInfo import PathInfoSuccess
 from .Process import PathSummarySuccess, ProcessingSuccess
+from .StopSearch import StopSearchResult
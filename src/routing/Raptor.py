@@ -0,0 +1,148 @@
+"""Round-based routing over bus route stop sequences."""
+from __future__ import annotations
+
+from typing import Optional
+
+from bus import BusStop, RouteSegment
+from datastore import RouteIndex
+
+from .RouteNetwork import RouteNetwork
+
+# km a distance must improve by, more than the error of adding distances
+EPSILON = 1e-9
+# label: (distance, leg) where leg is None at the starting stop, else
+# (route id, boarding position, alighting position, label boarded from)
+Label = tuple
+
+
+class RaptorRouter:
+    """
+    Find journeys round by round, in the style of RAPTOR.
+
+    Round k scans every route through a stop improved in round k - 1, so
+    after round k each stop holds the shortest distance using at most k
+    buses. Only stops that improve are scanned again, which keeps a search
+    to a few route scans per round.
+
+    Attributes:
+
+        + route_index (RouteIndex): route stop sequences and distances
+
+    Methods:
+
+        + search(start_stop, end_stop, [max_legs]): Pareto set of journeys
+    """
+
+    def __init__(self, route_index: RouteIndex = None) -> None:
+        self.route_index = route_index if route_index is not None \
+            else RouteIndex()
+
+    def search(self, start_stop: BusStop, end_stop: BusStop,
+               max_legs: int = 4) -> list[list[RouteSegment]]:
+        """Find the Pareto set of journeys by (transfers, distance).
+
+        A journey with more buses is only kept if it is shorter than every
+        journey with fewer buses.
+
+        Args:
+            start_stop (BusStop): Starting bus stop.
+            end_stop (BusStop): Ending bus stop.
+            max_legs (int, optional): Most buses to take. Defaults to 4.
+
+        Returns:
+            list[list[RouteSegment]]: journeys ordered by number of buses, each
+                a list of RouteSegment with start_stop and end_stop set.
+        """
+        network = RouteNetwork.of(self.route_index)
+        start = network.ids.get(start_stop.bus_stop_code)
+        end = network.ids.get(end_stop.bus_stop_code)
+        if start is None or end is None or start == end:
+            return []
+
+        inf = float("inf")
+        best = [inf] * len(network.codes)  # shortest distance to each stop
+        best[start] = 0.0
+        labels: list[Optional[Label]] = [None] * len(network.codes)
+        labels[start] = (0.0, None)
+        marked = [start]
+        journeys = []
+
+        for _ in range(max_legs):
+            # earliest position of a marked stop on each route
+            queue: dict[int, int] = {}
+            for stop in marked:
+                for route, position in network.stop_routes[stop]:
+                    if position < queue.get(route, inf):
+                        queue[route] = position
+
+            improved: dict[int, Label] = {}
+            for route, first in queue.items():
+                self.scan_route(network, route, first, labels, best, end,
+                                improved)
+
+            if not improved:
+                break
+            labels = labels.copy()
+            for stop, label in improved.items():
+                labels[stop] = label
+            marked = list(improved)
+            if end in improved:
+                journeys.append(self.to_bus_routes(network, improved[end]))
+        return journeys
+
+    @staticmethod
+    def scan_route(network: RouteNetwork, route: int, first: int,
+                   labels: list[Optional[Label]], best: list[float],
+                   end: int, improved: dict[int, Label]) -> None:
+        """Ride a route from its first marked stop, improving stops on it.
+
+        Args:
+            network (RouteNetwork): the numbered routes
+            route (int): route id
+            first (int): position of the first marked stop
+            labels (list): label of each stop from the previous round
+            best (list): shortest distance to each stop, updated in place
+            end (int): stop id of the end stop
+            improved (dict): stop id: label, updated in place with the stops
+                improved on this route
+        """
+        stops = network.route_stops[route]
+        distances = network.route_distances[route]
+        boarded: Optional[tuple[float, int, Label]] = None
+        for position in range(first, len(stops)):
+            stop = stops[position]
+            if boarded is not None:
+                dist = boarded[0] + distances[position]
+                # no stop is worth reaching further than the end stop,
+                # and NaN distances never compare as shorter
+                if dist < best[stop] - EPSILON and dist < best[end] - EPSILON:
+                    best[stop] = dist
+                    improved[stop] = (dist, (route, boarded[1], position,
+                                             boarded[2]))
+            label = labels[stop]
+            if label is not None:
+                offset = label[0] - distances[position]
+                # cannot board where the distance is missing (NaN)
+                if offset == offset and (boarded is None
+                                         or offset < boarded[0]):
+                    boarded = (offset, position, label)
+
+    @staticmethod
+    def to_bus_routes(network: RouteNetwork,
+                      label: Label) -> list[RouteSegment]:
+        """Follow a label back to the start.
+
+        Args:
+            network (RouteNetwork): the numbered routes
+            label (Label): label at the end stop
+
+        Returns:
+            list[RouteSegment]: the buses to take, in order
+        """
+        bus_routes = []
+        while label[1] is not None:
+            route, board_position, alight_position, label = label[1]
+            bus_routes.append(
+                network.bus_route(route, board_position, alight_position))
+        bus_routes.reverse()
+        return bus_routes
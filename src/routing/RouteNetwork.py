@@ -0,0 +1,146 @@
+"""Bus routes numbered for the routing engines."""
+from __future__ import annotations
+
+import heapq
+from threading import Lock
+from typing import Optional
+
+from bus import BusRoute, BusStop, RouteSegment
+from datastore import RouteIndex
+
+
+class RouteNetwork:
+    """
+    Stops and routes of a RouteIndex numbered with integer ids.
+
+    Stops without a record (e.g. 'CTE') are left out of the routes as they
+    cannot be boarded or alighted at.
+
+    Attributes:
+
+        + codes (list): bus stop code of each stop id
+        + ids (dict): bus_stop_code: stop id
+        + latitudes (list): latitude of each stop id
+        + longitudes (list): longitude of each stop id
+        + route_keys (list): (service_no, direction) of each route id
+        + route_stops (list): stop ids along each route id
+        + route_distances (list): distance from the start of the route at
+            each position of route_stops, NaN if missing
+        + stop_routes (list): (route id, position) of the routes through
+            each stop id
+        + stop_rides (list): (stop id, distance) of the shortest ride to
+            each stop id from each stop just before it along a route
+
+    Methods:
+
+        + of([route_index]): network of the current build of a route index
+        + distances_to(end): shortest distance from every stop to a stop
+        + bus_route(route, board_position, alight_position): RouteSegment of
+            a ride along a route
+    """
+    __lock = Lock()
+    __network: Optional["RouteNetwork"] = None
+
+    def __init__(self, route_index: RouteIndex) -> None:
+        # one build of the tables, as the index may be rebuilt meanwhile
+        tables = route_index.tables
+        self.routes = tables.routes
+        self.codes = list(tables.stops)
+        self.ids = {code: i for i, code in enumerate(self.codes)}
+        self.latitudes = [tables.stops[code]["latitude"]
+                          for code in self.codes]
+        self.longitudes = [tables.stops[code]["longitude"]
+                           for code in self.codes]
+
+        self.route_keys = []
+        self.route_stops = []
+        self.route_distances = []
+        stop_routes = [[] for _ in self.codes]
+        for key, codes in tables.routes.items():
+            stops, distances = [], []
+            for code, dist in zip(codes, tables.distances[key]):
+                if code in self.ids:
+                    stop_routes[self.ids[code]].append(
+                        (len(self.route_keys), len(stops)))
+                    stops.append(self.ids[code])
+                    distances.append(dist)
+            self.route_keys.append(key)
+            self.route_stops.append(tuple(stops))
+            self.route_distances.append(tuple(distances))
+        self.stop_routes = [tuple(positions) for positions in stop_routes]
+
+        stop_rides = [{} for _ in self.codes]
+        for stops, distances in zip(self.route_stops, self.route_distances):
+            for i in range(len(stops) - 1):
+                dist = distances[i + 1] - distances[i]
+                # NaN distances cannot be ridden through
+                if dist == dist and dist < stop_rides[stops[i + 1]].get(
+                        stops[i], float("inf")):
+                    stop_rides[stops[i + 1]][stops[i]] = dist
+        self.stop_rides = [tuple(rides.items()) for rides in stop_rides]
+
+    @classmethod
+    def of(cls, route_index: RouteIndex = None) -> "RouteNetwork":
+        """Network of the current build of a route index.
+
+        The network is rebuilt only when the route index is rebuilt.
+
+        Args:
+            route_index (RouteIndex, optional): Defaults to RouteIndex().
+
+        Returns:
+            RouteNetwork: the network
+        """
+        route_index = route_index if route_index is not None \
+            else RouteIndex()
+        network = cls.__network
+        if network is None \
+                or network.routes is not route_index.tables.routes:
+            with cls.__lock:
+                network = cls.__network
+                if network is None \
+                        or network.routes is not route_index.tables.routes:
+                    network = cls(route_index)
+                    cls.__network = network
+        return network
+
+    def distances_to(self, end: int) -> list[float]:
+        """Shortest distance from every stop to a stop, taking any number of
+        buses.
+
+        Args:
+            end (int): stop id to reach
+
+        Returns:
+            list: distance of each stop id, inf if it cannot reach end
+        """
+        distances = [float("inf")] * len(self.codes)
+        distances[end] = 0.0
+        heap = [(0.0, end)]
+        while heap:
+            dist, stop = heapq.heappop(heap)
+            if dist > distances[stop]:
+                continue
+            for before, ride in self.stop_rides[stop]:
+                if dist + ride < distances[before]:
+                    distances[before] = dist + ride
+                    heapq.heappush(heap, (dist + ride, before))
+        return distances
+
+    def bus_route(self, route: int, board_position: int,
+                  alight_position: int) -> RouteSegment:
+        """RouteSegment of a ride along a route.
+
+        Args:
+            route (int): route id
+            board_position (int): position boarded at
+            alight_position (int): position alighted at
+
+        Returns:
+            RouteSegment: with start_stop and end_stop set
+        """
+        stops = self.route_stops[route]
+        return RouteSegment(
+            BusRoute(*self.route_keys[route]),
+            BusStop.from_bus_code(self.codes[stops[board_position]]),
+            BusStop.from_bus_code(self.codes[stops[alight_position]]))
@@ -0,0 +1,191 @@
+"""Shortest journeys by distance over (stop, route) states."""
+from __future__ import annotations
+
+import heapq
+from itertools import count
+
+from bus import BusStop, RouteSegment
+from datastore import RouteIndex
+
+from .RouteNetwork import RouteNetwork
+
+WAITING = -1  # route alighted from at the starting stop
+
+
+class ShortestPathRouter:
+    """
+    Find the k shortest journeys by distance with A* search.
+
+    The search is over two kinds of states: waiting at a stop, and riding a
+    route at a position along it. Boarding and alighting cost nothing,
+    riding to the next stop costs the distance between them. The heuristic
+    is the shortest distance to the end stop taking any number of buses,
+    found by a search back from the end stop over the route distances. The
+    great-circle distance is not used, as the coordinates of some stops are
+    km away from where their routes put them.
+
+    Each (state, buses taken) may be settled by the k shortest different
+    journeys so far, so the end stop is reached by the k shortest journeys
+    in order of distance. A journey so far that is the same as one already
+    settled there, e.g. on a loop service boarded at another visit to the
+    stop, is skipped without counting. A shorter journey so far that
+    arrives after k longer ones, as distances added in another order can
+    differ in the last digit, takes the place of the longest.
+
+    Attributes:
+
+        + route_index (RouteIndex): route stop sequences and distances
+
+    Methods:
+
+        + search(start_stop, end_stop, [k], [max_legs]): k shortest journeys
+    """
+
+    def __init__(self, route_index: RouteIndex = None) -> None:
+        self.route_index = route_index if route_index is not None \
+            else RouteIndex()
+
+    def search(self, start_stop: BusStop, end_stop: BusStop, k: int = 5,
+               max_legs: int = 4) -> list[list[RouteSegment]]:
+        """Find the k shortest journeys.
+
+        Journeys taking the same services between the same stops are only
+        returned once.
+
+        Args:
+            start_stop (BusStop): Starting bus stop.
+            end_stop (BusStop): Ending bus stop.
+            k (int, optional): Number of journeys. Defaults to 5.
+            max_legs (int, optional): Most buses to take. Defaults to 4.
+
+        Returns:
+            list[list[RouteSegment]]: journeys ordered by distance, each a list
+                of RouteSegment with start_stop and end_stop set.
+        """
+        network = RouteNetwork.of(self.route_index)
+        start = network.ids.get(start_stop.bus_stop_code)
+        end = network.ids.get(end_stop.bus_stop_code)
+        if start is None or end is None or start == end:
+            return []
+
+        # state ids: one per position along every route
+        route_base = []
+        total = 0
+        for stops in network.route_stops:
+            route_base.append(total)
+            total += len(stops)
+        # (state, buses taken): {key: distance} of the journeys so far
+        # settled there, and the longest of their distances
+        settled: dict[tuple[int, int], dict[tuple, float]] = {}
+        longest: dict[tuple[int, int], float] = {}
+
+        def settle(state: int, legs: int, key: tuple, dist: float) -> bool:
+            """Settle a state by a journey so far, unless it or k other
+            journeys settled it with no more distance."""
+            label = (state, legs)
+            keys = settled.get(label)
+            if keys is None:
+                settled[label] = {key: dist}
+                longest[label] = dist
+                return True
+            if len(keys) >= k:
+                if longest[label] <= dist:
+                    return False
+                if key not in keys:
+                    del keys[max(keys, key=keys.__getitem__)]
+            if keys.get(key, dist + 1) <= dist:
+                return False
+            keys[key] = dist
+            longest[label] = max(keys.values())
+            return True
+
+        # lower bound on the distance from each stop to the end stop
+        estimates = network.distances_to(end)
+
+        tie_breaker = count()
+        # entry: (estimate, distance, tie breaker, route, position, boarded,
+        #         legs, journey, key) of riding a route at a position along
+        #         it, boarded at the earlier position boarded
+        # journey: (route, boarded, alighted, previous journey) or None
+        # key: (route, stop boarded at, stop alighted at) of each leg of the
+        #      journey, the same for loop services boarded on different
+        #      visits to a stop
+        heap = []
+        journeys = []
+        seen = set()
+
+        def ride(route: int, position: int, boarded: int, dist: float,
+                 legs: int, journey, key: tuple) -> None:
+            """Ride on from a position along a route to the next stop."""
+            stops = network.route_stops[route]
+            if position + 1 == len(stops):
+                return
+            distances = network.route_distances[route]
+            next_dist = dist + distances[position + 1] - distances[position]
+            label = (route_base[route] + position + 1, legs)
+            # NaN distances cannot be ridden through, a stop that cannot
+            # reach the end is not ridden to, and a state settled by k
+            # shorter journeys is not settled again
+            estimate = estimates[stops[position + 1]]
+            if next_dist == next_dist and estimate != float("inf") and not (
+                    len(settled.get(label, ())) >= k
+                    and longest[label] <= next_dist):
+                heapq.heappush(heap, (
+                    next_dist + estimate, next_dist,
+                    next(tie_breaker), route, position + 1, boarded, legs,
+                    journey, key))
+
+        def arrive(stop: int, dist: float, legs: int, alighted: int,
+                   journey, key: tuple) -> None:
+            """Wait at a stop, boarding every other route through it.
+
+            Waiting costs nothing, so it is done as soon as the bus arrives.
+            The rides boarded are settled instead of the stop, as the route
+            alighted from is not boarded again.
+            """
+            if stop == end:
+                if key not in seen:
+                    seen.add(key)
+                    journeys.append(self.to_bus_routes(network, journey))
+                return
+            if legs == max_legs:
+                return
+            for route, position in network.stop_routes[stop]:
+                # staying on the bus is the same journey
+                if route != alighted:
+                    ride(route, position, position, dist, legs + 1, journey,
+                         key)
+
+        arrive(start, 0.0, 0, WAITING, None, ())
+        while heap and len(journeys) < k:
+            _, dist, _, route, position, boarded, legs, journey, key = \
+                heapq.heappop(heap)
+            stops = network.route_stops[route]
+            # rides boarded at the same stop after the same journey go on
+            # to the same journeys
+            if not settle(route_base[route] + position, legs,
+                          (key, stops[boarded]), dist):
+                continue
+            arrive(stops[position], dist, legs, route,
+                   (route, boarded, position, journey),
+                   key + ((route, stops[boarded], stops[position]),))
+            ride(route, position, boarded, dist, legs, journey, key)
+        return journeys
+
+    @staticmethod
+    def to_bus_routes(network: RouteNetwork, journey) -> list[RouteSegment]:
+        """Convert the legs of a journey to RouteSegment.
+
+        Args:
+            network (RouteNetwork): the numbered routes
+            journey (tuple): (route, boarded, alighted, previous journey)
+
+        Returns:
+            list[RouteSegment]: the buses to take, in order
+        """
+        bus_routes = []
+        while journey is not None:
+            route, boarded, alighted, journey = journey
+            bus_routes.append(network.bus_route(route, boarded, alighted))
+        bus_routes.reverse()
+        return bus_routes
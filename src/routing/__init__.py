@@ -0,0 +1,4 @@
+"""Routing engines that search on bus routes instead of the stop graph."""
+from .Raptor import RaptorRouter
+from .RouteNetwork import RouteNetwork
+from .ShortestPath import ShortestPathRouter
@@ -1,52 +1,52 @@
-fetch("/api/v1/allbusstopinfo")
-  .then((response) => response.json())
-  .then((data) => {
-    miniSearch.addAll(data);
-  });
-var miniSearch = new MiniSearch({
-  fields: ["bus_stop_code", "description", "road_name"], // fields to index for full-text search
-  storeFields: ["bus_stop_code", "description", "road_name"], // fields to return with search results
-});
+// stops are searched on the server, so only the matches are downloaded
+function searchStops(query, limit) {
+  return fetch(
+    `/api/v1/stops/search?q=${encodeURIComponent(query)}&limit=${limit}`
+  ).then((response) => response.json());
+}
+
 function showCode(inputName) {
   let target = document.getElementById(`${inputName}_stop_code`);
-  let results = miniSearch.search(target.value, {
-    fields: ["bus_stop_code"],
-  });
-  var text;
-  if (
-    results[0] === undefined ||
-    results.length > 1 ||
-    target.value.length < 5
-  ) {
-    text =
-      '<span style="color:red; font-family: Georgia, serif">Invalid Bus Stop Code</span>';
-  } else {
-    let result = results[0];
-    text = `${result.bus_stop_code} ${result["description"]}, ${result.road_name}`;
-  }
+  let code = target.value.trim();
+  searchStops(code, 1).then((results) => {
+    var text;
+    if (
+      results[0] === undefined ||
+      results[0].bus_stop_code !== code ||
+      code.length < 5
+    ) {
+      text =
+        '<span style="color:red; font-family: Georgia, serif">Invalid Bus Stop Code</span>';
+    } else {
+      let result = results[0];
+      text = `${result.bus_stop_code} ${result["description"]}, ${result.road_name}`;
+    }
 
-  target.nextElementSibling.innerHTML = text;
+    target.nextElementSibling.innerHTML = text;
+  });
   hideList(inputName);
 }
 
 function inputChange(inputName) {
   let elm = document.getElementById(`${inputName}_stop_code`);
-  let searchResults = miniSearch.search(elm.value, {
-    fuzzy: 0.2,
-    prefix: true,
+  let query = elm.value;
+  searchStops(query, 5).then((searchResults) => {
+    // a later input has changed the query
+    if (elm.value !== query) {
+      return;
+    }
+    var list = document.getElementById(`${inputName}-autosuggestion-list`);
+    list.innerHTML = ""; // clear the results
+    for (let result of searchResults) {
+      let as_item = document.createElement("li");
+      as_item.classList.add("autosuggestion-item");
+      as_item.innerHTML = `${result.bus_stop_code} ${result["description"]}, ${result.road_name}`;
+      as_item.onmousedown = (e) => {
+        elm.value = `${result.bus_stop_code}`;
+      };
+      list.appendChild(as_item);
+    }
   });
-
-  var list = document.getElementById(`${inputName}-autosuggestion-list`);
-  list.innerHTML = ""; // clear the results
-  for (let result of searchResults.slice(0, 5)) {
-    let as_item = document.createElement("li");
-    as_item.classList.add("autosuggestion-item");
-    as_item.innerHTML = `${result.bus_stop_code} ${result["description"]}, ${result.road_name}`;
-    as_item.onmousedown = (e) => {
-      elm.value = `${result.bus_stop_code}`;
-    };
-    list.appendChild(as_item);
-  }
 }
 function displayList(inputName) {
   var list = document.getElementById(`${inputName}-autosuggestion-list`);
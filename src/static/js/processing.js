@@ -1,19 +1,50 @@
 count = 0;
-// fetch("/finding_path");
-gettingApi = window.setInterval(function () {
-  fetch("/api/v1/status")
-    .then((response) => response.json())
-    .then(function (data) {
-      count += 1;
-      if (!data.status_done) {
-        data["main_status"] = data["main_status"] + ".".repeat(count % 4);
-      } else {
-        console.log("finish");
-        window.clearInterval(gettingApi);
-        console.log("cleared interval");
-        window.location = "/paths_summary";
-      }
-      document.getElementById("main-status").innerText = data["main_status"];
-      document.getElementById("sub-status").innerText = data["sub_status"];
-    });
-}, 500);
+jobId = document.body.dataset.jobId;
+statusUrl = "/api/v1/status/" + jobId;
+summaryUrl = "/paths_summary/" + jobId;
+
+function showStatus(data) {
+  count += 1;
+  if (!data.status_done) {
+    data["main_status"] = data["main_status"] + ".".repeat(count % 4);
+  }
+  document.getElementById("main-status").innerText = data["main_status"];
+  document.getElementById("sub-status").innerText = data["sub_status"];
+}
+
+function poll() {
+  // fetch("/finding_path");
+  gettingApi = window.setInterval(function () {
+    fetch(statusUrl)
+      .then((response) => response.json())
+      .then(function (data) {
+        if (data.status_done) {
+          console.log("finish");
+          window.clearInterval(gettingApi);
+          console.log("cleared interval");
+          window.location = summaryUrl;
+        }
+        showStatus(data);
+      });
+  }, 500);
+}
+
+if (window.EventSource) {
+  // updates are pushed by the server, poll if the stream fails
+  source = new EventSource(statusUrl + "/stream");
+  source.onmessage = function (event) {
+    showStatus(JSON.parse(event.data));
+  };
+  source.addEventListener("done", function (event) {
+    source.close();
+    data = JSON.parse(event.data);
+    showStatus(data);
+    window.location = data.result_url || summaryUrl;
+  });
+  source.onerror = function () {
+    source.close();
+    poll();
+  };
+} else {
+  poll();
+}
@@ -1,11 +1,36 @@
+import json
+import time
+from threading import Condition
+from typing import Iterator, Optional
+
 from flask import jsonify
 
 
 class ProcessStatus:
     def __init__(self) -> None:
-        self.status_done = False
+        self.__status_done = False
         self.main_status = ""
         self.sub_status = ""
+        self.graph_version = ""
+        # the span of each stage of the search, as dicts
+        self.spans: list[dict] = []
+        # bumped on every change, for stream() to wait on
+        self.version = 0
+        self.__changed = Condition()
+
+    @property
+    def status_done(self) -> bool:
+        return self.__status_done
+
+    @status_done.setter
+    def status_done(self, status_done: bool) -> None:
+        self.__status_done = status_done
+        self.__notify()
+
+    def __notify(self) -> None:
+        with self.__changed:
+            self.version += 1
+            self.__changed.notify_all()
 
     def set_status(self, status, main_status=False):
         """Update the status.
@@ -19,13 +44,80 @@ class ProcessStatus:
             self.sub_status = status
         else:
             self.main_status = status
+        self.__notify()
 
     def clear_status(self):
         """Clear all the status message."""
         self.main_status = ""
         self.sub_status = ""
+        self.__notify()
+
+    def add_span(self, span) -> None:
+        """Add the span of a finished stage.
+
+        Args:
+            span (Span): the span
+        """
+        self.spans.append(span.to_dict())
+        self.__notify()
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> int:
+        """Wait for the status to change from a version.
+
+        Args:
+            version (int): the version last seen
+            timeout (float, optional): most seconds to wait. Defaults to
+                waiting until it changes.
+
+        Returns:
+            int: the current version, the same as version on timeout.
+        """
+        with self.__changed:
+            self.__changed.wait_for(lambda: self.version != version,
+                                    timeout)
+            return self.version
+
+    def to_dict(self) -> dict:
+        return {"status_done": self.status_done,
+                "main_status": self.main_status,
+                "sub_status": self.sub_status,
+                "graph_version": self.graph_version,
+                "spans": list(self.spans), }
 
     def jsonify(self):
-        return jsonify({"status_done": self.status_done,
-                        "main_status": self.main_status,
-                        "sub_status": self.sub_status, })
+        return jsonify(self.to_dict())
+
+    def stream(self, max_rate: float = 4, result_url: str = None,
+               keepalive: float = 15) -> Iterator[str]:
+        """Server-sent events of the status, until the process is done.
+
+        Updates are coalesced, so at most max_rate events are sent a second
+        however often the status is set. The last event has the "done"
+        type, with result_url added to the status.
+
+        Args:
+            max_rate (float, optional): most events a second. Defaults to 4.
+            result_url (str, optional): where the result can be seen.
+            keepalive (float, optional): seconds between comments sent to
+                keep an idle connection open. Defaults to 15.
+
+        Yields:
+            str: an event in the text/event-stream format
+        """
+        interval = 1 / max_rate
+        version = -1
+        while True:
+            sent = time.monotonic()
+            if self.version == version:
+                yield ": keepalive\n\n"
+            else:
+                version = self.version
+                status = self.to_dict()
+                if status["status_done"]:
+                    status["result_url"] = result_url
+                    yield f"event: done\ndata: {json.dumps(status)}\n\n"
+                    return
+                yield f"data: {json.dumps(status)}\n\n"
+            # changes until the interval is up go out in the next event
+            time.sleep(max(0.0, sent + interval - time.monotonic()))
+            self.wait(version, keepalive)
@@ -0,0 +1,8 @@
+"""Run the tests as the app is run: from the project root, with src on the
+path."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, os.path.join(ROOT, "src"))
@@ -0,0 +1,73 @@
+"""Random routes over real bus stops, and every journey along them, to
+check the routers against."""
+import random
+
+from bus import haversine
+from datastore import Datastore
+from routing.RouteNetwork import RouteNetwork
+from routing.ShortestPath import WAITING
+
+
+class SmallRouteIndex:
+    """The RouteTables read by RouteNetwork, for random routes over real bus
+    stops.
+
+    Distances are rounded and some rides are far shorter than the
+    great-circle distance, as in the LTA data where the coordinates of a
+    few stops are km off.
+    """
+
+    def __init__(self, seed: int, stops: int = 12, routes: int = 7) -> None:
+        rng = random.Random(seed)
+        records = Datastore().retrieve_all("bus_stops")[:stops]
+        self.stops = {record["bus_stop_code"]: record for record in records}
+        codes = list(self.stops)
+        self.routes, self.distances = {}, {}
+        for service in range(routes):
+            route = rng.sample(codes, rng.randint(3, 6))
+            if rng.random() < 0.3:
+                route.append(route[0])  # loop service
+            dist, distances = 0.0, [0.0]
+            for before, after in zip(route, route[1:]):
+                # a twentieth of the way for a stop with wrong coordinates
+                ratio = rng.choice((0.05, 1.0)) * rng.uniform(0.8, 1.3)
+                dist += ratio * haversine(self.stops[before]["latitude"],
+                                          self.stops[before]["longitude"],
+                                          self.stops[after]["latitude"],
+                                          self.stops[after]["longitude"])
+                distances.append(round(dist, 1))
+            self.routes[(str(service), 1)] = tuple(route)
+            self.distances[(str(service), 1)] = distances
+
+    @property
+    def tables(self) -> "SmallRouteIndex":
+        return self
+
+
+def all_journeys(network: RouteNetwork, start: int, end: int,
+                 max_legs: int, reboard: bool = False) -> dict:
+    """Shortest distance of every journey from start to end taking at most
+    max_legs buses, by the (route, stop boarded at, stop alighted at) of
+    each leg. With reboard, the next bus of the route alighted from may be
+    taken, e.g. where a loop service ends its trip."""
+    found = {}
+
+    def extend(stop, dist, legs, alighted, key):
+        if stop == end:
+            found[key] = min(found.get(key, float("inf")), dist)
+            return
+        if legs == max_legs:
+            return
+        for route, position in network.stop_routes[stop]:
+            if route == alighted and not reboard:
+                continue
+            stops = network.route_stops[route]
+            distances = network.route_distances[route]
+            for alight in range(position + 1, len(stops)):
+                extend(stops[alight],
+                       dist + distances[alight] - distances[position],
+                       legs + 1, route,
+                       key + ((route, stops[position], stops[alight]),))
+
+    extend(start, 0.0, 0, WAITING, ())
+    return found
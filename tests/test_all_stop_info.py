@@ -0,0 +1,40 @@
+"""ETags of the all bus stop info in each content coding."""
+import gzip
+import json
+
+from flask import Flask, request
+
+from request import AllStopInfoRequest
+
+app = Flask(__name__)
+
+
+def get(accept_encoding: str = "", if_none_match: str = None):
+    headers = {"Accept-Encoding": accept_encoding}
+    if if_none_match is not None:
+        headers["If-None-Match"] = f'"{if_none_match}"'
+    with app.test_request_context("/", headers=headers):
+        return AllStopInfoRequest(request).handle().jsonify()
+
+
+def test_etag_per_encoding():
+    identity, compressed = get(), get("gzip")
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in identity.headers
+    for response in (identity, compressed):
+        assert response.headers["Vary"] == "Accept-Encoding"
+    assert identity.get_etag() != compressed.get_etag()
+    assert json.loads(gzip.decompress(compressed.get_data())) == \
+        json.loads(identity.get_data())
+
+
+def test_not_modified_in_the_same_encoding():
+    etag, _ = get("gzip").get_etag()
+    assert get("gzip", if_none_match=etag).status_code == 304
+    assert get("gzip", if_none_match=etag).get_etag()[0] == etag
+
+    # a gzip body cached by a proxy is not the identity body
+    response = get(if_none_match=etag)
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+    assert get(if_none_match=response.get_etag()[0]).status_code == 304
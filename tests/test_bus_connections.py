@@ -0,0 +1,22 @@
+"""Connections of the single scan build against those of each stop."""
+from bus import find_all_bus_connections, retrieve_all_bus_stops
+
+
+def codes(stops) -> list[str]:
+    return sorted(stop.bus_stop_code for stop in stops)
+
+
+def test_single_scan_matches_per_stop():
+    connections = find_all_bus_connections()
+    for bus_stop in retrieve_all_bus_stops().values():
+        assert codes(connections.get(bus_stop, [])) == \
+            codes(bus_stop.find_bus_connection()), bus_stop.bus_stop_code
+
+
+def test_loop_service_connects_from_first_visit():
+    # service 84 starts and ends its loop at 65009
+    connections = find_all_bus_connections()
+    loop_start = next(stop for stop in connections
+                      if stop.bus_stop_code == "65009")
+    reached = codes(connections[loop_start])
+    assert "65681" in reached and "65009" in reached
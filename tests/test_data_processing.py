@@ -0,0 +1,95 @@
+"""Streaming the DataMall json into a database that replaces the old one."""
+import io
+import json
+import os
+import sqlite3
+
+import pytest
+
+from datastore import Datastore
+from datastore.data_processing import (BUS_ROUTE_FIELDS, BUS_STOP_FIELDS,
+                                       ingest, iter_json_records)
+from datastore.migrations import MIGRATIONS, schema_version
+
+RECORDS = [{"BusStopCode": "01012", "Description": "Hotel [Grand], \"Pac\"",
+            "Latitude": 1.29684, "Longitude": 103.85253},
+           {"BusStopCode": "01013", "Description": "St. Joseph's Ch",
+            "Latitude": 1.29771, "Longitude": None}]
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(RECORDS),
+    json.dumps({"odata.metadata": "x", "value": RECORDS}),
+    json.dumps(RECORDS, indent=4),
+])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_records_across_chunks(text, chunk_size):
+    assert list(iter_json_records(io.StringIO(text), chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize("text", ['{"value": 3}', '"records"', "",
+                                  json.dumps(RECORDS)[:-1]])
+def test_not_a_list_of_records(text):
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.StringIO(text), 7))
+
+
+def table_rows(db_path, table: str) -> list[tuple]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f'SELECT * FROM "{table}" ORDER BY 1, 2, 3;'
+                            ).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    """Rows of part of the database, written as DataMall pages of 100."""
+    path = tmp_path_factory.mktemp("datamall")
+    stops = table_rows(Datastore().db_path, "bus_stops")[:300]
+    codes = {row[0] for row in stops}
+    routes = [row for row in table_rows(Datastore().db_path, "bus_routes")
+              if row[3] in codes][:700]
+    files = {}
+    for name, rows, fields in (("stops", stops, BUS_STOP_FIELDS),
+                               ("routes", routes, BUS_ROUTE_FIELDS)):
+        files[name] = []
+        for page, start in enumerate(range(0, len(rows), 100)):
+            records = [dict(zip(fields.values(), row))
+                       for row in rows[start:start + 100]]
+            files[name].append(str(path / f"{name}{page}.json"))
+            with open(files[name][-1], "w") as f:
+                json.dump({"value": records}, f)
+    return stops, routes, files
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest(dataset, tmp_path, workers):
+    stops, routes, files = dataset
+    db_path = str(tmp_path / "database.db")
+    settings = (Datastore().db_path, Datastore().read_only)
+    ingest(db_path, files["stops"], files["routes"], chunk_size=37,
+           workers=workers, progress=lambda *args, **kwargs: None)
+
+    assert table_rows(db_path, "bus_stops") == sorted(stops)
+    assert table_rows(db_path, "bus_routes") == sorted(routes)
+    conn = sqlite3.connect(db_path)
+    assert schema_version(conn) == len(MIGRATIONS)
+    conn.close()
+    assert (Datastore().db_path, Datastore().read_only) == settings
+    assert os.listdir(tmp_path) == ["database.db"]
+
+
+def test_failed_ingest_keeps_old_database(dataset, tmp_path):
+    _, _, files = dataset
+    db_path = tmp_path / "database.db"
+    db_path.write_bytes(b"old database")
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"value": [{"ServiceNo": "10"')
+
+    with pytest.raises(ValueError):
+        ingest(str(db_path), files["stops"], [str(broken)], workers=1,
+               progress=lambda *args, **kwargs: None)
+    assert db_path.read_bytes() == b"old database"
+    assert sorted(os.listdir(tmp_path)) == ["broken.json", "database.db"]
@@ -0,0 +1,58 @@
+"""Datastore connections to a database file that is replaced."""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from datastore import Datastore, RouteIndex
+
+
+@pytest.fixture
+def datastore(tmp_path):
+    """The Datastore on a copy of the database, put back after the test."""
+    datastore = Datastore()
+    db_path, read_only = datastore.db_path, datastore.read_only
+    shutil.copy(db_path, tmp_path / "database.db")
+    yield Datastore(str(tmp_path / "database.db"), read_only=True)
+    datastore.close()
+    Datastore(db_path, read_only=read_only)
+
+
+def count_stops(datastore: Datastore) -> int:
+    return datastore.execute('SELECT COUNT(*) FROM "bus_stops";')[0][0]
+
+
+def test_replaced_file_is_reopened(datastore, tmp_path):
+    before = count_stops(datastore)
+    new_path = tmp_path / "new.db"
+    shutil.copy(datastore.db_path, new_path)
+    conn = sqlite3.connect(new_path)
+    with conn:
+        conn.execute('DELETE FROM "bus_stops" WHERE rowid % 2 = 0;')
+    conn.close()
+
+    # as ingest installs a new database
+    os.replace(new_path, datastore.db_path)
+    assert count_stops(datastore) == before - before // 2
+
+
+@pytest.mark.parametrize("starts, ends, expected", [
+    ([(3, 2.0)], [(7, 5.5)], 3.5),
+    # a loop service, boarded at its second visit to the start
+    ([(1, 0.0), (19, 9.0)], [(11, 5.0), (25, 11.0)], 2.0),
+    # the service only visits the end before the start
+    ([(11, 5.0)], [(5, 2.3)], None),
+    ([(11, 5.0)], [(5, 2.3), (12, None)], None),
+    ([], [(5, 2.3)], None),
+])
+def test_shortest_segment(starts, ends, expected):
+    assert Datastore.shortest_segment(starts, ends) == expected
+
+
+@pytest.mark.parametrize("lookup", [Datastore, RouteIndex])
+def test_no_segment_against_the_route(lookup):
+    # service 84 visits 65469 at stop 5 and 65681 at stop 11
+    assert lookup().get_segment_distance("65469", "65681", "84", 1) \
+        == pytest.approx(2.7)
+    assert lookup().get_segment_distance("65681", "65469", "84", 1) is None
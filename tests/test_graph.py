@@ -0,0 +1,71 @@
+"""Graph edges inserted into a graph that shares its adjacency, and the
+paths searched in it."""
+import random
+
+import pytest
+
+from bus import BusStop
+from Graph import Graph
+
+
+def stops(*codes: str) -> list[BusStop]:
+    return [BusStop.from_bus_code(code) for code in codes]
+
+
+def test_insert_leaves_shared_adjacency():
+    a, b, c, d = stops("01012", "01013", "01019", "01029")
+    shared = {a: [b], c: []}
+    resident = Graph(shared)
+    graph = Graph(resident.stops_graph)
+
+    graph.insert(a, c)
+    graph.insert(a, d)
+    graph.insert(d, a)
+    assert shared == {a: [b], c: []}
+    assert resident.stops_graph[a] == [b]
+    assert graph.stops_graph == {a: [b, c, d], c: [], d: [a]}
+    assert graph.reverse_graph()[c] == [a]
+
+
+def breadth_first(graph, start: BusStop, end: BusStop) -> list[list[BusStop]]:
+    """search_path() before the search from both ends, for a graph with
+    every stop."""
+    solutions = []
+    visited = set()
+    to_visit = [[start]]
+    while to_visit:
+        current_path = to_visit.pop(0)
+        if solutions and len(current_path) > 3:
+            return solutions
+        for node in graph.get(current_path[-1], []):
+            if node not in visited:
+                to_visit.append(current_path + [node])
+                visited.add(node)
+            if node == end:
+                solutions.append(current_path + [node])
+    return solutions
+
+
+@pytest.fixture(scope="module")
+def shipped_graph():
+    return Graph().create_graph(cache=False)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_search_path_matches_breadth_first(shipped_graph, seed):
+    rng = random.Random(seed)
+    stops_list = list(shipped_graph)
+    graph = Graph(shipped_graph)
+    for _ in range(10):
+        start, end = rng.sample(stops_list, 2)
+        assert graph.search_path(start, end) == \
+            breadth_first(shipped_graph, start, end), \
+            (start.bus_stop_code, end.bus_stop_code)
+
+
+def test_search_path_to_start(shipped_graph):
+    # a loop service connects 65009 back to itself
+    start = next(stop for stop in shipped_graph
+                 if stop.bus_stop_code == "65009")
+    assert Graph(shipped_graph).search_path(start, start) == \
+        breadth_first(shipped_graph, start, start)
@@ -0,0 +1,63 @@
+"""The graph cache read back, and refused when it does not match."""
+import struct
+
+import pytest
+
+from Graph import Graph
+from GraphCache import (HEADER, MAGIC, CompactAdjacency, load_graph_cache,
+                        save_graph_cache)
+
+HASH = "ab" * 32
+OTHER_HASH = "cd" * 32
+
+
+@pytest.fixture(scope="module")
+def stops_graph():
+    return Graph().create_graph(cache=False)
+
+
+def edges(graph) -> dict[str, list[str]]:
+    return {stop.bus_stop_code: [end.bus_stop_code for end in ends]
+            for stop, ends in graph.items()}
+
+
+def test_round_trip(stops_graph, tmp_path):
+    path = str(tmp_path / "graph.bin")
+    save_graph_cache(path, CompactAdjacency.from_graph(stops_graph), HASH)
+    adjacency = load_graph_cache(path, HASH)
+    assert adjacency is not None
+    # same neighbours, in the same order
+    assert edges(adjacency) == edges(stops_graph)
+    assert len(adjacency) == len(stops_graph)
+
+
+def test_empty_graph(tmp_path):
+    path = str(tmp_path / "graph.bin")
+    save_graph_cache(path, CompactAdjacency.from_graph({}), HASH)
+    assert dict(load_graph_cache(path, HASH)) == {}
+
+
+def test_other_database(stops_graph, tmp_path):
+    path = str(tmp_path / "graph.bin")
+    save_graph_cache(path, CompactAdjacency.from_graph(stops_graph), HASH)
+    assert load_graph_cache(path, OTHER_HASH) is None
+
+
+def test_missing_file(tmp_path):
+    assert load_graph_cache(str(tmp_path / "graph.bin"), HASH) is None
+
+
+@pytest.mark.parametrize("damage", ["magic", "version", "truncated"])
+def test_damaged_file(stops_graph, tmp_path, damage):
+    path = tmp_path / "graph.bin"
+    save_graph_cache(str(path), CompactAdjacency.from_graph(stops_graph),
+                     HASH)
+    data = bytearray(path.read_bytes())
+    if damage == "magic":
+        data[:len(MAGIC)] = b"NOTGRAPH"
+    elif damage == "version":
+        struct.pack_into("<I", data, len(MAGIC), 99)
+    else:
+        del data[HEADER.size + 8:]
+    path.write_bytes(bytes(data))
+    assert load_graph_cache(str(path), HASH) is None
@@ -0,0 +1,117 @@
+"""The patched graph against the graph built from scratch."""
+import shutil
+import sqlite3
+
+import pytest
+
+import config
+from datastore import Datastore
+from Graph import Graph
+from GraphCache import CompactAdjacency, load_graph_cache, save_graph_cache
+from GraphUpdate import (patch_adjacency, read_routes, read_stop_codes,
+                         update_graph_cache)
+
+
+def build(routes, stop_codes) -> dict[str, list[str]]:
+    """Connections of each stop, in the order find_all_bus_connections()
+    scans the routes."""
+    connections = {code: [] for code in stop_codes}
+    for codes in routes.values():
+        route_stops = []
+        for code in codes:
+            if code not in connections:
+                continue
+            for origin in route_stops:
+                connections[origin].append(code)
+            if code not in route_stops:
+                route_stops.append(code)
+    return connections
+
+
+def edges(adjacency: CompactAdjacency) -> dict[str, list[str]]:
+    return {code: [adjacency.codes[i]
+                   for i in adjacency.neighbour_ids(stop_id)]
+            for stop_id, code in enumerate(adjacency.codes)}
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    conn = sqlite3.connect(config.db_path)
+    try:
+        routes, stop_codes = read_routes(conn), read_stop_codes(conn)
+    finally:
+        conn.close()
+    adjacency = CompactAdjacency.from_graph(Graph().create_graph(cache=False))
+    return routes, stop_codes, adjacency
+
+
+def test_reference_build(shipped):
+    routes, stop_codes, adjacency = shipped
+    assert build(routes, stop_codes) == edges(adjacency)
+
+
+def test_unchanged_routes(shipped):
+    routes, stop_codes, adjacency = shipped
+    patched, affected = patch_adjacency(adjacency, routes, routes,
+                                        stop_codes)
+    assert affected == 0
+    assert edges(patched) == edges(adjacency)
+
+
+def test_changed_routes(shipped):
+    routes, stop_codes, adjacency = shipped
+    new_routes = dict(routes)
+    keys = list(routes)
+    # removed, reversed, shortened and added routes
+    del new_routes[keys[0]]
+    new_routes[keys[1]] = routes[keys[1]][::-1]
+    new_routes[keys[2]] = routes[keys[2]][:3]
+    loop = routes[keys[3]][:4]
+    new_routes[("X1", 1)] = loop + loop[:1]
+
+    patched, affected = patch_adjacency(adjacency, routes, new_routes,
+                                        stop_codes)
+    assert 0 < affected < len(stop_codes)
+    assert edges(patched) == build(new_routes, stop_codes)
+
+
+def test_changed_stops(shipped):
+    routes, stop_codes, adjacency = shipped
+    new_routes = dict(routes)
+    key = next(iter(routes))
+    new_routes[key] = routes[key] + ("00000",)
+    # a stop without a record is skipped, a new stop appended
+    removed = routes[key][1]
+    new_codes = [code for code in stop_codes if code != removed]
+    new_codes.append("00000")
+
+    patched, _ = patch_adjacency(adjacency, routes, new_routes, new_codes)
+    assert list(patched.codes) == new_codes
+    assert edges(patched) == build(new_routes, new_codes)
+
+
+def test_update_graph_cache(shipped, tmp_path):
+    routes, stop_codes, adjacency = shipped
+    old_db, new_db = str(tmp_path / "old.db"), str(tmp_path / "new.db")
+    cache = str(tmp_path / "graph.bin")
+    shutil.copyfile(config.db_path, old_db)
+    shutil.copyfile(config.db_path, new_db)
+    service_no, direction = next(iter(routes))
+    conn = sqlite3.connect(new_db)
+    with conn:
+        conn.execute('DELETE FROM "bus_routes" WHERE "service_no" = ? '
+                     'AND "direction" = ? AND "stop_sequence" > 2;',
+                     (service_no, direction))
+    conn.close()
+
+    # not built from the old database
+    save_graph_cache(cache, adjacency, Datastore.file_hash(new_db))
+    assert update_graph_cache(cache, old_db, new_db) is None
+
+    save_graph_cache(cache, adjacency, Datastore.file_hash(old_db))
+    assert update_graph_cache(cache, old_db, new_db) > 0
+    patched = load_graph_cache(cache, Datastore.file_hash(new_db))
+    assert patched is not None
+    new_routes = dict(routes)
+    new_routes[service_no, direction] = routes[service_no, direction][:2]
+    assert edges(patched) == build(new_routes, stop_codes)
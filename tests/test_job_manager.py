@@ -0,0 +1,30 @@
+"""A job's status is only done once the JobManager has finished it."""
+import pytest
+
+from JobManager import JobManager
+
+
+def wait_done(job) -> None:
+    status = job.process_status
+    version = status.version
+    while not status.status_done:
+        version = status.wait(version, timeout=5)
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_done_after_finished(fails):
+    manager = JobManager(max_workers=1)
+
+    def target(job):
+        job.request.append("ran")
+        if fails:
+            raise ValueError("search failed")
+
+    jobs = [manager.submit([], target) for _ in range(20)]
+    for job in jobs:
+        wait_done(job)
+        assert job.done and job.request == ["ran"]
+        assert (job.error is not None) == fails
+    metrics = manager.metrics()
+    assert metrics["failed" if fails else "completed"] == len(jobs)
+    manager.shutdown()
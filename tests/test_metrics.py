@@ -0,0 +1,24 @@
+"""Types of the metrics in the Prometheus text format."""
+from Metrics import Metrics, Span
+
+
+def metric_types(text: str) -> dict[str, str]:
+    return dict(line.split()[2:4] for line in text.splitlines()
+                if line.startswith("# TYPE"))
+
+
+def test_totals_are_counters():
+    metrics = Metrics()
+    metrics.clear()
+    metrics.record(Span("search_path"))
+    text = metrics.render(counters={"db": {"statements_run": 12}},
+                          gauges={"search_jobs": {"running": 1}})
+    types = metric_types(text)
+
+    assert types["search_stage_seconds"] == "histogram"
+    assert types["db_statements_run_total"] == "counter"
+    assert types["search_jobs_running"] == "gauge"
+    assert "db_statements_run_total 12" in text.splitlines()
+    assert 'search_stage_seconds_count{stage="search_path"} 1' \
+        in text.splitlines()
+    metrics.clear()
@@ -0,0 +1,70 @@
+"""The queries of SQLcmds use the covering indexes of the migrations."""
+import sqlite3
+
+import pytest
+
+import config
+from datastore import SQLcmds, migrate
+from datastore.migrations import MIGRATIONS, query_plans, schema_version
+
+# index each query on bus_routes must read, without touching the table
+COVERING_INDEXES = {
+    "get_bus_routes": "bus_routes_by_route",
+    "get_all_bus_routes": "bus_routes_by_route",
+    "find_connected_bus_stop": "bus_routes_by_route",
+    "get_distance": "bus_routes_by_stop",
+    "get_stop_distances": "bus_routes_by_stop",
+    "get_buses_at": "bus_routes_by_stop",
+}
+
+
+def new_database() -> sqlite3.Connection:
+    """An empty database with the tables ingest creates, migrated."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute(SQLcmds["create_bus_stops_table"])
+    conn.execute(SQLcmds["create_bus_routes_table"])
+    migrate(conn)
+    return conn
+
+
+def shipped_database() -> sqlite3.Connection:
+    """The database the app is run with, as it is migrated at startup."""
+    conn = sqlite3.connect(f"file:{config.db_path}?mode=ro", uri=True)
+    if schema_version(conn) != len(MIGRATIONS):
+        # migrated by main at startup, so check a migrated copy
+        copy = sqlite3.connect(":memory:")
+        conn.backup(copy)
+        conn.close()
+        conn = copy
+        migrate(conn)
+    return conn
+
+
+@pytest.fixture(params=[new_database, shipped_database],
+                ids=["new", "shipped"])
+def plans(request):
+    conn = request.param()
+    yield query_plans(conn)
+    conn.close()
+
+
+def test_every_route_query_is_checked(plans):
+    route_queries = {name for name in plans
+                     if '"bus_routes"' in SQLcmds[name]}
+    assert route_queries == set(COVERING_INDEXES)
+
+
+@pytest.mark.parametrize("name", sorted(COVERING_INDEXES))
+def test_query_reads_covering_index(plans, name):
+    index = COVERING_INDEXES[name]
+    plan = plans[name]
+    assert len(plan) == 1, plan
+    assert f"USING COVERING INDEX {index}" in plan[0], plan
+    if name != "get_all_bus_routes":
+        # a search, only get_all_bus_routes reads every row
+        assert plan[0].startswith("SEARCH"), plan
+
+
+def test_bus_stop_query_searches_key(plans):
+    plan = plans["get_bus_stop_info"]
+    assert not any(detail.startswith("SCAN") for detail in plan), plan
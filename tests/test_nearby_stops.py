@@ -0,0 +1,52 @@
+"""Input checks of NearbyStopsRequest and far away nearest stop queries."""
+import time
+
+import pytest
+from flask import Flask, request
+
+from bus import StopGrid
+from request import NearbyStopsRequest
+from response import NearbyStopsResult, ResultError
+
+app = Flask(__name__)
+
+
+def handle(query: str = "", json=None):
+    method = "GET" if json is None else "POST"
+    with app.test_request_context(f"/?{query}", method=method, json=json):
+        return NearbyStopsRequest(request).handle()
+
+
+@pytest.mark.parametrize("query", [
+    "lat=inf&lon=103.8", "lat=nan&lon=103.8", "lat=91&lon=103.8",
+    "lat=1.3&lon=-181", "lat=1.3&lon=103.8&k=-3", "lat=1.3&lon=103.8&k=0",
+    "lat=1.3&lon=103.8&radius=inf", "lat=1.3&lon=103.8&radius=-1",
+    "lat=1.3", "lat=x&lon=103.8",
+])
+def test_invalid_query(query):
+    assert isinstance(handle(query), ResultError)
+
+
+@pytest.mark.parametrize("body", [
+    [[1.3, 103.8]], "points", {"points": "ab"}, {"points": [[1.3]]},
+    {"points": [[1.3, float("inf")]]}, {"points": [[1.3, 103.8]], "k": -3},
+    {"points": [[1.3, 103.8]], "k": "x"},
+])
+def test_invalid_body(body):
+    assert isinstance(handle(json=body), ResultError)
+
+
+def test_valid():
+    result = handle("lat=1.3&lon=103.8&k=3")
+    assert isinstance(result, NearbyStopsResult) and len(result.stops) == 3
+    result = handle(json={"points": [[1.3, 103.8], [1.4, 103.9]], "k": 2})
+    assert [len(stops) for stops in result.stops] == [2, 2]
+
+
+@pytest.mark.parametrize("location", [(0, 0), (0, 100), (-90, -180),
+                                      (90, 180)])
+def test_nearest_far_from_the_grid(location):
+    grid = StopGrid.current()
+    begin = time.perf_counter()
+    assert len(grid.nearest(*location, k=5)) == 5
+    assert time.perf_counter() - begin < 1
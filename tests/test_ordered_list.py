@@ -0,0 +1,57 @@
+"""OrderedList against a stable sort of the values inserted."""
+import random
+
+import pytest
+
+from OrderedList import OrderedList
+
+
+def values(seed: int, n: int) -> list[dict]:
+    rng = random.Random(seed)
+    # few distinct keys, so there are many ties
+    return [{"dist": rng.randint(0, 9), "transfer": rng.randint(1, 3),
+             "order": i} for i in range(n)]
+
+
+def expected(items: list[dict], index) -> list[dict]:
+    keys = index if isinstance(index, tuple) else (index,)
+    return sorted(items, key=lambda value: tuple(value[key] for key in keys))
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("index", ["dist", ("transfer", "dist")])
+def test_insert_across_blocks(seed, index):
+    ordered = OrderedList(index=index)
+    ordered.load = 3  # many small blocks, so they split
+    items = values(seed, 200)
+    for value in items:
+        ordered.insert(value)
+    want = expected(items, index)
+    assert list(ordered) == want and ordered.data == want
+    assert len(ordered) == len(want)
+    assert [ordered[i] for i in range(len(want))] == want
+    assert ordered[-1] == want[-1] and ordered[5:9] == want[5:9]
+    with pytest.raises(IndexError):
+        ordered[len(want)]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_extend_same_as_insert(seed):
+    index = ("transfer", "dist")
+    extended, inserted = OrderedList(index=index), OrderedList(index=index)
+    extended.load = inserted.load = 4
+    items = values(seed, 120)
+    extended.extend(items[:50])
+    for value in items[50:80]:
+        extended.insert(value)
+    extended.extend(items[80:])
+    for value in items:
+        inserted.insert(value)
+    assert extended.data == inserted.data == expected(items, index)
+
+
+def test_clear():
+    ordered = OrderedList(index="dist")
+    ordered.extend(values(0, 10))
+    ordered.clear()
+    assert len(ordered) == 0 and ordered.data == []
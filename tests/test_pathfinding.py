@@ -0,0 +1,34 @@
+"""sort_paths keeping the best top_k against sorting every path."""
+import pytest
+
+from bus import BusStop
+from Graph import Graph
+from pathfinding import search_path, sort_paths
+
+
+@pytest.fixture(scope="module")
+def graph():
+    graph = Graph()
+    graph.create_graph()
+    return graph
+
+
+def summary(result: dict) -> tuple:
+    return (result["sn"], result["dist"], result["transfer"],
+            [stop.bus_stop_code for stop in result["path"]])
+
+
+# 58031 and 47751 are km from where their routes put them, so their
+# great-circle distances are no bound on the ride
+@pytest.mark.parametrize("start, end", [("58151", "58031"),
+                                        ("46769", "47751"),
+                                        ("47751", "59341")])
+@pytest.mark.parametrize("criteria", ["dist", "transfer"])
+@pytest.mark.parametrize("top_k", [5, 50])
+def test_top_k_is_head_of_full_sort(graph, start, end, criteria, top_k):
+    paths = search_path(BusStop.from_bus_code(start),
+                        BusStop.from_bus_code(end), graph)
+    full = sort_paths(paths, criteria)
+    top = sort_paths(paths, criteria, top_k=top_k)
+    assert [summary(result) for result in top] == \
+        [summary(result) for result in full][:top_k]
@@ -0,0 +1,44 @@
+"""RaptorRouter against every journey of a small made up network."""
+import pytest
+
+from bus import BusStop
+from routing import RaptorRouter
+from routing.RouteNetwork import RouteNetwork
+from small_network import SmallRouteIndex, all_journeys
+
+MAX_LEGS = 3
+
+
+@pytest.mark.parametrize("seed", range(16))
+def test_pareto_set(seed):
+    route_index = SmallRouteIndex(seed)
+    network = RouteNetwork(route_index)
+    router = RaptorRouter(route_index)
+    route_ids = {key: i for i, key in enumerate(network.route_keys)}
+    for start in network.codes:
+        for end in network.codes:
+            if start == end:
+                continue
+            found = all_journeys(network, network.ids[start],
+                                 network.ids[end], MAX_LEGS, reboard=True)
+            # shortest with at most each number of buses, kept when
+            # shorter than with fewer buses
+            expected = []
+            for legs in range(1, MAX_LEGS + 1):
+                shortest = min((round(dist, 6) for key, dist in found.items()
+                                if len(key) <= legs), default=None)
+                if shortest is not None and (
+                        not expected or shortest < expected[-1][1]):
+                    expected.append((legs, shortest))
+
+            journeys = router.search(BusStop.from_bus_code(start),
+                                     BusStop.from_bus_code(end),
+                                     max_legs=MAX_LEGS)
+            assert len(journeys) == len(expected)
+            for journey, (legs, shortest) in zip(journeys, expected):
+                key = tuple((route_ids[(leg.service_no, leg.direction)],
+                             network.ids[leg.start_stop.bus_stop_code],
+                             network.ids[leg.end_stop.bus_stop_code])
+                            for leg in journey)
+                assert len(journey) <= legs
+                assert round(found[key], 6) == shortest
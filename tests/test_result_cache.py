@@ -0,0 +1,44 @@
+"""ResultCache eviction, expiry and invalidation by dataset version."""
+from ResultCache import ResultCache
+
+
+def test_least_recently_used_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.put(("a", "v1"), 1)
+    cache.put(("b", "v1"), 2)
+    assert cache.get(("a", "v1")) == 1  # b is now the least recent
+    cache.put(("c", "v1"), 3)
+    assert cache.get(("b", "v1")) is None
+    assert cache.get(("a", "v1")) == 1 and cache.get(("c", "v1")) == 3
+    assert cache.stats() == {"hits": 3, "misses": 1, "evictions": 1,
+                             "size": 2}
+
+
+def test_expired_result_is_dropped(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("ResultCache.time.monotonic", lambda: now[0])
+    cache = ResultCache(maxsize=4, ttl=10)
+    cache.put(("a", "v1"), 1)
+    now[0] += 10
+    assert cache.get(("a", "v1")) == 1
+    now[0] += 0.5
+    assert cache.get(("a", "v1")) is None
+    assert len(cache) == 0
+
+
+def test_other_versions_are_invalidated():
+    cache = ResultCache(maxsize=4)
+    cache.put(("a", "v1"), 1)
+    cache.put(("b", "v2"), 2)
+    assert cache.invalidate("v2") == 1
+    assert cache.get(("a", "v1")) is None
+    assert cache.get(("b", "v2")) == 2
+    # nothing to drop until the version changes again
+    cache.put(("c", "v1"), 3)
+    assert cache.invalidate("v2") == 0
+
+
+def test_disabled_cache_keeps_nothing():
+    cache = ResultCache(maxsize=0)
+    cache.put(("a", "v1"), 1)
+    assert cache.get(("a", "v1")) is None and len(cache) == 0
@@ -0,0 +1,44 @@
+"""ShortestPathRouter against every journey of a small made up network."""
+import pytest
+
+from bus import BusStop
+from routing import ShortestPathRouter
+from routing.RouteNetwork import RouteNetwork
+from small_network import SmallRouteIndex, all_journeys
+
+K = 5
+MAX_LEGS = 3
+
+
+@pytest.mark.parametrize("seed", range(16))
+def test_k_shortest(seed):
+    route_index = SmallRouteIndex(seed)
+    network = RouteNetwork(route_index)
+    router = ShortestPathRouter(route_index)
+    route_ids = {key: i for i, key in enumerate(network.route_keys)}
+    for start in network.codes:
+        for end in network.codes:
+            if start == end:
+                continue
+            found = all_journeys(network, network.ids[start],
+                                 network.ids[end], MAX_LEGS)
+            journeys = router.search(BusStop.from_bus_code(start),
+                                     BusStop.from_bus_code(end),
+                                     k=K, max_legs=MAX_LEGS)
+            keys = [tuple((route_ids[(leg.service_no, leg.direction)],
+                           network.ids[leg.start_stop.bus_stop_code],
+                           network.ids[leg.end_stop.bus_stop_code])
+                          for leg in journey) for journey in journeys]
+            assert len(set(keys)) == len(keys)
+            assert [round(found[key], 6) for key in keys] == \
+                [round(dist, 6) for dist in sorted(found.values())[:K]]
+
+
+def test_stop_with_wrong_coordinates():
+    # 58031 is 15km from where service 167 puts it, between 58021 and 58339
+    journeys = ShortestPathRouter().search(BusStop.from_bus_code("58021"),
+                                           BusStop.from_bus_code("58339"),
+                                           k=3)
+    assert [leg.service_no for leg in journeys[0]] == ["167"]
+    assert [round(sum(leg.calculate_distance() for leg in journey), 1)
+            for journey in journeys] == [0.9, 6.7, 6.7]
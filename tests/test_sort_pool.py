@@ -0,0 +1,88 @@
+"""sort_paths in the SortPool against sort_paths in this process."""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from bus import BusRoute, BusStop
+from datastore import Datastore, RouteIndex
+from Graph import Graph
+from pathfinding import sort_paths
+from SortPool import SortPool
+
+SEARCHES = [("46009", "01012"), ("22009", "75009"), ("84009", "65009")]
+
+
+def rebuild() -> None:
+    """Read the bus routes of the database again, as the app does when the
+    database is replaced."""
+    RouteIndex().build()
+    BusRoute.reset_bus_stops()
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    """A copy of the database, served to a started SortPool."""
+    datastore = Datastore()
+    db_path, read_only = datastore.db_path, datastore.read_only
+    path = tmp_path_factory.mktemp("sort_pool") / "database.db"
+    shutil.copy(db_path, path)
+    Datastore(str(path), read_only=True)
+    rebuild()
+    pool = SortPool(2)
+    assert pool.start() and pool.running()
+    yield path
+    pool.shutdown()
+    assert not pool.running()
+    datastore.close()
+    Datastore(db_path, read_only=read_only)
+    rebuild()
+
+
+@pytest.fixture(scope="module")
+def searches(database):
+    graph = Graph()
+    graph.create_graph(cache=False)
+    return [graph.search_path(BusStop.from_bus_code(start),
+                              BusStop.from_bus_code(end))
+            for start, end in SEARCHES]
+
+
+def summaries(results) -> list[tuple]:
+    return [(result["sn"], [stop.bus_stop_code for stop in result["path"]],
+             result["dist"], result["transfer"]) for result in results]
+
+
+def compare(paths, criteria: str, top_k) -> list[tuple]:
+    serial = summaries(sort_paths(paths, criteria, top_k=top_k))
+    parallel = summaries(sort_paths(paths, criteria, top_k=top_k,
+                                    parallel=True))
+    assert parallel == serial
+    return parallel
+
+
+@pytest.mark.parametrize("criteria", ["dist", "transfer"])
+@pytest.mark.parametrize("top_k", [None, 5])
+def test_same_as_serial(searches, criteria, top_k):
+    for paths in searches:
+        assert compare(paths, criteria, top_k)
+
+
+def test_replaced_database(database, searches):
+    before = [compare(paths, "dist", 5) for paths in searches]
+
+    new_path = database.with_name("new.db")
+    shutil.copy(database, new_path)
+    conn = sqlite3.connect(new_path)
+    with conn:
+        conn.execute('UPDATE "bus_routes" SET "distance" = "distance" * 2;')
+    conn.close()
+    os.replace(new_path, database)
+    rebuild()
+
+    # the workers rebuild their route index for the new dataset
+    after = [compare(paths, "dist", 5) for paths in searches]
+    assert [[result[2] for result in results] for results in after] == \
+        [[round(result[2] * 2, 2) for result in results]
+         for results in before]
@@ -0,0 +1,27 @@
+"""StopSearch ranking, with and without the matches of a word cached."""
+import pytest
+
+from bus import StopSearch
+
+
+def codes(stops) -> list[str]:
+    return [stop.bus_stop_code for stop in stops]
+
+
+@pytest.mark.parametrize("query, first", [("01012", "01012"),
+                                          ("bt batok int", "43009"),
+                                          ("hotel royal", "50069")])
+def test_best_match_first(query, first):
+    index = StopSearch.current()
+    found = codes(index.search(query))
+    assert found[0] == first
+    # the second time from the cached matches of the words
+    assert codes(index.search(query)) == found
+
+
+def test_every_word_matches():
+    for stop in StopSearch.current().search("orchard rd", limit=50):
+        text = f"{stop.bus_stop_code} {stop.description} {stop.road_name}"
+        words = StopSearch.tokens(text)
+        for query_word in ("orchard", "rd"):
+            assert any(query_word in word for word in words)